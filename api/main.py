@@ -1,18 +1,30 @@
 # api/main.py
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import Literal
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import functools
+import json
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
-
 # Import scraper modules from the 'scraper' package
-from scraper import sinta_scraper
-from scraper import garuda_scraper
+from scraper import config
 from scraper import database
+from scraper import jobs
+from scraper import log
+from scraper import metrics
+from scraper import pdf_harvester
+from scraper import progress
+from scraper import scheduler
+from scraper import search_index
+from scraper import stats
+
+# Configure logging (LOG_LEVEL, LOG_FORMAT)
+log.configure()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Journal Scraper API",
@@ -29,21 +41,47 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-@app.on_event("startup")
-async def startup_event():
-    logger.info("API startup: Initializing MongoDB connection...")
-    db = database.get_db()
-    if db is None:
-        logger.error("Failed to connect to MongoDB on startup.")
-        # Depending on desired behavior, you might want to raise an exception here
-        # or just log and allow the app to start with limited functionality.
+# pymongo is synchronous: every database call of a handler runs on this pool, so a slow
+# query holds one of its threads instead of the event loop that serves all other requests.
+_db_executor = ThreadPoolExecutor(max_workers=config.API_DB_THREADS, thread_name_prefix="api-db")
+
+async def run_db(func, *args, **kwargs):
+    """Runs a blocking database call on the API's database threads."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(func, *args, **kwargs))
+
+def _connect():
+    if database.get_db() is None:
+        logger.error("Failed to connect to MongoDB, retrying on the next request.")
     else:
         logger.info("MongoDB connection established successfully.")
 
+@app.on_event("startup")
+async def startup_event():
+    # Connects in the background: the API starts serving (and /health answers) even when
+    # MongoDB is slow or down, and the first request finds the connection ready.
+    logger.info("API startup: connecting to MongoDB in the background...")
+    asyncio.get_running_loop().run_in_executor(_db_executor, _connect)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    _db_executor.shutdown(wait=False, cancel_futures=True)
+
 @app.get("/", summary="Root endpoint", response_description="Returns a welcome message")
 async def read_root():
     return {"message": "Welcome to the Journal Scraper API! Visit /docs for API documentation."}
 
+HEALTH_TIMEOUT = 2  # seconds
+
+@app.get("/health", summary="Liveness of the API and reachability of MongoDB")
+async def health_api():
+    try:
+        latency = await asyncio.wait_for(run_db(database.ping), HEALTH_TIMEOUT)
+    except Exception as e:
+        detail = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+        return JSONResponse(status_code=503, content={"status": "degraded", "mongo": {"ok": False, "error": detail}})
+    return {"status": "ok", "mongo": {"ok": True, "latency_ms": round(latency * 1000, 2)}}
+
 # --- Pydantic Models for Request Bodies ---
 
 class SintaScrapeRequest(BaseModel):
@@ -52,79 +90,291 @@ class SintaScrapeRequest(BaseModel):
     max_pages: int = 10
     collection_name: str
     overwrite: bool = False
+    parallel: bool = False
 
 class GarudaSearchRequest(BaseModel):
     query: str
     source_collection: str
+    mode: Literal["serial", "concurrent", "pipeline"] = "serial"
+    resume: bool = True
+    incremental: bool = False
+    stale_after: float | None = None  # seconds; journals crawled more recently are skipped
+
+class GarudaBatchSearchRequest(BaseModel):
+    queries: list[str]
+    source_collection: str
+    mode: Literal["serial", "concurrent", "pipeline"] = "concurrent"
+    resume: bool = True
+    incremental: bool = False
+    stale_after: float | None = None  # seconds; journals crawled more recently are skipped
+
+class GarudaDistributedSearchRequest(BaseModel):
+    query: str
+    source_collection: str
+    shards: int = config.GARUDA_SHARD_COUNT
+    mode: Literal["serial", "concurrent", "pipeline"] = "concurrent"  # within each shard
+    resume: bool = True
+    incremental: bool = False
+
+class PdfHarvestRequest(BaseModel):
+    collection_name: str | None = None  # default: every results collection
+    limit: int | None = None
+    retry_failed: bool = False
+
+class SintaScheduleRequest(BaseModel):
+    sinta_ranks: list[int]
+    filter_area_codes: list[int] = []
+    max_pages: int = 10
+    collection_name: str
+    parallel: bool = False
+
+class GarudaScheduleRequest(BaseModel):
+    query: str
+    source_collection: str
 
 class ExportRequest(BaseModel):
     collection_name: str
+    format: Literal["json", "ndjson", "csv", "parquet"] = "json"  # csv/parquet: one row per article
+    gzip: bool = False
 
 # --- API Endpoints ---
 
+async def _enqueue(job_type, request):
+    job_id = await run_db(jobs.enqueue, job_type, request.dict())
+    if job_id is None:
+        raise HTTPException(status_code=503, detail="Database connection failed, job not queued.")
+    return job_id
+
 @app.post("/scrape/sinta", summary="Scrape Sinta Journals")
-async def scrape_sinta_journals_api(request: SintaScrapeRequest, background_tasks: BackgroundTasks):
+async def scrape_sinta_journals_api(request: SintaScrapeRequest):
     logger.info(f"Received Sinta scrape request: {request.dict()}")
-    
-    # Run the synchronous scraping function in a background thread
-    # This prevents the API from blocking while scraping
-    background_tasks.add_task(
-        sinta_scraper.scrape_all_sinta_journals,
-        sinta_ranks=request.sinta_ranks,
-        filter_area_codes=request.filter_area_codes,
-        max_pages=request.max_pages,
-        collection_name=request.collection_name,
-        overwrite=request.overwrite
-    )
-    
-    return {"message": "Sinta scraping initiated in the background.", "details": request.dict()}
+
+    # Queued for a worker process (python main.py worker) rather than run inside the API
+    job_id = await _enqueue("sinta", request)
+
+    return {"message": "Sinta scraping queued.", "job_id": job_id, "details": request.dict()}
 
 @app.post("/scrape/garuda", summary="Search Garuda Articles")
-async def search_garuda_articles_api(request: GarudaSearchRequest, background_tasks: BackgroundTasks):
+async def search_garuda_articles_api(request: GarudaSearchRequest):
     logger.info(f"Received Garuda search request: {request.dict()}")
 
-    background_tasks.add_task(
-        garuda_scraper.search_garuda_for_query,
-        query=request.query,
-        source_collection=request.source_collection
-    )
-    
-    return {"message": "Garuda article search initiated in the background.", "details": request.dict()}
+    job_id = await _enqueue("garuda", request)
+
+    return {"message": "Garuda article search queued.", "job_id": job_id, "details": request.dict()}
+
+@app.post("/scrape/garuda/batch", summary="Search Garuda Articles for several keywords in one pass")
+async def search_garuda_batch_api(request: GarudaBatchSearchRequest):
+    logger.info(f"Received Garuda batch search request: {request.dict()}")
+
+    if not any(q.strip() for q in request.queries):
+        raise HTTPException(status_code=400, detail="At least one non-empty query is required.")
+
+    job_id = await _enqueue("garuda_batch", request)
+
+    return {"message": "Garuda batch search queued.", "job_id": job_id, "details": request.dict()}
+
+@app.post("/scrape/garuda/distributed", summary="Search Garuda Articles with the journals split over all workers")
+async def search_garuda_distributed_api(request: GarudaDistributedSearchRequest):
+    logger.info(f"Received distributed Garuda search request: {request.dict()}")
+
+    if request.shards < 1:
+        raise HTTPException(status_code=400, detail="shards must be at least 1.")
+
+    job_id = await _enqueue("garuda_distributed", request)
+
+    return {"message": "Distributed Garuda search queued.", "job_id": job_id, "details": request.dict()}
+
+@app.get("/jobs", summary="List recent scrape jobs")
+async def list_jobs_api(status: Literal["queued", "running", "completed", "failed"] | None = None, limit: int = 50):
+    return {"jobs": await run_db(jobs.list_jobs, status=status, limit=limit)}
+
+@app.get("/jobs/{job_id}", summary="Get the status of a scrape job")
+async def get_job_api(job_id: str):
+    job = await run_db(jobs.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+    return job
+
+SSE_KEEPALIVE = 15  # seconds; keeps proxies from closing an idle stream
+
+def _sse_event(event):
+    event = dict(event)
+    event_id = str(event.pop("_id", ""))
+    return f"id: {event_id}\nevent: progress\ndata: {json.dumps(event, default=str)}\n\n"
+
+@app.get("/jobs/{job_id}/events", summary="Stream a job's progress as server-sent events")
+async def job_events_api(job_id: str):
+    job = await run_db(jobs.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def deliver(event):
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    async def stream():
+        # The feed follows events from a position taken before the current state is read, so
+        # nothing published in between is lost; every event is a full snapshot, so seeing one
+        # twice is harmless.
+        start = await run_db(progress.position)
+        progress.feed.subscribe(job_id, deliver, after=start)
+        try:
+            current = await run_db(progress.latest, job_id) or {"job_id": job_id, "type": job["type"], "status": job["status"]}
+            latest_job = await run_db(jobs.get_job, job_id)
+            if latest_job["status"] in progress.TERMINAL_STATUSES and current.get("status") != latest_job["status"]:
+                current = {**current, "status": latest_job["status"], "error": latest_job.get("error")}
+            yield _sse_event(current)
+            if current["status"] in progress.TERMINAL_STATUSES:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse_event(event)
+                if event["status"] in progress.TERMINAL_STATUSES:
+                    return
+        finally:
+            progress.feed.unsubscribe(job_id, deliver)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/search", summary="Keyword search over stored articles, without crawling")
+async def search_articles_api(q: str, limit: int = 50, sinta: int | None = None):
+    result = await run_db(search_index.search, q, limit=max(1, min(limit, 500)), sinta=sinta)
+    if result is None:
+        raise HTTPException(status_code=503, detail="Database connection failed.")
+    return result
+
+@app.post("/search/reindex", summary="Rebuild the local search index from every results collection")
+async def reindex_api():
+    job_id = await run_db(jobs.enqueue, "reindex", {})
+    if job_id is None:
+        raise HTTPException(status_code=503, detail="Database connection failed, job not queued.")
+    return {"message": "Search index rebuild queued.", "job_id": job_id}
+
+@app.get("/schedules", summary="List the standing crawls of the scheduler")
+async def list_schedules_api():
+    return {"schedules": await run_db(scheduler.list_schedules)}
+
+async def _add_schedule(kind, request):
+    schedule_id = await run_db(scheduler.add_schedule, kind, request.dict())
+    if schedule_id is None:
+        raise HTTPException(status_code=503, detail="Database connection failed, schedule not added.")
+    return {"message": f"{kind.capitalize()} schedule added.", "schedule_id": schedule_id, "details": request.dict()}
+
+@app.post("/schedules/sinta", summary="Keep a Sinta filter set fresh with scheduled crawls")
+async def add_sinta_schedule_api(request: SintaScheduleRequest):
+    return await _add_schedule("sinta", request)
+
+@app.post("/schedules/garuda", summary="Keep a Garuda query over a collection's journals fresh with scheduled crawls")
+async def add_garuda_schedule_api(request: GarudaScheduleRequest):
+    if not request.query.strip():
+        raise HTTPException(status_code=400, detail="query must not be empty.")
+    return await _add_schedule("garuda", request)
+
+@app.delete("/schedules/{schedule_id}", summary="Stop a standing crawl")
+async def remove_schedule_api(schedule_id: str):
+    if not await run_db(scheduler.remove_schedule, schedule_id):
+        raise HTTPException(status_code=404, detail=f"Schedule '{schedule_id}' not found.")
+    return {"message": f"Schedule '{schedule_id}' removed."}
+
+@app.post("/pdfs/harvest", summary="Download the articles' PDFs and extract their text")
+async def harvest_pdfs_api(request: PdfHarvestRequest):
+    logger.info(f"Received PDF harvest request: {request.dict()}")
+
+    job_id = await _enqueue("pdf_harvest", request)
+
+    return {"message": "PDF harvest queued.", "job_id": job_id, "details": request.dict()}
+
+@app.get("/pdfs/text", summary="Extracted text and page count of an article's PDF")
+async def get_pdf_text_api(download_link: str):
+    record = await run_db(pdf_harvester.get_pdf_text, download_link)
+    if record is None:
+        raise HTTPException(status_code=404, detail="No harvested PDF for this download link.")
+    return record
 
 @app.get("/collections", summary="List all available MongoDB collections")
 async def list_db_collections():
-    collections = database.list_collections()
+    collections = await run_db(database.list_collections)
     return {"collections": collections}
 
-from fastapi.responses import StreamingResponse
-import io
-import json
+@app.get("/stats", summary="Document counts and breakdowns of every collection")
+async def get_stats_api():
+    all_stats = await run_db(stats.get_all_stats)
+    if all_stats is None:
+        raise HTTPException(status_code=503, detail="Database connection failed.")
+    return all_stats
 
-# ... (other imports)
+@app.get("/metrics", summary="Prometheus metrics of the API and the workers", response_class=PlainTextResponse)
+async def get_metrics_api():
+    return PlainTextResponse(await run_db(metrics.render_all), media_type="text/plain; version=0.0.4")
 
-# ... (FastAPI app setup and other endpoints)
+@app.get("/collections/{collection_name}/documents", summary="Browse a collection page by page")
+async def browse_collection_api(
+    collection_name: str,
+    after: str | None = None,
+    limit: int = 50,
+    sinta: int | None = None,
+    name: str | None = None,
+    query: str | None = None,
+):
+    # Summary rows only: Garuda `results` arrays are fetched per document when a row is expanded
+    try:
+        page = await run_db(database.browse_collection, collection_name, after=after, limit=limit, sinta=sinta, name=name, query=query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail=f"Collection '{collection_name}' not found.")
+    return page
+
+@app.get("/collections/{collection_name}/documents/{document_id}", summary="Get one full document of a collection")
+async def get_collection_document_api(collection_name: str, document_id: str):
+    document = await run_db(database.get_collection_document, collection_name, document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Document '{document_id}' not found in '{collection_name}'.")
+    return document
 
-@app.post("/export", summary="Export a MongoDB collection to JSON")
+@app.post("/export", summary="Export a MongoDB collection to JSON, NDJSON, CSV or Parquet")
 async def export_collection_api(request: ExportRequest):
     logger.info(f"Received export request for collection: {request.collection_name}")
 
-    documents = database.export_collection_to_json(collection_name=request.collection_name)
+    # Documents are read from a cursor and serialized chunk by chunk while the
+    # response is sent, so the collection is never held in memory as a whole.
+    # The generator itself is iterated on Starlette's threadpool while the response is sent.
+    try:
+        stream = await run_db(
+            database.stream_collection_export,
+            collection_name=request.collection_name,
+            fmt=request.format,
+            compress=request.gzip,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    if documents is None:
+    if stream is None:
         raise HTTPException(status_code=404, detail=f"Collection '{request.collection_name}' not found or is empty.")
 
-    # Convert the list of dictionaries to a JSON string
-    json_data = json.dumps(documents, indent=2, ensure_ascii=False)
-    
-    # Create an in-memory text stream
-    stream = io.StringIO(json_data)
-    
     # Define the filename for the download
-    filename = f"{request.collection_name.replace(' ', '_')}.json"
-    
+    filename = database.export_filename(request.collection_name, request.format, request.gzip)
+    if request.format == "parquet":
+        media_type = "application/vnd.apache.parquet"
+    elif request.gzip:
+        media_type = "application/gzip"
+    elif request.format == "csv":
+        media_type = "text/csv; charset=utf-8"
+    elif request.format == "ndjson":
+        media_type = "application/x-ndjson"
+    else:
+        media_type = "application/json"
+
     return StreamingResponse(
-        iter([stream.read()]),
-        media_type="application/json",
+        stream,
+        media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
@@ -145,17 +395,17 @@ async def delete_collection_api(collection_name: str, request: DeleteRequest):
         raise HTTPException(status_code=403, detail="Incorrect password. Deletion denied.")
     
     # Check if collection exists
-    collections = database.list_collections()
+    collections = await run_db(database.list_collections)
     if collection_name not in collections:
         raise HTTPException(status_code=404, detail=f"Collection '{collection_name}' not found.")
     
     try:
-        db = database.get_db()
+        db = await run_db(database.get_db)
         if db is None:
             raise HTTPException(status_code=500, detail="Database connection failed.")
         
         # Drop the collection
-        db[collection_name].drop()
+        await run_db(database.drop_collection, collection_name)
         logger.info(f"Successfully deleted collection: {collection_name}")
         
         return {"message": f"Collection '{collection_name}' has been deleted successfully."}
@@ -0,0 +1,236 @@
+# mock_server.py
+"""
+Local stand-in for the Sinta and Garuda portals, serving pages rendered from the HTML
+fixtures in benchmarks/fixtures/ with configurable latency, pagination depth and error rate.
+
+Two servers are started on 127.0.0.1, one per portal, so the Sinta pages' Garuda links
+point at a host of their own. Point the scrapers at them with `portal.environment()`
+before importing the scraper package:
+
+    with MockPortal(sinta_pages=20, garuda_depth=5, latency=0.05, error_rate=0.02) as portal:
+        os.environ.update(portal.environment())
+        ...
+
+Or run it on its own to scrape against it from another shell:
+
+    python -m benchmarks.mock_server --sinta-pages 20 --garuda-depth 5 --latency 0.05
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return Template(f.read())
+
+
+class MockPortal:
+    """
+    Serves `sinta_pages` listing pages of `journals_per_page` journals, and for every
+    journal `garuda_depth` search result pages of `articles_per_page` articles followed
+    by an empty page. Every request waits `latency` seconds (± `jitter`), and a fraction
+    `error_rate` of them answers 503, drawn from a seeded generator.
+    """
+
+    def __init__(self, sinta_pages=10, journals_per_page=10, garuda_depth=3, articles_per_page=10,
+                 latency=0.0, jitter=0.0, error_rate=0.0, seed=0):
+        self.sinta_pages = sinta_pages
+        self.journals_per_page = journals_per_page
+        self.garuda_depth = garuda_depth
+        self.articles_per_page = articles_per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._templates = {
+            name: _fixture(f"{name}.html")
+            for name in ("sinta_listing", "sinta_journal_item", "garuda_search", "garuda_article_item")
+        }
+        self._servers = []
+
+    # --- Rendering ---
+
+    def render_sinta_page(self, page):
+        first = (page - 1) * self.journals_per_page
+        items = "".join(
+            self._templates["sinta_journal_item"].safe_substitute(
+                id=journal_id,
+                name=f"Jurnal Teknik dan Sains Terapan {journal_id}",
+                rank=journal_id % 6 + 1,
+                sinta_url=f"{self.sinta_url}/profile/{journal_id}",
+                garuda_url=f"{self.garuda_url}/{journal_id}",
+                impact=f"{journal_id % 7}.{journal_id % 100:02d}",
+                h5=journal_id % 30,
+                citations=journal_id * 13 % 5000,
+            )
+            for journal_id in range(first + 1, first + self.journals_per_page + 1)
+        ) if page <= self.sinta_pages else ""
+        return self._templates["sinta_listing"].safe_substitute(
+            items=items, page=page, total_pages=self.sinta_pages,
+            total_records=self.sinta_pages * self.journals_per_page,
+        )
+
+    def render_garuda_page(self, journal_id, page, query):
+        journal_name = f"Jurnal Teknik dan Sains Terapan {journal_id}"
+        items = "".join(
+            self._templates["garuda_article_item"].safe_substitute(
+                id=f"{journal_id}{page:03d}{n:03d}",
+                title=f"Analisis {query} pada Sistem {journal_id}-{page}-{n} Menggunakan Metode Terbaru",
+                author_id=journal_id * 100 + n,
+                journal_name=journal_name,
+                volume=page, issue=n % 4 + 1, year=2024 - page,
+                download_url=f"https://journal-{journal_id}.example.ac.id/index.php/jt/article/download/{page}{n:03d}/{n}",
+            )
+            for n in range(1, self.articles_per_page + 1)
+        ) if page <= self.garuda_depth else '        <div class="alert">No article found</div>'
+        return self._templates["garuda_search"].safe_substitute(
+            items=items, journal_name=journal_name, query=query, page=page,
+        )
+
+    # --- Serving ---
+
+    def _respond(self, path, query):
+        """Returns (status, body) for a request."""
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return 503, "<html><body>Service Temporarily Unavailable</body></html>"
+
+        page = int(query.get("page", ["1"])[0])
+        if path.startswith("/journals/index"):
+            return 200, self.render_sinta_page(page)
+        if path.startswith("/journal/view/"):
+            journal_id = int(path.rsplit("/", 1)[1])
+            return 200, self.render_garuda_page(journal_id, page, query.get("q", [""])[0])
+        return 404, "<html><body>Not Found</body></html>"
+
+    def _handler(self):
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real portals
+            # Headers and body go out in separate writes; with Nagle's algorithm the body
+            # would wait for the client's delayed ACK, adding ~40 ms to every response.
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def handle(self):
+                # Clients drop kept-alive connections (e.g. after a 503); that is not a server error.
+                try:
+                    super().handle()
+                except ConnectionError:
+                    pass
+
+            def _serve(self):
+                url = urlparse(self.path)
+                status, body = portal._respond(url.path, parse_qs(url.query))
+                data = body.encode("utf-8")
+                with portal._lock:
+                    portal.bytes_sent += len(data)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve()
+
+            def do_POST(self):
+                # The Sinta filter form: read and ignore the body.
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                self._serve()
+
+        return Handler
+
+    def start(self):
+        for _ in range(2):
+            server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self._servers.append(server)
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    @property
+    def sinta_url(self):
+        return f"http://127.0.0.1:{self._servers[0].server_port}/journals"
+
+    @property
+    def garuda_host(self):
+        return f"127.0.0.1:{self._servers[1].server_port}"
+
+    @property
+    def garuda_url(self):
+        return f"http://{self.garuda_host}/journal/view"
+
+    def environment(self):
+        """Environment variables that point the scrapers at this portal."""
+        return {
+            "SINTA_BASE_URL": f"{self.sinta_url}/index",
+            "GARUDA_HOST": self.garuda_host,
+            "GARUDA_SEARCH_URL": self.garuda_url,
+        }
+
+    def counters(self):
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors, "bytes": self.bytes_sent}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock Sinta and Garuda portals from the benchmark fixtures.")
+    parser.add_argument("--sinta-pages", type=int, default=10)
+    parser.add_argument("--journals-per-page", type=int, default=10)
+    parser.add_argument("--garuda-depth", type=int, default=3, help="Result pages per journal before an empty page.")
+    parser.add_argument("--articles-per-page", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    args = parser.parse_args()
+
+    portal = MockPortal(args.sinta_pages, args.journals_per_page, args.garuda_depth, args.articles_per_page,
+                        args.latency, args.jitter, args.error_rate).start()
+    print("Mock portals running. Point the scrapers at them with:")
+    for key, value in portal.environment().items():
+        print(f"  export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        portal.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# parser_benchmark.py
+"""
+Compares the HTML parser backends on saved pages: checks that every backend extracts
+exactly what the "bs4" backend extracts, and reports parse time per page.
+
+Pages come from a directory of .html files (--pages) or from the HTTP response cache
+filled by normal scraping runs (the default).
+
+    python -m benchmarks.parser_benchmark
+    python -m benchmarks.parser_benchmark --pages saved_pages/ --repeat 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import http_cache
+from scraper import parsers
+
+PAGE_PARSERS = {
+    "sinta": parsers.parse_sinta_journals,
+    "garuda": parsers.parse_garuda_articles,
+}
+
+
+def page_kind(html):
+    """Tells a Garuda search page from a Sinta listing page, or None for anything else."""
+    if "article-item" in html:
+        return "garuda"
+    if "list-item" in html:
+        return "sinta"
+    return None
+
+
+def load_pages(pages_dir=None):
+    """Returns [(name, kind, html)] from a directory of .html files or from the HTTP cache."""
+    if pages_dir:
+        sources = (
+            (name, open(os.path.join(pages_dir, name), encoding="utf-8").read())
+            for name in sorted(os.listdir(pages_dir)) if name.endswith(".html")
+        )
+    else:
+        sources = (
+            (url, body.decode("utf-8", errors="replace"))
+            for url, status, body in http_cache.get_cache().entries() if status == 200
+        )
+    return [(name, page_kind(html), html) for name, html in sources if page_kind(html)]
+
+
+def check_outputs(pages):
+    """Returns a list of (page, backend) pairs whose output differs from the bs4 backend."""
+    mismatches = []
+    for name, kind, html in pages:
+        expected = PAGE_PARSERS[kind](html, backend="bs4")
+        for backend in parsers.PARSER_BACKENDS:
+            if PAGE_PARSERS[kind](html, backend=backend) != expected:
+                mismatches.append((name, backend))
+    return mismatches
+
+
+def time_backends(pages, repeat):
+    """Returns {(kind, backend): mean seconds per page}."""
+    timings = {}
+    for kind in PAGE_PARSERS:
+        kind_pages = [html for _, k, html in pages if k == kind]
+        if not kind_pages:
+            continue
+        for backend in parsers.PARSER_BACKENDS:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for html in kind_pages:
+                    PAGE_PARSERS[kind](html, backend=backend)
+            timings[(kind, backend)] = (time.perf_counter() - start) / (repeat * len(kind_pages))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTML parser backends on saved pages.")
+    parser.add_argument("--pages", help="Directory of saved .html pages (default: the HTTP response cache).")
+    parser.add_argument("--repeat", type=int, default=10, help="Times each page is parsed per backend.")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    if not pages:
+        print("No saved Sinta or Garuda pages found. Run a scrape with HTTP_CACHE_MODE=on or pass --pages.")
+        return 1
+
+    counts = {kind: sum(1 for _, k, _ in pages if k == kind) for kind in PAGE_PARSERS}
+    print(f"📄 {len(pages)} pages ({counts['sinta']} Sinta, {counts['garuda']} Garuda), {args.repeat} rounds each\n")
+
+    mismatches = check_outputs(pages)
+    for name, backend in mismatches:
+        print(f"❌ {backend} output differs from bs4 on {name}")
+    if not mismatches:
+        print("✅ All backends produce identical output.\n")
+
+    timings = time_backends(pages, args.repeat)
+    print(f"{'page':<8}{'backend':<10}{'ms/page':>10}{'speedup':>10}")
+    for (kind, backend), seconds in timings.items():
+        speedup = timings[(kind, "bs4")] / seconds
+        print(f"{kind:<8}{backend:<10}{seconds * 1000:>10.2f}{speedup:>9.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+# scrape_benchmark.py
+"""
+Measures scraper throughput end to end against the local mock portals (benchmarks/mock_server.py),
+without touching the live Sinta and Garuda sites.
+
+Every scenario runs a real scrape (HTTP client, parser, bulk writes) and reports:
+- pages/s: successful page responses per second of wall time;
+- parse time per page (mean and p95);
+- DB write latency: time per bulk flush (mean and p95);
+- peak Python memory (tracemalloc) during the scenario.
+The search index update that ends a Garuda search runs after the timed section, so pages/s
+measures the scrape alone.
+
+Results go to a throwaway database on the configured MongoDB (or --mongo URI), which is dropped
+afterwards, or to an in-memory mongomock database (--mongo mock, needs `pip install mongomock`).
+mongomock is pure Python and scans a collection for every upsert, so its DB latencies (and the
+wall time of DB-heavy scenarios) say nothing about MongoDB; it is for fetch and parse comparisons.
+
+    python -m benchmarks.scrape_benchmark
+    python -m benchmarks.scrape_benchmark --mongo mock --scenarios sinta-serial,sinta-parallel
+    python -m benchmarks.scrape_benchmark --latency 0.05 --error-rate 0.02 --json results.json
+    python -m benchmarks.scrape_benchmark --baseline results.json --tolerance 0.2
+
+With --baseline the run fails (exit status 1) when a scenario is slower, parses slower or
+uses more memory than the baseline by more than --tolerance.
+"""
+import argparse
+import functools
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import MockPortal
+
+SCENARIOS = ("sinta-serial", "sinta-parallel", "garuda-serial", "garuda-concurrent", "garuda-pipeline")
+BENCHMARK_DATABASE = "journal_scraper_benchmark"
+SOURCE_COLLECTION = "bench_sinta"
+
+
+class Metrics:
+    """Thread-safe timing samples of one scenario."""
+
+    def __init__(self):
+        self.parse = []
+        self.flush = []
+        self.deferred = []  # search index updates, run once the scenario is timed
+        self._lock = threading.Lock()
+
+    def add(self, kind, seconds):
+        with self._lock:
+            getattr(self, kind).append(seconds)
+
+
+_current = Metrics()
+
+
+def _timed(kind, func, pending=None):
+    """Wraps `func` so each call adds its duration to the current scenario's `kind` samples."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if pending is not None and not pending(*args):
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.add(kind, time.perf_counter() - start)
+    return wrapper
+
+
+def _instrument():
+    from scraper import article_store, database, parsers, search_index
+    index_collection = search_index.index_collection
+
+    def deferred_index(*args):
+        _current.deferred.append(functools.partial(index_collection, *args))
+        return 0
+
+    search_index.index_collection = deferred_index
+    parsers.parse_sinta_journals = _timed("parse", parsers.parse_sinta_journals)
+    parsers.parse_garuda_articles = _timed("parse", parsers.parse_garuda_articles)
+    # Only flushes with something to write count as DB writes.
+    database.BulkUpserter.flush = _timed("flush", database.BulkUpserter.flush, lambda self: self._ops)
+    article_store.ArticleStoreWriter.flush = _timed("flush", article_store.ArticleStoreWriter.flush, lambda self: self._journals)
+
+
+def _use_mongomock():
+    try:
+        import mongomock
+        import mongomock.collection
+    except ImportError:
+        raise SystemExit("--mongo mock needs mongomock: pip install mongomock")
+
+    # Recent pymongo versions pass a `sort` argument that mongomock's bulk builder does not know.
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    mongomock.collection.BulkOperationBuilder.add_update = add_update_without_sort
+
+    from scraper import database
+    database._db = mongomock.MongoClient()[BENCHMARK_DATABASE]
+    return database._db
+
+
+def _percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_scenario(name, portal, action):
+    """Runs one scrape and returns its measurements."""
+    global _current
+    _current = Metrics()
+    before = portal.counters()
+    tracemalloc.start()
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    after = portal.counters()
+    for index in _current.deferred:
+        index()
+
+    errors = after["errors"] - before["errors"]
+    pages = after["requests"] - before["requests"] - errors
+    metrics = _current
+    return {
+        "scenario": name,
+        "seconds": round(elapsed, 3),
+        "pages": pages,
+        "errors": errors,
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0.0,
+        "parse_ms_mean": round(statistics.fmean(metrics.parse) * 1000, 3) if metrics.parse else 0.0,
+        "parse_ms_p95": round(_percentile(metrics.parse, 0.95) * 1000, 3),
+        "db_flushes": len(metrics.flush),
+        "db_flush_ms_mean": round(statistics.fmean(metrics.flush) * 1000, 3) if metrics.flush else 0.0,
+        "db_flush_ms_p95": round(_percentile(metrics.flush, 0.95) * 1000, 3),
+        "peak_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+def _actions(sinta_pages):
+    from scraper import garuda_scraper, sinta_scraper
+    sinta = functools.partial(sinta_scraper.scrape_all_sinta_journals, max_pages=sinta_pages, sinta_ranks=[1, 2, 3])
+    garuda = functools.partial(garuda_scraper.search_garuda_for_queries, source_collection=SOURCE_COLLECTION, resume=False)
+    return {
+        "sinta-serial": lambda: sinta(collection_name="bench_sinta_serial", parallel=False),
+        "sinta-parallel": lambda: sinta(collection_name="bench_sinta_parallel", parallel=True),
+        "garuda-serial": lambda: garuda(["bench serial"], mode="serial"),
+        "garuda-concurrent": lambda: garuda(["bench concurrent"], mode="concurrent"),
+        "garuda-pipeline": lambda: garuda(["bench pipeline"], mode="pipeline"),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Returns a description of every metric that regressed beyond `tolerance` against the baseline."""
+    previous = {r["scenario"]: r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(result["scenario"])
+        if old is None:
+            continue
+        if result["pages_per_sec"] < old["pages_per_sec"] * (1 - tolerance):
+            regressions.append(f"{result['scenario']}: {result['pages_per_sec']} pages/s, was {old['pages_per_sec']}")
+        for key in ("parse_ms_mean", "peak_mb"):
+            if old[key] and result[key] > old[key] * (1 + tolerance):
+                regressions.append(f"{result['scenario']}: {key} {result[key]}, was {old[key]}")
+    return regressions
+
+
+def print_table(results):
+    header = f"{'scenario':<19}{'pages':>7}{'err':>5}{'pages/s':>9}{'parse ms':>10}{'p95':>7}{'flushes':>9}{'flush ms':>10}{'p95':>8}{'peak MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['scenario']:<19}{r['pages']:>7}{r['errors']:>5}{r['pages_per_sec']:>9.1f}"
+              f"{r['parse_ms_mean']:>10.2f}{r['parse_ms_p95']:>7.2f}{r['db_flushes']:>9}"
+              f"{r['db_flush_ms_mean']:>10.2f}{r['db_flush_ms_p95']:>8.2f}{r['peak_mb']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against local mock portals.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of {', '.join(SCENARIOS)}.")
+    parser.add_argument("--mongo", help="A MongoDB URI (default: MONGO_URI) or 'mock' for in-memory mongomock.")
+    parser.add_argument("--sinta-pages", type=int, default=5, help="Listing pages, 10 journals each.")
+    parser.add_argument("--garuda-depth", type=int, default=3, help="Result pages per journal.")
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of responses that are 503.")
+    parser.add_argument("--rate", type=float, default=1000.0, help="HTTP client requests/second per host (high: unpaced).")
+    parser.add_argument("--verbose", action="store_true", help="Show the scrapers' output.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Results file of an earlier run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression against the baseline.")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    portal = MockPortal(sinta_pages=args.sinta_pages, garuda_depth=args.garuda_depth,
+                        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate).start()
+    # The scraper reads its configuration at import time, so the environment is set first.
+    # Injected 503s are retried without real waits: backoff is capped at 50 ms and the rate
+    # is pinned to --rate, so AIMD never slows a host down to HTTP_RATE_MIN.
+    os.environ.update(portal.environment())
+    os.environ.update({
+        "HTTP_CACHE_MODE": "off",
+        "HTTP_RATE_INITIAL": str(args.rate),
+        "HTTP_RATE_MIN": str(args.rate),
+        "HTTP_RATE_MAX": str(args.rate),
+        "HTTP_BACKOFF_BASE": "0.01",
+        "HTTP_BACKOFF_MAX": "0.05",
+        "MONGO_DATABASE": BENCHMARK_DATABASE,
+    })
+    if args.mongo and args.mongo != "mock":
+        os.environ["MONGO_URI"] = args.mongo
+
+    from scraper import database, log, sinta_scraper
+    log.configure(level="INFO" if args.verbose else "ERROR")
+    db = _use_mongomock() if args.mongo == "mock" else database.get_db()
+    if db is None:
+        return 1
+    _instrument()
+
+    print(f"🧪 Mock portals: {args.sinta_pages} Sinta pages, {args.sinta_pages * portal.journals_per_page} journals, "
+          f"{args.garuda_depth} Garuda pages each, latency {args.latency}s, error rate {args.error_rate:.0%}, "
+          f"MongoDB: {args.mongo or 'MONGO_URI'}\n")
+    try:
+        if any(s.startswith("garuda") for s in scenarios):
+            # The journals the Garuda scenarios search, outside of any measurement.
+            sinta_scraper.scrape_all_sinta_journals(max_pages=args.sinta_pages, collection_name=SOURCE_COLLECTION, overwrite=True)
+
+        actions = _actions(args.sinta_pages)
+        results = [run_scenario(name, portal, actions[name]) for name in scenarios]
+    finally:
+        if args.mongo != "mock":
+            db.client.drop_database(BENCHMARK_DATABASE)
+        portal.stop()
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"❌ Regression: {regression}")
+        if regressions:
+            return 1
+        print(f"\n✅ No regression beyond {args.tolerance:.0%} against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,14 @@
 from scraper import sinta_scraper
 from scraper import garuda_scraper
 from scraper import database
+from scraper import pdf_harvester
+from scraper import search_index
+from scraper import log
+import traceback
 
 def main_cli():
     """The main CLI function to orchestrate the scraping tasks."""
+    log.configure()
     # First, check the database connection
     if database.get_db() is None:
         print("Please check your MongoDB connection details in config.py and ensure the server is running.")
@@ -14,9 +19,11 @@ def main_cli():
     print("Please choose an option:")
     print("1. Scrape Sinta Journals (and save to DB)")
     print("2. Search Garuda Articles from DB (for a keyword)")
-    print("3. Export a Collection to JSON")
+    print("3. Export a Collection (JSON, NDJSON, CSV, Parquet)")
+    print("4. Search Stored Articles (offline, no crawling)")
+    print("5. Download Article PDFs and Extract Their Text")
 
-    choice = input("Enter your choice (1, 2, or 3): ")
+    choice = input("Enter your choice (1, 2, 3, 4, or 5): ")
 
     if choice == '1':
         print("\n--- Sinta Journal Scraper ---")
@@ -78,13 +85,16 @@ def main_cli():
             max_pages_input = input("Enter max pages to scrape (e.g., 10): ")
             max_pages = int(max_pages_input)
 
+            parallel = input("Fetch pages in parallel? [y/N]: ").strip().lower() == 'y'
+
             print(f"Selected Sinta ranks: {sinta_ranks}. Selected Categories: {filter_area_codes}. Target collection: '{sinta_collection_name}', Overwrite: {overwrite}")
             sinta_scraper.scrape_all_sinta_journals(
                 sinta_ranks=sinta_ranks, 
                 filter_area_codes=filter_area_codes,
                 max_pages=max_pages,
                 collection_name=sinta_collection_name,
-                overwrite=overwrite
+                overwrite=overwrite,
+                parallel=parallel
             )
 
         except ValueError:
@@ -105,15 +115,38 @@ def main_cli():
             print("Invalid collection name.")
             return
 
-        keyword = input("Enter the keyword to search for in articles: ")
-        if not keyword.strip():
+        keywords_input = input("Enter the keyword(s) to search for in articles (separate several with ','): ")
+        keywords = [k.strip() for k in keywords_input.split(',') if k.strip()]
+        if not keywords:
             print("Keyword cannot be empty.")
             return
             
-        garuda_scraper.search_garuda_for_query(query=keyword, source_collection=source_collection)
+        mode_input = input("Search mode: (1) Serial, (2) Concurrent or (3) Pipeline? [1/2/3]: ").strip()
+        mode = {'2': "concurrent", '3': "pipeline"}.get(mode_input, "serial")
+
+        resume = input("Resume interrupted searches for these keywords if there are any? [Y/n]: ").strip().lower() != 'n'
+
+        incremental = input("Only fetch articles newer than the stored results? [y/N]: ").strip().lower() == 'y'
+
+        stale_input = input("Skip journals searched within the last N hours (empty to search all): ").strip()
+        try:
+            stale_after = float(stale_input) * 3600 if stale_input else None
+        except ValueError:
+            print("Invalid number of hours.")
+            return
+
+        # Several keywords share one journal list, worker pool and progress report.
+        try:
+            garuda_scraper.search_garuda_for_queries(
+                queries=keywords, source_collection=source_collection, mode=mode, resume=resume, incremental=incremental,
+                stale_after=stale_after
+            )
+        except Exception as e:
+            print(f"\n❌ Fatal error in the Garuda search: {e}")
+            traceback.print_exc()
 
     elif choice == '3':
-        print("\\n--- Export Collection to JSON ---")
+        print("\\n--- Export Collection ---")
         collections = database.list_collections()
         if not collections:
             print("No collections found in the database to export.")
@@ -126,10 +159,55 @@ def main_cli():
             print("Invalid collection name.")
             return
         
-        database.export_collection_to_json_file(collection_to_export)
+        fmt_input = input("Export format: (1) JSON, (2) NDJSON, (3) CSV or (4) Parquet (one row per article)? [1-4]: ").strip()
+        fmt = {'2': "ndjson", '3': "csv", '4': "parquet"}.get(fmt_input, "json")
+        # Parquet is always compressed internally
+        compress = fmt != "parquet" and input("Compress with gzip? [y/N]: ").strip().lower() == 'y'
+
+        database.export_collection_to_json_file(collection_to_export, fmt=fmt, compress=compress)
+
+    elif choice == '4':
+        print("\n--- Search Stored Articles ---")
+        query = input("Enter the keyword(s) to look for: ").strip()
+        if not query:
+            print("Keyword cannot be empty.")
+            return
+
+        result = search_index.search(query)
+        if not result["results"]:
+            print(f"No stored articles match '{query}'. Run option 2 to search Garuda, or rebuild the index.")
+            return
+        print(f"🔎 {len(result['results'])} articles for terms {result['terms']} in {result['took_ms']} ms:")
+        for article in result["results"]:
+            print(f"  [{article['score']}] {article['title']} — {article.get('journal_name')} (S{article.get('sinta_level')})")
+            if article.get("download_link"):
+                print(f"      {article['download_link']}")
+
+    elif choice == '5':
+        print("\n--- PDF Harvester ---")
+        article_collections = [c for c in database.list_collections() if database.is_article_collection(c)]
+        if not article_collections:
+            print("No article collections found. Please search Garuda first.")
+            return
+
+        print("Available article collections:", article_collections)
+        collection_name = input("Enter the collection to harvest (empty for all): ").strip() or None
+        if collection_name and collection_name not in article_collections:
+            print("Invalid collection name.")
+            return
+
+        limit_input = input("Maximum number of PDFs (empty for no limit): ").strip()
+        try:
+            limit = int(limit_input) if limit_input else None
+        except ValueError:
+            print("Invalid number.")
+            return
+        retry_failed = input("Retry links that failed too often before? [y/N]: ").strip().lower() == 'y'
+
+        pdf_harvester.harvest_pdfs(collection_name=collection_name, limit=limit, retry_failed=retry_failed)
 
     else:
-        print("Invalid choice. Please run the script again and choose 1, 2, or 3.")
+        print("Invalid choice. Please run the script again and choose 1, 2, 3, 4, or 5.")
 
 
 if __name__ == "__main__":
@@ -3,27 +3,59 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { X, Database, ChevronDown, ChevronRight } from 'lucide-react';
 import axios from 'axios';
 
+const API_URL = 'http://localhost:8000';
+const PAGE_SIZE = 50;
+
 const CollectionDetailsModal = ({ isOpen, onClose, collectionName }) => {
   const [data, setData] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const [expandedItems, setExpandedItems] = useState(new Set());
+  // Full documents (with their article lists), fetched when a row is first expanded
+  const [details, setDetails] = useState({});
+  const [filters, setFilters] = useState({ sinta: '', name: '', query: '' });
 
   useEffect(() => {
-    if (isOpen && collectionName) {
+    if (!isOpen || !collectionName) return;
+    // Debounced so typing in a filter sends one request, not one per keystroke
+    const timer = setTimeout(() => {
+      setExpandedItems(new Set());
+      setDetails({});
       fetchCollectionData();
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [isOpen, collectionName, filters]);
+
+  useEffect(() => {
+    if (!isOpen) {
+      setFilters({ sinta: '', name: '', query: '' });
     }
   }, [isOpen, collectionName]);
 
+  const fetchPage = async (after) => {
+    const params = { limit: PAGE_SIZE };
+    if (after) params.after = after;
+    if (filters.sinta) params.sinta = filters.sinta;
+    if (filters.name) params.name = filters.name;
+    if (filters.query) params.query = filters.query;
+    const response = await axios.get(
+      `${API_URL}/collections/${encodeURIComponent(collectionName)}/documents`,
+      { params }
+    );
+    return response.data;
+  };
+
   const fetchCollectionData = async () => {
     setLoading(true);
     setError(null);
     try {
-      const response = await axios.post('http://localhost:8000/export', 
-        { collection_name: collectionName },
-        { responseType: 'json' }
-      );
-      setData(response.data);
+      const page = await fetchPage(null);
+      setData(page.documents);
+      setNextCursor(page.next_cursor);
+      setTotal(page.total);
     } catch (err) {
       console.error("Failed to fetch collection data", err);
       setError("Failed to load collection data");
@@ -32,12 +64,45 @@ const CollectionDetailsModal = ({ isOpen, onClose, collectionName }) => {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setData(prev => [...prev, ...page.documents]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.error("Failed to fetch more documents", err);
+      setError("Failed to load more documents");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const fetchDetails = async (item) => {
+    if (details[item._id]) return;
+    try {
+      const response = await axios.get(
+        `${API_URL}/collections/${encodeURIComponent(collectionName)}/documents/${item._id}`
+      );
+      setDetails(prev => ({ ...prev, [item._id]: response.data }));
+    } catch (err) {
+      console.error("Failed to fetch document", err);
+    }
+  };
+
+  const updateFilter = (field, value) => {
+    setFilters(prev => ({ ...prev, [field]: value }));
+  };
+
   const toggleExpand = (index) => {
     const newExpanded = new Set(expandedItems);
     if (newExpanded.has(index)) {
       newExpanded.delete(index);
     } else {
       newExpanded.add(index);
+      if (!isSintaJournal) {
+        fetchDetails(data[index]);
+      }
     }
     setExpandedItems(newExpanded);
   };
@@ -160,11 +225,15 @@ const CollectionDetailsModal = ({ isOpen, onClose, collectionName }) => {
               </div>
             )}
             
-            {item.results && item.results.length > 0 && (
+            {!details[item._id] && item.results_count > 0 && (
+              <div className="text-sm text-gray-500">Loading articles...</div>
+            )}
+
+            {details[item._id]?.results && details[item._id].results.length > 0 && (
               <div>
                 <div className="text-xs text-gray-500 uppercase tracking-wider mb-2">Article List</div>
                 <div className="space-y-2 bg-black/20 p-3 rounded-lg max-h-64 overflow-y-auto">
-                  {item.results.map((article, idx) => (
+                  {details[item._id].results.map((article, idx) => (
                     <div key={idx} className="text-sm text-gray-300 flex items-start gap-2">
                       <span className="text-gray-500 font-mono text-xs mt-0.5">{idx + 1}.</span>
                       <div className="flex-1">
@@ -229,11 +298,43 @@ const CollectionDetailsModal = ({ isOpen, onClose, collectionName }) => {
                 <div>
                   <h2 className="text-xl font-bold">{displayName}</h2>
                   <p className="text-sm text-gray-400">
-                    {data ? `${data.length} ${isSintaJournal ? 'journal' : 'document'}${data.length !== 1 ? 's' : ''}` : 'Loading...'}
+                    {data
+                      ? `${total ?? data.length}${total === null && nextCursor ? '+' : ''} ${isSintaJournal ? 'journal' : 'document'}${(total ?? data.length) !== 1 ? 's' : ''}`
+                      : 'Loading...'}
                   </p>
                 </div>
               </div>
 
+              {/* Filters */}
+              <div className="flex flex-wrap gap-3 mb-4">
+                <input
+                  type="text"
+                  placeholder="Journal name"
+                  value={filters.name}
+                  onChange={(e) => updateFilter('name', e.target.value)}
+                  className="flex-1 min-w-[10rem] px-3 py-2 rounded-lg bg-white/5 border border-white/10 text-sm text-white placeholder-gray-500 focus:outline-none focus:border-primary"
+                />
+                <select
+                  value={filters.sinta}
+                  onChange={(e) => updateFilter('sinta', e.target.value)}
+                  className="px-3 py-2 rounded-lg bg-white/5 border border-white/10 text-sm text-white focus:outline-none focus:border-primary"
+                >
+                  <option value="">All Sinta levels</option>
+                  {[1, 2, 3, 4, 5, 6].map(level => (
+                    <option key={level} value={level}>Sinta {level}</option>
+                  ))}
+                </select>
+                {!isSintaJournal && (
+                  <input
+                    type="text"
+                    placeholder="Query"
+                    value={filters.query}
+                    onChange={(e) => updateFilter('query', e.target.value)}
+                    className="flex-1 min-w-[10rem] px-3 py-2 rounded-lg bg-white/5 border border-white/10 text-sm text-white placeholder-gray-500 focus:outline-none focus:border-primary"
+                  />
+                )}
+              </div>
+
               {/* Content */}
               <div className="flex-1 overflow-y-auto">
                 {loading && (
@@ -255,6 +356,16 @@ const CollectionDetailsModal = ({ isOpen, onClose, collectionName }) => {
                     ) : (
                       data.map((item, index) => renderSintaArticleItem(item, index))
                     )}
+
+                    {nextCursor && (
+                      <button
+                        onClick={loadMore}
+                        disabled={loadingMore}
+                        className="w-full py-3 rounded-lg bg-white/5 hover:bg-white/10 text-sm text-gray-300 transition-colors disabled:opacity-50"
+                      >
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                      </button>
+                    )}
                   </div>
                 )}
               </div>
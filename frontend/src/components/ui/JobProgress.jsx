@@ -0,0 +1,86 @@
+import React, { useEffect, useState } from 'react';
+import { motion } from 'framer-motion';
+import { Loader, CheckCircle, XCircle, Clock } from 'lucide-react';
+
+const TERMINAL = ['completed', 'failed'];
+
+const formatSeconds = (seconds) => {
+  if (seconds == null) return '—';
+  if (seconds < 60) return `${Math.round(seconds)}s`;
+  const minutes = Math.floor(seconds / 60);
+  if (minutes < 60) return `${minutes}m ${Math.round(seconds % 60)}s`;
+  return `${Math.floor(minutes / 60)}h ${minutes % 60}m`;
+};
+
+// Follows a queued job through the API's server-sent event stream (GET /jobs/{id}/events).
+export const JobProgress = ({ jobId }) => {
+  const [event, setEvent] = useState(null);
+  const [connectionLost, setConnectionLost] = useState(false);
+
+  useEffect(() => {
+    if (!jobId) return undefined;
+    const source = new EventSource(`http://localhost:8000/jobs/${jobId}/events`);
+    source.addEventListener('progress', (e) => {
+      const data = JSON.parse(e.data);
+      setEvent(data);
+      setConnectionLost(false);
+      if (TERMINAL.includes(data.status)) source.close();
+    });
+    // EventSource reconnects by itself; just show that updates are paused meanwhile.
+    source.onerror = () => setConnectionLost(true);
+    return () => source.close();
+  }, [jobId]);
+
+  if (!event) {
+    return (
+      <div className="flex items-center gap-2 text-gray-400 text-sm">
+        <Loader className="animate-spin" size={16} /> Connecting to job {jobId}...
+      </div>
+    );
+  }
+
+  const percent = event.total ? Math.min(100, Math.round((event.done / event.total) * 100)) : null;
+  const icon = {
+    completed: <CheckCircle className="text-green-400" size={20} />,
+    failed: <XCircle className="text-red-400" size={20} />,
+    queued: <Clock className="text-gray-400" size={20} />,
+  }[event.status] || <Loader className="animate-spin text-primary" size={20} />;
+
+  return (
+    <motion.div initial={{ opacity: 0, y: 10 }} animate={{ opacity: 1, y: 0 }} className="glass-panel rounded-xl p-6 space-y-4">
+      <div className="flex items-center justify-between">
+        <div className="flex items-center gap-2 font-medium capitalize">
+          {icon} {event.status}
+        </div>
+        <span className="text-xs text-gray-500">Job {jobId}</span>
+      </div>
+
+      {percent !== null && (
+        <div>
+          <div className="h-2 rounded-full bg-white/10 overflow-hidden">
+            <div className="h-full bg-primary transition-all duration-500" style={{ width: `${percent}%` }} />
+          </div>
+          <p className="text-xs text-gray-400 mt-1">
+            {event.done} / {event.total} {event.unit} ({percent}%)
+          </p>
+        </div>
+      )}
+
+      <div className="grid grid-cols-2 md:grid-cols-5 gap-3 text-sm">
+        <div><p className="text-gray-500">Pages</p><p className="font-bold">{event.pages ?? 0}</p></div>
+        <div><p className="text-gray-500">{event.type === 'sinta' ? 'Journals' : 'Articles'}</p>
+          <p className="font-bold">{(event.type === 'sinta' ? event.journals : event.articles) ?? 0}</p></div>
+        <div><p className="text-gray-500">Errors</p><p className="font-bold">{event.errors ?? 0}</p></div>
+        <div><p className="text-gray-500">Elapsed</p><p className="font-bold">{formatSeconds(event.elapsed)}</p></div>
+        <div><p className="text-gray-500">ETA</p><p className="font-bold">{TERMINAL.includes(event.status) ? '—' : formatSeconds(event.eta)}</p></div>
+      </div>
+
+      {(event.error || event.last_error) && (
+        <p className="text-xs text-red-400 break-words">{event.error || `Last error: ${event.last_error}`}</p>
+      )}
+      {connectionLost && !TERMINAL.includes(event.status) && (
+        <p className="text-xs text-yellow-400">Connection lost, reconnecting...</p>
+      )}
+    </motion.div>
+  );
+};
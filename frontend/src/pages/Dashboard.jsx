@@ -1,7 +1,17 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import { Card } from '../components/ui/Card';
 import { Activity, Database, Server, Clock } from 'lucide-react';
+import axios from 'axios';
+
+const timeAgo = (timestamp) => {
+  if (!timestamp) return '—';
+  const seconds = Math.floor((Date.now() - new Date(timestamp).getTime()) / 1000);
+  if (seconds < 60) return 'just now';
+  if (seconds < 3600) return `${Math.floor(seconds / 60)}m ago`;
+  if (seconds < 86400) return `${Math.floor(seconds / 3600)}h ago`;
+  return `${Math.floor(seconds / 86400)}d ago`;
+};
 
 const StatCard = ({ icon: Icon, label, value, color, delay }) => (
   <Card delay={delay} className="flex items-center gap-4">
@@ -16,6 +26,30 @@ const StatCard = ({ icon: Icon, label, value, color, delay }) => (
 );
 
 const Dashboard = () => {
+  const [stats, setStats] = useState(null);
+  const [apiOnline, setApiOnline] = useState(null);
+
+  useEffect(() => {
+    // One call: the backend serves cached per-collection aggregates
+    const fetchStats = async () => {
+      try {
+        const res = await axios.get('http://localhost:8000/stats');
+        setStats(res.data);
+        setApiOnline(true);
+      } catch (error) {
+        console.error("Failed to fetch stats", error);
+        setApiOnline(false);
+      }
+    };
+    fetchStats();
+  }, []);
+
+  const totals = stats?.totals;
+  const recentCollections = (stats?.collections || [])
+    .filter(col => col.last_updated)
+    .sort((a, b) => new Date(b.last_updated) - new Date(a.last_updated))
+    .slice(0, 5);
+
   return (
     <div className="space-y-8">
       <div>
@@ -30,21 +64,28 @@ const Dashboard = () => {
       </div>
 
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
-        <StatCard icon={Database} label="Total Collections" value="12" color="indigo" delay={0.1} />
-        <StatCard icon={Activity} label="Articles Scraped" value="1,240" color="purple" delay={0.2} />
-        <StatCard icon={Server} label="API Status" value="Online" color="green" delay={0.3} />
-        <StatCard icon={Clock} label="Last Scrape" value="2h ago" color="blue" delay={0.4} />
+        <StatCard icon={Database} label="Total Collections" value={totals ? totals.collections : '—'} color="indigo" delay={0.1} />
+        <StatCard icon={Activity} label="Articles Scraped" value={totals ? totals.articles.toLocaleString() : '—'} color="purple" delay={0.2} />
+        <StatCard icon={Server} label="API Status" value={apiOnline === null ? '...' : apiOnline ? 'Online' : 'Offline'} color={apiOnline === false ? 'red' : 'green'} delay={0.3} />
+        <StatCard icon={Clock} label="Last Scrape" value={timeAgo(totals?.last_updated)} color="blue" delay={0.4} />
       </div>
 
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
         <Card delay={0.5} className="min-h-[300px]">
           <h3 className="text-xl font-semibold mb-4">Recent Activity</h3>
           <div className="space-y-4">
-            {[1, 2, 3].map((i) => (
-              <div key={i} className="flex items-center gap-3 p-3 rounded-lg bg-white/5 border border-white/5">
-                <div className="w-2 h-2 rounded-full bg-green-400" />
-                <span className="text-sm text-gray-300">Scraped Sinta Rank {i} successfully</span>
-                <span className="ml-auto text-xs text-gray-500">10:0{i} AM</span>
+            {recentCollections.length === 0 && (
+              <p className="text-sm text-gray-500">No scraped collections yet.</p>
+            )}
+            {recentCollections.map((col) => (
+              <div key={col.name} className="flex items-center gap-3 p-3 rounded-lg bg-white/5 border border-white/5">
+                <div className={`w-2 h-2 rounded-full ${col.kind === 'articles' ? 'bg-purple-400' : 'bg-green-400'}`} />
+                <span className="text-sm text-gray-300">
+                  {col.name.replace(/_/g, ' ')}: {col.kind === 'articles'
+                    ? `${col.articles.toLocaleString()} articles in ${col.documents} journals`
+                    : `${col.documents.toLocaleString()} journals`}
+                </span>
+                <span className="ml-auto text-xs text-gray-500">{timeAgo(col.last_updated)}</span>
               </div>
             ))}
           </div>
@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { motion } from 'framer-motion';
 import { Card } from '../components/ui/Card';
+import { JobProgress } from '../components/ui/JobProgress';
 import { Play, Loader } from 'lucide-react';
 import axios from 'axios';
 
@@ -27,6 +28,7 @@ const ScrapeSinta = () => {
     overwrite: false
   });
   const [response, setResponse] = useState(null);
+  const [jobId, setJobId] = useState(null);
 
   const handleRankChange = (rank) => {
     setFormData(prev => {
@@ -50,9 +52,11 @@ const ScrapeSinta = () => {
     e.preventDefault();
     setLoading(true);
     setResponse(null);
+    setJobId(null);
     try {
       const res = await axios.post('http://localhost:8000/scrape/sinta', formData);
       setResponse({ type: 'success', message: res.data.message });
+      setJobId(res.data.job_id);
     } catch (error) {
       setResponse({ type: 'error', message: error.message });
     } finally {
@@ -187,6 +191,8 @@ const ScrapeSinta = () => {
           {response.message}
         </motion.div>
       )}
+
+      {jobId && <JobProgress jobId={jobId} />}
     </div>
   );
 };
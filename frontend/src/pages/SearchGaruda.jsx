@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import { Card } from '../components/ui/Card';
+import { JobProgress } from '../components/ui/JobProgress';
 import { Search, Loader, Database } from 'lucide-react';
 import axios from 'axios';
 
@@ -12,6 +13,7 @@ const SearchGaruda = () => {
     source_collection: ''
   });
   const [response, setResponse] = useState(null);
+  const [jobId, setJobId] = useState(null);
 
   useEffect(() => {
     // Fetch available collections for the dropdown
@@ -37,9 +39,11 @@ const SearchGaruda = () => {
     e.preventDefault();
     setLoading(true);
     setResponse(null);
+    setJobId(null);
     try {
       const res = await axios.post('http://localhost:8000/scrape/garuda', formData);
       setResponse({ type: 'success', message: res.data.message });
+      setJobId(res.data.job_id);
     } catch (error) {
       setResponse({ type: 'error', message: error.message });
     } finally {
@@ -121,6 +125,8 @@ const SearchGaruda = () => {
           {response.message}
         </motion.div>
       )}
+
+      {jobId && <JobProgress jobId={jobId} />}
     </div>
   );
 };
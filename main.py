@@ -3,6 +3,7 @@ import argparse
 import subprocess
 import sys
 import os
+import multiprocessing
 
 def run_cli():
     """Runs the command-line interface."""
@@ -16,13 +17,40 @@ def run_api():
     print("Starting FastAPI server...")
     subprocess.run([sys.executable, "-m", "uvicorn", "api.main:app", "--host", "0.0.0.0", "--port", "8000"])
 
+def run_worker(processes=1, job_types=None):
+    """Runs queue workers that execute scrape jobs submitted through the API."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from scraper import worker
+    if processes <= 1:
+        worker.run_worker(job_types)
+        return
+    print(f"Starting {processes} worker processes...")
+    children = [multiprocessing.Process(target=worker.run_worker, args=(job_types,)) for _ in range(processes)]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+
+def run_scheduler():
+    """Runs the scheduler that queues recurring crawls within the hourly request budget."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from scraper import scheduler
+    scheduler.run_scheduler()
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Journal Scraper Project Entry Point")
-    parser.add_argument("mode", choices=["cli", "api"], help="Choose to run the CLI or the API server.")
-    
+    parser.add_argument("mode", choices=["cli", "api", "worker", "scheduler"], help="Choose to run the CLI, the API server, a job worker or the crawl scheduler.")
+    parser.add_argument("--processes", type=int, default=1, help="worker: number of worker processes to start.")
+    parser.add_argument("--types", help="worker: comma-separated job types to take (sinta,garuda,garuda_batch,garuda_distributed,garuda_shard,reindex,pdf_harvest,scheduled_crawl). Default: all.")
+
     args = parser.parse_args()
 
     if args.mode == "cli":
         run_cli()
     elif args.mode == "api":
         run_api()
+    elif args.mode == "worker":
+        job_types = [t.strip() for t in args.types.split(",") if t.strip()] if args.types else None
+        run_worker(args.processes, job_types)
+    elif args.mode == "scheduler":
+        run_scheduler()
@@ -0,0 +1,328 @@
+# article_store.py
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from pymongo import UpdateOne, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, CollectionInvalid
+
+from . import config
+from . import database
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Normalized storage of Garuda search results (ARTICLE_STORAGE=normalized):
+# - ARTICLES_STORE_COLLECTION holds every article once, keyed by `article_id`;
+# - ARTICLE_HITS_COLLECTION holds one small document per (results collection, journal, article);
+# - each articles_<source>_<query> name is a read-only view that rebuilds the embedded
+#   {journal_name, sinta_level, garuda_link, query, results_count, results} documents.
+ARTICLE_KEYS = [("article_id", ASCENDING)]
+HIT_KEYS = [("collection", ASCENDING), ("garuda_link", ASCENDING), ("article_id", ASCENDING)]
+# Serves the view's match and sort: newest batch first, page order within a batch.
+HIT_ORDER_KEYS = [("collection", ASCENDING), ("garuda_link", ASCENDING), ("batch", DESCENDING), ("position", ASCENDING)]
+
+
+def article_id(article, garuda_link):
+    """The download link, or a hash of the journal and title for articles without one."""
+    if article.get("download_link"):
+        return article["download_link"]
+    digest = hashlib.sha1(f"{garuda_link}\0{article.get('title')}".encode("utf-8")).hexdigest()
+    return f"title:{digest}"
+
+
+def _collections():
+    db = database.get_db()
+    articles = db[config.ARTICLES_STORE_COLLECTION]
+    hits = db[config.ARTICLE_HITS_COLLECTION]
+    database.ensure_indexes(articles, ARTICLE_KEYS)
+    database.ensure_indexes(hits, HIT_KEYS)
+    database.ensure_indexes(hits, HIT_ORDER_KEYS, unique=False)
+    return articles, hits
+
+
+def view_pipeline(collection_name, match=None):
+    """
+    Aggregation that rebuilds the embedded result documents of one results collection.
+    `match` narrows the hits first, e.g. to one journal, so only its articles are looked up.
+    """
+    return [
+        {"$match": {"collection": collection_name, **(match or {})}},
+        {"$sort": {"garuda_link": 1, "batch": -1, "position": 1}},
+        {"$lookup": {
+            "from": config.ARTICLES_STORE_COLLECTION,
+            "localField": "article_id",
+            "foreignField": "article_id",
+            "as": "article",
+        }},
+        {"$unwind": "$article"},
+        {"$group": {
+            "_id": {"garuda_link": "$garuda_link", "query": "$query"},
+            # The oldest hit's id is stable across refreshes and keeps _id keyset paging working.
+            "doc_id": {"$min": "$_id"},
+            "journal_name": {"$first": "$journal_name"},
+            "sinta_level": {"$first": "$sinta_level"},
+            "results": {"$push": {"title": "$article.title", "download_link": "$article.download_link", "pdf": "$article.pdf"}},
+        }},
+        {"$project": {
+            "_id": "$doc_id",
+            "journal_name": 1,
+            "sinta_level": 1,
+            "garuda_link": "$_id.garuda_link",
+            "query": "$_id.query",
+            "results_count": {"$size": "$results"},
+            "results": 1,
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+
+
+def _summary_pipeline(collection_name, filters):
+    match = {"collection": collection_name}
+    if "query" in filters:
+        match["query"] = filters["query"]  # part of the group key, so it can narrow the hits first
+    return [
+        {"$match": match},
+        {"$sort": {"garuda_link": 1, "batch": -1, "position": 1}},
+        {"$group": {
+            "_id": {"garuda_link": "$garuda_link", "query": "$query"},
+            "doc_id": {"$min": "$_id"},
+            "journal_name": {"$first": "$journal_name"},
+            "sinta_level": {"$first": "$sinta_level"},
+            "results_count": {"$sum": 1},
+        }},
+        {"$project": {
+            "_id": "$doc_id",
+            "journal_name": 1,
+            "sinta_level": 1,
+            "garuda_link": "$_id.garuda_link",
+            "query": "$_id.query",
+            "results_count": 1,
+        }},
+        {"$match": filters},
+    ]
+
+
+def summaries(collection_name, filters=None, limit=None):
+    """
+    The view's documents without their `results`, ordered by _id, built from the hits alone:
+    no article is looked up, so `filters` (on the view's fields, the _id cursor included)
+    and `limit` are applied before anything is read from the article store.
+    """
+    _, hits = _collections()
+    pipeline = _summary_pipeline(collection_name, filters or {}) + [{"$sort": {"_id": 1}}]
+    if limit is not None:
+        pipeline.append({"$limit": limit})
+    return list(hits.aggregate(pipeline, allowDiskUse=True))
+
+
+def count_documents(collection_name):
+    """Number of documents of the view, counted on the hits."""
+    _, hits = _collections()
+    result = next(hits.aggregate(_summary_pipeline(collection_name, {}) + [{"$count": "documents"}], allowDiskUse=True), None)
+    return result["documents"] if result is not None else 0
+
+
+def find_document(collection_name, document_id):
+    """One document of the view, looking up only the articles of the journal it belongs to."""
+    _, hits = _collections()
+    hit = hits.find_one({"_id": document_id, "collection": collection_name}, {"garuda_link": 1, "query": 1})
+    if hit is None:
+        return None
+    match = {"garuda_link": hit["garuda_link"], "query": hit["query"]}
+    pipeline = view_pipeline(collection_name, match) + [{"$match": {"_id": document_id}}]
+    return next(hits.aggregate(pipeline), None)
+
+
+def _view_info(collection_name):
+    db = database.get_db()
+    info = next(db.list_collections(filter={"name": collection_name}), None)
+    return info if info is not None and info.get("type") == "view" else None
+
+
+def is_view(collection_name):
+    return _view_info(collection_name) is not None
+
+
+def ensure_view(collection_name):
+    """
+    Creates the compatibility view of a results collection, or updates one created with an
+    older pipeline. Returns False if a regular collection already has that name; migrate()
+    converts one.
+    """
+    db = database.get_db()
+    info = _view_info(collection_name)
+    if info is not None:
+        pipeline = view_pipeline(collection_name)
+        if info.get("options", {}).get("pipeline") != pipeline:
+            db.command("collMod", collection_name, viewOn=config.ARTICLE_HITS_COLLECTION, pipeline=pipeline)
+        return True
+    if collection_name in db.list_collection_names():
+        logger.warning("⚠️ '%s' holds embedded results. Run article_store.migrate('%s') to normalize it.", collection_name, collection_name)
+        return False
+    try:
+        db.create_collection(collection_name, viewOn=config.ARTICLE_HITS_COLLECTION, pipeline=view_pipeline(collection_name))
+    except CollectionInvalid:
+        pass  # created meanwhile by another worker
+    return True
+
+
+class ArticleStoreWriter:
+    """
+    Drop-in for the BulkUpserter of a results collection. Every journal's result entry is
+    split into article upserts and hit upserts, buffered, and written with unordered bulk
+    writes; a journal is always written within a single flush. A full search replaces the
+    journal's hits (hits of earlier batches that it did not see are removed after the flush);
+    an incremental one adds a newer batch, which the view lists first.
+    `on_flush` gets {"garuda_link", "query"} filters like the BulkUpserter's.
+    """
+
+    def __init__(self, collection_name, batch_size=config.BULK_BATCH_SIZE, flush_interval=config.BULK_FLUSH_INTERVAL, on_flush=None):
+        self.collection_name = collection_name
+        self.articles, self.hits = _collections()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.inserted = 0
+        self.modified = 0
+        self.unchanged = 0
+        self._article_ops = []
+        self._hit_ops = []
+        self._journals = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def save_results(self, entry, replace=True):
+        """Queues one (journal, query) result entry, as built by JournalSearch.result_entry()."""
+        garuda_link = entry["garuda_link"]
+        now = datetime.now(timezone.utc)
+        article_ops, hit_ops = [], []
+        for position, article in enumerate(entry["results"]):
+            key = article_id(article, garuda_link)
+            article_ops.append(UpdateOne(
+                {"article_id": key},
+                {"$setOnInsert": {
+                    "article_id": key,
+                    "title": article.get("title"),
+                    "download_link": article.get("download_link"),
+                    "garuda_link": garuda_link,
+                    "first_seen_at": now,
+                }},
+                upsert=True,
+            ))
+            hit_ops.append(UpdateOne(
+                {"collection": self.collection_name, "garuda_link": garuda_link, "article_id": key},
+                {"$set": {
+                    "query": entry["query"],
+                    "journal_name": entry["journal_name"],
+                    "sinta_level": entry["sinta_level"],
+                    "article_key": database.article_key(article),
+                    "batch": now,
+                    "position": position,
+                }},
+                upsert=True,
+            ))
+        with self._lock:
+            self._article_ops.extend(article_ops)
+            self._hit_ops.extend(hit_ops)
+            self._journals.append({"garuda_link": garuda_link, "query": entry["query"], "batch": now, "replace": replace})
+            due = (
+                len(self._hit_ops) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            article_ops, self._article_ops = self._article_ops, []
+            hit_ops, self._hit_ops = self._hit_ops, []
+            journals, self._journals = self._journals, []
+            self._last_flush = time.monotonic()
+        if not journals:
+            return
+
+        # Articles first, so a hit never points at a missing article.
+        metrics.persist_operations.inc(len(article_ops) + len(hit_ops), writer="article_store")
+        try:
+            with metrics.persist_seconds.time(writer="article_store"):
+                if article_ops:
+                    self.articles.bulk_write(article_ops, ordered=False)
+                details = self.hits.bulk_write(hit_ops, ordered=False).bulk_api_result if hit_ops else None
+        except BulkWriteError as e:
+            # Journals are not reported as written, so their checkpoints keep them for a rerun.
+            logger.warning("⚠️ %d writes to the article store failed: %s", len(e.details["writeErrors"]), e.details["writeErrors"][0]["errmsg"])
+            return
+
+        for journal in journals:
+            if journal["replace"]:
+                self.hits.delete_many({
+                    "collection": self.collection_name,
+                    "garuda_link": journal["garuda_link"],
+                    "batch": {"$lt": journal["batch"]},
+                })
+
+        if details is not None:
+            with self._lock:
+                self.inserted += details["nUpserted"]
+                self.modified += details["nModified"]
+                self.unchanged += details["nMatched"] - details["nModified"]
+        database.collection_changed(self.collection_name)
+        if self.on_flush is not None:
+            self.on_flush([{"garuda_link": j["garuda_link"], "query": j["query"]} for j in journals])
+
+    @property
+    def changed(self):
+        return self.inserted + self.modified
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+
+
+def writer(collection_name, on_flush=None):
+    """Returns an ArticleStoreWriter for a results collection, or None if its view cannot be used."""
+    if database.get_db() is None:
+        logger.warning("💔 Cannot save, no database connection.")
+        return None
+    if not ensure_view(collection_name):
+        return None
+    return ArticleStoreWriter(collection_name, on_flush=on_flush)
+
+
+def known_articles(collection_name, query):
+    """Same as database.get_known_articles, read from the hits without rebuilding the view."""
+    _, hits = _collections()
+    known = {}
+    for hit in hits.find({"collection": collection_name, "query": query}, {"garuda_link": 1, "article_key": 1}):
+        known.setdefault(hit["garuda_link"], set()).add(hit["article_key"])
+    return known
+
+
+def forget(collection_name):
+    """Removes the hits of a dropped results collection. Articles stay, other queries may share them."""
+    _, hits = _collections()
+    hits.delete_many({"collection": collection_name})
+
+
+def migrate(collection_name):
+    """Moves an embedded results collection into the article store and replaces it with its view."""
+    db = database.get_db()
+    if db is None or is_view(collection_name) or collection_name not in db.list_collection_names():
+        logger.error("❌ '%s' is not an embedded results collection.", collection_name)
+        return 0
+    store = ArticleStoreWriter(collection_name)
+    staging = f"{config.INTERNAL_COLLECTION_PREFIX}migrating_{collection_name}"
+    with store:
+        for doc in db[collection_name].find({}):
+            store.save_results(doc)
+    # Renamed, not dropped, until the view exists, so a failure loses nothing.
+    db[collection_name].rename(staging)
+    ensure_view(collection_name)
+    db[staging].drop()
+    logger.info("✅ Migrated '%s': %s article hits stored.", collection_name, store.inserted)
+    return store.inserted
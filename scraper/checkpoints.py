@@ -0,0 +1,119 @@
+# checkpoints.py
+import threading
+import time
+from datetime import datetime, timezone
+from pymongo import UpdateOne, ASCENDING
+
+from . import config
+from . import database
+
+CHECKPOINT_KEYS = [("source_collection", ASCENDING), ("query", ASCENDING), ("garuda_link", ASCENDING)]
+
+
+class Checkpointer:
+    """
+    Persists the progress of one Garuda search job, identified by (source collection, query),
+    with one document per journal:
+    - `next_page` and the `results` gathered so far, so a restarted job resumes in the middle
+      of a journal. Each fetched page pushes only its own articles, and these updates are
+      written in bulk like the results (every BULK_BATCH_SIZE pages or BULK_FLUSH_INTERVAL
+      seconds), so a crash loses at most the last few pages of progress;
+    - `done`, set once the journal's results are safely in the results collection (after the
+      bulk writer flushed them), so a restarted job skips the journal entirely.
+    Call flush() when the search ends, to keep the progress of journals that did not finish.
+    """
+
+    def __init__(self, source_collection, query):
+        self.source_collection = source_collection
+        self.query = query
+        self.collection = database.get_db()[config.GARUDA_CHECKPOINTS_COLLECTION]
+        database.ensure_indexes(self.collection, CHECKPOINT_KEYS)
+        self._finished = set()
+        self._pages = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        # Held while writing, so page updates of one journal never overtake each other.
+        self._write_lock = threading.Lock()
+
+    def _key(self, garuda_link):
+        return {"source_collection": self.source_collection, "query": self.query, "garuda_link": garuda_link}
+
+    def load(self):
+        """Returns the saved checkpoints of this job, keyed by garuda_link."""
+        return {
+            doc["garuda_link"]: doc
+            for doc in self.collection.find({"source_collection": self.source_collection, "query": self.query})
+        }
+
+    def clear(self):
+        with self._lock:
+            self._pages = []
+        self.collection.delete_many({"source_collection": self.source_collection, "query": self.query})
+
+    def forget(self, garuda_links):
+        """Drops the checkpoints of some journals, so the next search starts them afresh."""
+        self.flush()
+        self.collection.delete_many({
+            "source_collection": self.source_collection, "query": self.query, "garuda_link": {"$in": list(garuda_links)},
+        })
+
+    def page_done(self, search, page_articles):
+        """Records that `search` fetched a page with `page_articles`; it resumes at `search.page`."""
+        op = UpdateOne(
+            self._key(search.garuda_link),
+            {
+                "$set": {"next_page": search.page, "done": False, "updated_at": datetime.now(timezone.utc)},
+                "$push": {"results": {"$each": page_articles}},
+            },
+            upsert=True,
+        )
+        with self._lock:
+            self._pages.append(op)
+            due = (
+                len(self._pages) >= config.BULK_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= config.BULK_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self, then=()):
+        """Writes the pending page updates, in order, followed by the operations in `then`."""
+        with self._write_lock:
+            with self._lock:
+                ops, self._pages = self._pages, []
+                self._last_flush = time.monotonic()
+            ops += list(then)
+            if ops:
+                self.collection.bulk_write(ops, ordered=True)
+
+    def journal_finished(self, search, persisted=False):
+        """
+        Records that `search` walked all of its pages. Unless its results are already
+        persisted (or there were none), it only counts as done after `on_flush` sees it.
+        Failed searches are never marked done, so a rerun retries them.
+        """
+        if search.failed:
+            return
+        if persisted:
+            self._mark_done([search.garuda_link])
+            return
+        with self._lock:
+            self._finished.add(search.garuda_link)
+
+    def on_flush(self, key_filters):
+        """BulkUpserter callback: marks finished journals whose results were just written as done."""
+        links = [f["garuda_link"] for f in key_filters]
+        with self._lock:
+            done = [link for link in links if link in self._finished]
+            self._finished.difference_update(done)
+        self._mark_done(done)
+
+    def _mark_done(self, garuda_links):
+        if not garuda_links:
+            return
+        now = datetime.now(timezone.utc)
+        # After the pending pages, so none of them can reopen a journal marked done.
+        self.flush([
+            UpdateOne(self._key(link), {"$set": {"done": True, "results": [], "updated_at": now}}, upsert=True)
+            for link in garuda_links
+        ])
@@ -0,0 +1,69 @@
+# concurrency.py
+import asyncio
+import contextlib
+import threading
+from urllib.parse import urlparse
+
+
+class HostLimiter:
+    """
+    Bounds in-flight requests with a global cap and a per-host cap.
+    Pacing is left to the HTTP client's adaptive rate limiter.
+    Must be created and used inside a single running event loop.
+    """
+
+    def __init__(self, max_concurrency, per_host_concurrency):
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._per_host_concurrency = per_host_concurrency
+        self._hosts = {}
+
+    def _host(self, url):
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self._per_host_concurrency)
+        return self._hosts[host]
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url):
+        """Waits until a request to `url` is allowed, and holds the slot while it runs."""
+        async with self._global, self._host(url):
+            yield
+
+
+class ThreadHostLimiter:
+    """Per-host cap on in-flight requests for code that fetches from plain threads."""
+
+    def __init__(self, per_host_concurrency):
+        self._per_host_concurrency = per_host_concurrency
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.Semaphore(self._per_host_concurrency)
+            semaphore = self._hosts[host]
+        with semaphore:
+            yield
+
+
+async def run_worker_pool(items, handler, workers):
+    """
+    Feeds `items` to `workers` coroutines that each await `handler(item)` one at a time.
+    Exceptions raised by the handler are left to the handler to report.
+    """
+    queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+
+    async def worker():
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await handler(item)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
@@ -13,6 +13,18 @@ except ImportError:
     # python-dotenv not installed, will use system environment variables only
     pass
 
+# HTTP Cache Configuration
+# Mode: "on" (serve fresh entries, revalidate stale ones), "replay" (offline, cached pages only) or "off".
+HTTP_CACHE_MODE = os.getenv("HTTP_CACHE_MODE", "on")
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".http_cache")
+HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", "3600"))  # seconds
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# HTML parser backend: "bs4" (full BeautifulSoup tree), "strainer" (BeautifulSoup limited to
+# the item containers) or "lxml" (libxml2 + precompiled XPath, fastest). All give the same output;
+# `python -m benchmarks.parser_benchmark` compares them on stored pages.
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "lxml")
+
 # Sinta Scraper Configuration
 SINTA_BASE_URL = os.getenv("SINTA_BASE_URL", "https://sinta.kemdiktisaintek.go.id/journals/index")
 SINTA_HEADERS = {
@@ -25,14 +37,135 @@ SINTA_HEADERS = {
     "Connection": "keep-alive",
 }
 
+# Parallel listing mode: pages fetched at once.
+SINTA_MAX_CONCURRENCY = int(os.getenv("SINTA_MAX_CONCURRENCY", "4"))
+
 # Garuda Scraper Configuration
-GARUDA_SEARCH_URL = os.getenv("GARUDA_SEARCH_URL", "https://garuda.kemdikbud.go.id/journal/view")
+# Journal links on Sinta pages are recognised as Garuda links by this host.
+GARUDA_HOST = os.getenv("GARUDA_HOST", "garuda.kemdikbud.go.id")
+GARUDA_SEARCH_URL = os.getenv("GARUDA_SEARCH_URL", f"https://{GARUDA_HOST}/journal/view")
+# Concurrent search mode: journals searched at once and requests in flight per host.
+GARUDA_MAX_CONCURRENCY = int(os.getenv("GARUDA_MAX_CONCURRENCY", "8"))
+GARUDA_PER_HOST_CONCURRENCY = int(os.getenv("GARUDA_PER_HOST_CONCURRENCY", "4"))
+# Pipeline search mode: parser threads, and pages buffered between two stages.
+GARUDA_PIPELINE_PARSE_WORKERS = int(os.getenv("GARUDA_PIPELINE_PARSE_WORKERS", "2"))
+GARUDA_PIPELINE_QUEUE_SIZE = int(os.getenv("GARUDA_PIPELINE_QUEUE_SIZE", "16"))
+# Distributed search: default shards per search, seconds a worker holds a shard without
+# renewing its lease, and seconds between checks while other workers finish their shards.
+GARUDA_SHARD_COUNT = int(os.getenv("GARUDA_SHARD_COUNT", "16"))
+GARUDA_SHARD_LEASE = float(os.getenv("GARUDA_SHARD_LEASE", "120"))
+GARUDA_SHARD_POLL_INTERVAL = float(os.getenv("GARUDA_SHARD_POLL_INTERVAL", "5"))
+
+# PDF harvesting: files are stored once per content hash under PDF_DIR/<sha256[:2]>/.
+PDF_DIR = os.getenv("PDF_DIR", "pdfs")
+# Downloads in flight overall and per host, and bytes read per chunk.
+PDF_DOWNLOAD_CONCURRENCY = int(os.getenv("PDF_DOWNLOAD_CONCURRENCY", "8"))
+PDF_PER_HOST_CONCURRENCY = int(os.getenv("PDF_PER_HOST_CONCURRENCY", "2"))
+PDF_CHUNK_SIZE = int(os.getenv("PDF_CHUNK_SIZE", str(64 * 1024)))
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(50 * 1024 * 1024)))  # larger files are skipped
+# Text extraction processes (one core each), and PDFs a process handles before it is replaced.
+PDF_EXTRACT_PROCESSES = int(os.getenv("PDF_EXTRACT_PROCESSES", "1"))
+PDF_EXTRACT_TASKS_PER_CHILD = int(os.getenv("PDF_EXTRACT_TASKS_PER_CHILD", "200"))
+PDF_MAX_TEXT_CHARS = int(os.getenv("PDF_MAX_TEXT_CHARS", "1000000"))  # keeps text documents far below 16 MB
+PDF_MAX_ATTEMPTS = int(os.getenv("PDF_MAX_ATTEMPTS", "3"))  # failed links are retried on later runs until then
+
+# HTTP client shared by the scrapers
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+# Connection pool: hosts kept, and connections kept per host (at least the largest concurrency).
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", str(max(SINTA_MAX_CONCURRENCY, GARUDA_MAX_CONCURRENCY))))
+# Retries on 429/5xx/timeouts, with exponential backoff and jitter (seconds).
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "4"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "1"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "60"))
+# Adaptive (AIMD) pacing per host, in requests/second: start, floor, ceiling,
+# added after each success, and multiplier after each error.
+HTTP_RATE_INITIAL = float(os.getenv("HTTP_RATE_INITIAL", "1"))
+HTTP_RATE_MIN = float(os.getenv("HTTP_RATE_MIN", "0.2"))
+HTTP_RATE_MAX = float(os.getenv("HTTP_RATE_MAX", "8"))
+HTTP_RATE_INCREASE = float(os.getenv("HTTP_RATE_INCREASE", "0.1"))
+HTTP_RATE_DECREASE = float(os.getenv("HTTP_RATE_DECREASE", "0.5"))
 
 # MongoDB Configuration
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 MONGO_DATABASE = os.getenv("MONGO_DATABASE", "journal_scraper")
+# Connection pool per process, and timeouts in milliseconds. The API also runs its queries on
+# API_DB_THREADS threads of its own, so keep MONGO_MAX_POOL_SIZE at least that large.
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "32"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000"))
+# Seconds to wait before trying again after a failed connection; until then get_db() returns None at once.
+MONGO_RETRY_INTERVAL = float(os.getenv("MONGO_RETRY_INTERVAL", "10"))
+API_DB_THREADS = int(os.getenv("API_DB_THREADS", "16"))
 SINTA_JOURNALS_COLLECTION = os.getenv("SINTA_JOURNALS_COLLECTION", "sinta_journals")
 GARUDA_ARTICLES_COLLECTION = os.getenv("GARUDA_ARTICLES_COLLECTION", "garuda_articles")
+# Internal bookkeeping collections start with this prefix and are hidden from collection listings.
+INTERNAL_COLLECTION_PREFIX = "_"
+GARUDA_CHECKPOINTS_COLLECTION = os.getenv("GARUDA_CHECKPOINTS_COLLECTION", "_garuda_checkpoints")
+GARUDA_SHARDS_COLLECTION = os.getenv("GARUDA_SHARDS_COLLECTION", "_garuda_shards")
+# Garuda results storage: "embedded" (one document per journal and query with all its articles)
+# or "normalized" (articles stored once, per-query hits, and a view per results collection).
+ARTICLE_STORAGE = os.getenv("ARTICLE_STORAGE", "embedded")
+ARTICLES_STORE_COLLECTION = os.getenv("ARTICLES_STORE_COLLECTION", "_articles")
+ARTICLE_HITS_COLLECTION = os.getenv("ARTICLE_HITS_COLLECTION", "_article_hits")
+# Local keyword index over stored articles, and when each journal was last searched on Garuda.
+SEARCH_INDEX_COLLECTION = os.getenv("SEARCH_INDEX_COLLECTION", "_search_index")
+JOURNAL_CRAWLS_COLLECTION = os.getenv("JOURNAL_CRAWLS_COLLECTION", "_journal_crawls")
+SEARCH_RESULTS_LIMIT = int(os.getenv("SEARCH_RESULTS_LIMIT", "50"))
+# Harvested PDFs: one document per download link, and one extracted text per file content.
+PDFS_COLLECTION = os.getenv("PDFS_COLLECTION", "_pdfs")
+PDF_TEXTS_COLLECTION = os.getenv("PDF_TEXTS_COLLECTION", "_pdf_texts")
+# Job queue: collections, max running jobs per type across all workers, and timings in seconds.
+JOBS_COLLECTION = os.getenv("JOBS_COLLECTION", "_jobs")
+JOB_SLOTS_COLLECTION = os.getenv("JOB_SLOTS_COLLECTION", "_job_slots")
+JOB_CONCURRENCY = os.getenv("JOB_CONCURRENCY", "sinta=1,garuda=2,garuda_batch=1,garuda_distributed=1,garuda_shard=16")
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "15"))
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "90"))  # no heartbeat for this long: requeue
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Job progress events: capped collection (size in MB) tailed by the API's event streams,
+# and the minimum seconds between two progress events of a running job.
+JOB_EVENTS_COLLECTION = os.getenv("JOB_EVENTS_COLLECTION", "_job_events")
+JOB_EVENTS_SIZE_MB = int(os.getenv("JOB_EVENTS_SIZE_MB", "16"))
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "1"))
+# Crawl scheduler: standing schedules, per-item freshness, requests it may spend per hour,
+# seconds between planning rounds, the change interval assumed before any is observed,
+# seconds after which a queued item that was never crawled is planned again, and the
+# estimated requests of a (journal, query) pair never crawled.
+SCHEDULES_COLLECTION = os.getenv("SCHEDULES_COLLECTION", "_schedules")
+CRAWL_FRESHNESS_COLLECTION = os.getenv("CRAWL_FRESHNESS_COLLECTION", "_crawl_freshness")
+SCHEDULER_REQUEST_BUDGET = float(os.getenv("SCHEDULER_REQUEST_BUDGET", "600"))
+SCHEDULER_TICK = float(os.getenv("SCHEDULER_TICK", "60"))
+SCHEDULER_PRIOR_CHANGE_INTERVAL = float(os.getenv("SCHEDULER_PRIOR_CHANGE_INTERVAL", "604800"))
+SCHEDULER_RETRY_AFTER = float(os.getenv("SCHEDULER_RETRY_AFTER", "21600"))
+SCHEDULER_GARUDA_DEFAULT_COST = int(os.getenv("SCHEDULER_GARUDA_DEFAULT_COST", "2"))
+# Bulk writes: operations per batch, and seconds after which a partial batch is flushed.
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+BULK_FLUSH_INTERVAL = float(os.getenv("BULK_FLUSH_INTERVAL", "5"))
+# Streaming exports: documents fetched per cursor batch, and documents serialized per chunk.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "100"))
+# CSV/Parquet exports: rows per Parquet row group (and rows held in memory), and Parquet codec.
+EXPORT_ROW_GROUP_SIZE = int(os.getenv("EXPORT_ROW_GROUP_SIZE", "50000"))
+EXPORT_PARQUET_COMPRESSION = os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")
+# Collection browsing: default and maximum documents per page.
+BROWSE_PAGE_SIZE = int(os.getenv("BROWSE_PAGE_SIZE", "50"))
+BROWSE_MAX_PAGE_SIZE = int(os.getenv("BROWSE_MAX_PAGE_SIZE", "200"))
+# Collection stats: cache collection, and how often stats of a collection being written are recomputed (seconds).
+STATS_COLLECTION = os.getenv("STATS_COLLECTION", "_collection_stats")
+STATS_REFRESH_INTERVAL = float(os.getenv("STATS_REFRESH_INTERVAL", "30"))
+# Worker metrics shared with the API's /metrics: collection, push interval, and how long
+# a worker that stopped pushing stays listed (seconds).
+METRICS_COLLECTION = os.getenv("METRICS_COLLECTION", "_worker_metrics")
+METRICS_PUSH_INTERVAL = float(os.getenv("METRICS_PUSH_INTERVAL", "15"))
+METRICS_RETENTION = float(os.getenv("METRICS_RETENTION", "3600"))
+
+# Logging: level (DEBUG shows every page fetched and parsed), and "text" or "json" lines.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
 
 # Security Configuration
 DELETE_PASSWORD = os.getenv("DELETE_PASSWORD", "admin123")  # Default: admin123 (CHANGE IN PRODUCTION!)
@@ -1,72 +1,374 @@
 # database.py
 import json
-from pymongo import MongoClient
+import logging
+import re
+import threading
+import time
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import MongoClient, UpdateOne, ASCENDING
+from pymongo.errors import BulkWriteError, OperationFailure
 from . import config
+from . import metrics
+
+logger = logging.getLogger(__name__)
 
 _db = None
+_last_failure = None
+_connect_lock = threading.Lock()
+
+# Unique keys the upserts into each kind of collection match on.
+SINTA_JOURNAL_KEYS = [("sinta_link", ASCENDING)]
+GARUDA_ARTICLE_KEYS = [("garuda_link", ASCENDING), ("query", ASCENDING)]
+
+_indexed = set()
+_indexed_lock = threading.Lock()
 
 def get_db():
-    """Returns a singleton database instance."""
-    global _db
-    if _db is None:
+    """
+    Returns a singleton database instance, or None if MongoDB cannot be reached. The
+    connection is made on first use; after a failure, calls return None without waiting
+    on another attempt until MONGO_RETRY_INTERVAL seconds have passed.
+    """
+    global _db, _last_failure
+    if _db is not None:
+        return _db
+    with _connect_lock:
+        if _db is not None:
+            return _db
+        if _last_failure is not None and time.monotonic() - _last_failure < config.MONGO_RETRY_INTERVAL:
+            return None
         try:
-            client = MongoClient(config.MONGO_URI, serverSelectionTimeoutMS=5000)
+            client = MongoClient(
+                config.MONGO_URI,
+                maxPoolSize=config.MONGO_MAX_POOL_SIZE,
+                minPoolSize=config.MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=config.MONGO_MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=config.MONGO_CONNECT_TIMEOUT_MS,
+                waitQueueTimeoutMS=config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            )
             # The ismaster command is cheap and does not require auth.
             client.admin.command('ismaster')
             _db = client[config.MONGO_DATABASE]
-            print("✅ MongoDB connection successful.")
+            _last_failure = None
+            logger.info("✅ MongoDB connection successful.")
         except Exception as e:
-            print(f"❌ Could not connect to MongoDB: {e}")
-            _db = None
+            logger.error("❌ Could not connect to MongoDB: %s", e)
+            _last_failure = time.monotonic()
     return _db
 
+
+def ping():
+    """Round trip of a ping to MongoDB, in seconds. Raises ConnectionError if it cannot be reached."""
+    db = get_db()
+    if db is None:
+        raise ConnectionError("No MongoDB connection.")
+    start = time.perf_counter()
+    db.command("ping")
+    return time.perf_counter() - start
+
 def list_collections():
-    """Returns a list of all non-system collections in the database."""
+    """Returns a list of all user-facing collections, leaving out system and internal bookkeeping collections."""
     db = get_db()
     if db is None:
         return []
-    return [name for name in db.list_collection_names() if not name.startswith('system.')]
+    return [
+        name for name in db.list_collection_names()
+        if not name.startswith('system.') and not name.startswith(config.INTERNAL_COLLECTION_PREFIX)
+    ]
 
 
-def save_sinta_journals(journals, collection_name, overwrite=False):
-    """Saves a list of Sinta journals to a specified collection, with an option to overwrite."""
+def ensure_indexes(collection, keys, unique=True):
+    """Creates an index on `keys` (by default the unique index upserts rely on), once per collection and process."""
+    marker = (collection.name, tuple(keys))
+    with _indexed_lock:
+        if marker in _indexed:
+            return
+        _indexed.add(marker)
+    try:
+        collection.create_index(keys, unique=unique)
+    except OperationFailure as e:
+        # Usually existing duplicates; upserts still work, just without the index.
+        logger.warning("⚠️ Could not create %sindex %s on '%s': %s", "unique " if unique else "", [k for k, _ in keys], collection.name, e)
+
+
+class BulkUpserter:
+    """
+    Buffers upserts for one collection and writes them with unordered bulk_write.
+    A flush happens when `batch_size` operations are pending, or when a record is
+    added more than `flush_interval` seconds after the previous flush.
+    Use it as a context manager so the last partial batch is flushed. Thread-safe.
+    `on_flush`, if given, is called with the key filters of the operations that a
+    flush wrote successfully.
+    """
+
+    def __init__(self, collection, keys, batch_size=config.BULK_BATCH_SIZE, flush_interval=config.BULK_FLUSH_INTERVAL, on_flush=None):
+        self.collection = collection
+        self.keys = keys
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.inserted = 0
+        self.modified = 0
+        self.unchanged = 0
+        self._ops = []
+        self._filters = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        ensure_indexes(collection, keys)
+
+    def add(self, document):
+        """Upserts `document`, matching on the writer's key fields."""
+        key_filter = {field: document[field] for field, _ in self.keys}
+        self.add_update(key_filter, {"$set": document})
+
+    def add_update(self, key_filter, update):
+        """Queues an arbitrary upsert."""
+        with self._lock:
+            self._ops.append(UpdateOne(key_filter, update, upsert=True))
+            self._filters.append(key_filter)
+            due = (
+                len(self._ops) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Writes all pending operations."""
+        with self._lock:
+            ops, self._ops = self._ops, []
+            filters, self._filters = self._filters, []
+            self._last_flush = time.monotonic()
+        if not ops:
+            return
+
+        metrics.persist_operations.inc(len(ops), writer="bulk")
+        try:
+            with metrics.persist_seconds.time(writer="bulk"):
+                details = self.collection.bulk_write(ops, ordered=False).bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            logger.warning("⚠️ %d of %d writes to '%s' failed: %s", len(details["writeErrors"]), len(ops), self.collection.name, details["writeErrors"][0]["errmsg"])
+
+        with self._lock:
+            self.inserted += details["nUpserted"]
+            self.modified += details["nModified"]
+            self.unchanged += details["nMatched"] - details["nModified"]
+        if details["nUpserted"] or details["nModified"]:
+            collection_changed(self.collection.name)
+
+        if self.on_flush is not None:
+            failed = {error["index"] for error in details.get("writeErrors", [])}
+            self.on_flush([f for i, f in enumerate(filters) if i not in failed])
+
+    @property
+    def changed(self):
+        """Number of documents inserted or modified so far."""
+        return self.inserted + self.modified
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+
+
+def collection_changed(collection_name):
+    """Tells derived data (the cached stats) that a collection was written."""
+    # Imported lazily: stats builds on this module.
+    from . import stats
+    if not collection_name.startswith(config.INTERNAL_COLLECTION_PREFIX):
+        stats.invalidate(collection_name)
+
+
+def bulk_writer(collection_name, keys, on_flush=None):
+    """Returns a BulkUpserter for a collection, or None if there is no database connection."""
     db = get_db()
     if db is None:
-        print("💔 Cannot save journals, no database connection.")
-        return 0
+        logger.warning("💔 Cannot save, no database connection.")
+        return None
+    return BulkUpserter(db[collection_name], keys, on_flush=on_flush)
 
-    collection = db[collection_name]
 
+class StagingWriter:
+    """
+    Writes a complete replacement of a collection. Documents go into a fresh staging
+    collection; commit() builds its indexes once and renames it over the target in one
+    step, so readers see the old documents until then. discard() drops the staging
+    collection and leaves the target untouched. As a context manager it commits on
+    success (unless commit() or discard() was called already) and discards on an
+    exception. Documents are inserted, not upserted: repeats of a key are skipped in
+    memory, so no index is needed while writing. Every writer has a staging collection
+    of its own, so two overwrites of one collection do not write into each other's.
+    """
+
+    # Staging collections older than this (seconds) belong to a process that died mid-scrape.
+    ABANDONED_AFTER = 86400
+
+    def __init__(self, db, collection_name, keys, batch_size=config.BULK_BATCH_SIZE):
+        self.collection_name = collection_name
+        self.keys = keys
+        self.batch_size = batch_size
+        prefix = f"{config.INTERNAL_COLLECTION_PREFIX}staging_{collection_name}_"
+        self._drop_abandoned(db, prefix)
+        self.staging = db[f"{prefix}{ObjectId()}"]
+        self.inserted = 0
+        self.unchanged = 0
+        self.closed = False
+        self._docs = []
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def _drop_abandoned(self, db, prefix):
+        cutoff = time.time() - self.ABANDONED_AFTER
+        for name in db.list_collection_names(filter={"name": {"$regex": f"^{re.escape(prefix)}"}}):
+            run = name[len(prefix):]
+            if ObjectId.is_valid(run) and ObjectId(run).generation_time.timestamp() < cutoff:
+                db[name].drop()
+
+    def add(self, document):
+        key = tuple(document[field] for field, _ in self.keys)
+        with self._lock:
+            if key in self._seen:
+                self.unchanged += 1
+                return
+            self._seen.add(key)
+            self._docs.append(document)
+            due = len(self._docs) >= self.batch_size
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            docs, self._docs = self._docs, []
+        if not docs:
+            return
+        metrics.persist_operations.inc(len(docs), writer="staging")
+        with metrics.persist_seconds.time(writer="staging"):
+            self.staging.insert_many(docs, ordered=False)
+        with self._lock:
+            self.inserted += len(docs)
+
+    @property
+    def changed(self):
+        return self.inserted
+
+    def commit(self):
+        """Indexes the staging collection and swaps it in. Returns False, keeping the old data, if it is empty."""
+        self.flush()
+        self.closed = True
+        if not self.inserted:
+            logger.warning("⚠️ Nothing was scraped; '%s' keeps its previous documents.", self.collection_name)
+            self.discard()
+            return False
+        kind = "articles" if is_article_collection(self.collection_name) else "journals"
+        self.staging.create_index(self.keys, unique=True)
+        for keys in BROWSE_INDEXES[kind]:
+            self.staging.create_index(keys)
+        self.staging.rename(self.collection_name, dropTarget=True)
+        _forget_indexes(self.staging.name, self.collection_name)
+        collection_changed(self.collection_name)
+        logger.info("🔁 Replaced '%s' with %s freshly scraped documents.", self.collection_name, self.inserted)
+        return True
+
+    def discard(self):
+        self.closed = True
+        self.staging.drop()
+        _forget_indexes(self.staging.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            if not self.closed:
+                self.commit()
+        else:
+            logger.error("❌ Scrape failed; '%s' keeps its previous documents.", self.collection_name)
+            self.discard()
+        return False
+
+
+def _forget_indexes(*collection_names):
+    """Makes ensure_indexes check collections that were dropped or replaced again."""
+    with _indexed_lock:
+        _indexed.difference_update({marker for marker in _indexed if marker[0] in collection_names})
+
+
+def staging_writer(collection_name, keys):
+    """Returns a StagingWriter replacing a collection, or None if there is no database connection."""
+    db = get_db()
+    if db is None:
+        logger.warning("💔 Cannot save, no database connection.")
+        return None
+    return StagingWriter(db, collection_name, keys)
+
+
+def drop_collection(collection_name):
+    """
+    Drops a collection together with its cached stats and search index entries, and its
+    article hits if it is an article store view.
+    """
+    from . import article_store
+    from . import search_index
+    from . import stats
+    db = get_db()
+    if db is None:
+        return
+    view = is_article_collection(collection_name) and article_store.is_view(collection_name)
+    db[collection_name].drop()
+    if view:
+        article_store.forget(collection_name)
+    if is_article_collection(collection_name):
+        search_index.forget(collection_name)
+    stats.forget(collection_name)
+
+
+def save_sinta_journals(journals, collection_name, overwrite=False):
+    """
+    Saves a list of Sinta journals to a specified collection. With overwrite=True they
+    replace its documents in one swap (see StagingWriter).
+    """
     if overwrite:
-        # To be safe, we only delete content, not drop the collection.
-        print(f"🗑️ Overwriting: Deleting all documents from collection '{collection_name}'...")
-        collection.delete_many({})
-
-    update_count = 0
-    for journal in journals:
-        # Use sinta_link as a unique identifier to update or insert.
-        result = collection.update_one(
-            {"sinta_link": journal["sinta_link"]},
-            {"$set": journal},
-            upsert=True
-        )
-        if result.modified_count > 0 or result.upserted_id:
-            update_count += 1
-    
-    print(f"💾 Saved/Updated {update_count} journals in the '{collection_name}' collection.")
-    return update_count
+        writer = staging_writer(collection_name, SINTA_JOURNAL_KEYS)
+    else:
+        writer = bulk_writer(collection_name, SINTA_JOURNAL_KEYS)
+    if writer is None:
+        return 0
+
+    # Use sinta_link as a unique identifier to update or insert.
+    with writer:
+        for journal in journals:
+            writer.add(journal)
+
+    logger.info("💾 Saved/Updated %s journals in the '%s' collection (%s unchanged).", writer.changed, collection_name, writer.unchanged)
+    return writer.changed
 
 def save_garuda_articles(articles_data, collection_name):
     """Saves the results of a Garuda article search to a specified collection."""
     db = get_db()
     if db is None:
-        print("💔 Cannot save articles, no database connection.")
+        logger.warning("💔 Cannot save articles, no database connection.")
         return 0
 
     if not articles_data:
         return 0
 
+    if config.ARTICLE_STORAGE == "normalized":
+        from . import article_store
+        store = article_store.writer(collection_name)
+        if store is None:
+            return 0
+        with store:
+            store.save_results(articles_data)
+        logger.info("💾 Saved %d articles for query '%s' in journal '%s'.", articles_data["results_count"], articles_data["query"], articles_data["journal_name"])
+        return 1
+
     collection = db[collection_name]
+    ensure_indexes(collection, GARUDA_ARTICLE_KEYS)
     # We use the journal's garuda_link and the query to identify a search result document
     result = collection.update_one(
         {
@@ -78,34 +380,163 @@ def save_garuda_articles(articles_data, collection_name):
     )
     
     if result.upserted_id or result.modified_count > 0:
-        print(f"💾 Saved {articles_data['results_count']} articles for query '{articles_data['query']}' in journal '{articles_data['journal_name']}'.")
+        collection_changed(collection_name)
+        logger.info("💾 Saved %d articles for query '%s' in journal '%s'.", articles_data["results_count"], articles_data["query"], articles_data["journal_name"])
         return 1
     return 0
 
-def get_sinta_journals_for_garuda_search(collection_name):
-    """Fetches journals from a specific DB collection that have a valid Garuda link."""
+def article_key(article):
+    """Identifies an article within a journal: its download link, or its title when it has none."""
+    return article.get("download_link") or article.get("title")
+
+
+def get_known_articles(collection_name, query):
+    """Returns {garuda_link: set of article keys} for the results already stored for a query."""
     db = get_db()
     if db is None:
-        print("💔 Cannot fetch journals, no database connection.")
+        return {}
+
+    if config.ARTICLE_STORAGE == "normalized":
+        from . import article_store
+        if article_store.is_view(collection_name):
+            return article_store.known_articles(collection_name, query)
+
+    known = {}
+    cursor = db[collection_name].find(
+        {"query": query},
+        {"garuda_link": 1, "results.download_link": 1, "results.title": 1},
+    )
+    for doc in cursor:
+        known[doc["garuda_link"]] = {article_key(a) for a in doc.get("results", [])}
+    return known
+
+def get_sinta_journals_for_garuda_search(collection_name, garuda_links=None):
+    """Fetches journals from a specific DB collection that have a valid Garuda link (one of `garuda_links`, if given)."""
+    db = get_db()
+    if db is None:
+        logger.warning("💔 Cannot fetch journals, no database connection.")
         return []
 
     collection = db[collection_name]
     # Find journals where garuda_link exists and is not the 'no garuda link' placeholder
+    if garuda_links is not None:
+        return list(collection.find({"garuda_link": {"$in": list(garuda_links)}}))
     return list(collection.find({
         "garuda_link": {"$exists": True, "$ne": "no garuda link"}
     }))
 
 import os
+import zlib
+
+JSON_EXPORT_FORMATS = ("json", "ndjson")
+# csv and parquet hold flat rows, see tabular_export.
+EXPORT_FORMATS = JSON_EXPORT_FORMATS + ("csv", "parquet")
+
+
+def exportable_collection(collection_name):
+    """Returns the collection if it exists and can be exported, or None after printing why not."""
+    db = get_db()
+    if db is None:
+        logger.warning("💔 Cannot export, no database connection.")
+        return None
+
+    if collection_name not in list_collections():
+        logger.error("❌ Collection '%s' not found.", collection_name)
+        return None
+
+    return db[collection_name]
+
+
+def _export_cursor(collection_name):
+    """Returns a cursor over every document of a collection, or None if it cannot be exported."""
+    collection = exportable_collection(collection_name)
+    if collection is None:
+        return None
+    return collection.find({}, batch_size=config.EXPORT_BATCH_SIZE)
+
+
+def iter_export_chunks(cursor, fmt="json", chunk_size=config.EXPORT_CHUNK_SIZE):
+    """
+    Serializes the documents of a cursor as a JSON array or as NDJSON, yielding one
+    string per `chunk_size` documents so only one chunk is held in memory at a time.
+    """
+    if fmt not in JSON_EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Expected one of {JSON_EXPORT_FORMATS}.")
+
+    buffer = []
+    count = 0
+    if fmt == "json":
+        yield "["
+    for doc in cursor:
+        # Convert ObjectId to string for JSON serialization
+        if '_id' in doc:
+            doc['_id'] = str(doc['_id'])
+        if fmt == "ndjson":
+            buffer.append(json.dumps(doc, ensure_ascii=False, default=str) + "\n")
+        else:
+            separator = ",\n" if count else "\n"
+            buffer.append(separator + json.dumps(doc, indent=2, ensure_ascii=False, default=str))
+        count += 1
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+    if fmt == "json":
+        buffer.append("\n]" if count else "]")
+    if buffer:
+        yield "".join(buffer)
+
+
+def gzip_chunks(chunks):
+    """Gzip-compresses a stream of text chunks into a stream of bytes."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_collection_export(collection_name, fmt="json", compress=False):
+    """
+    Returns a generator of bytes that streams a whole collection straight from a
+    cursor, or None if the collection cannot be exported. csv and parquet flatten it
+    into rows (see tabular_export).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Expected one of {EXPORT_FORMATS}.")
+    if fmt not in JSON_EXPORT_FORMATS:
+        from . import tabular_export
+        return tabular_export.stream_tabular_export(collection_name, fmt, compress)
+
+    cursor = _export_cursor(collection_name)
+    if cursor is None:
+        return None
+
+    chunks = iter_export_chunks(cursor, fmt)
+    if compress:
+        return gzip_chunks(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
+
 
-def export_collection_to_json_file(collection_name):
-    """Exports all documents from a collection to a JSON file in the 'exports' directory."""
-    documents = export_collection_to_json(collection_name)
-    if documents is None:
-        # The export_collection_to_json function already prints the error message
+def export_filename(collection_name, fmt="json", compress=False):
+    """File name used for an exported collection. Parquet files are compressed internally."""
+    return f"{collection_name.replace(' ', '_')}.{fmt}" + (".gz" if compress and fmt != "parquet" else "")
+
+
+def export_collection_to_json_file(collection_name, fmt="json", compress=False):
+    """Exports all documents from a collection to a JSON, NDJSON, CSV or Parquet file in the 'exports' directory."""
+    try:
+        stream = stream_collection_export(collection_name, fmt, compress)
+    except ValueError as e:
+        logger.error("❌ %s", e)
+        return
+    if stream is None:
+        # _export_cursor already prints the error message
         return
 
-    if not documents:
-        print(f"No documents found in collection '{collection_name}'.")
+    document_count = get_db()[collection_name].estimated_document_count()
+    if not document_count:
+        logger.info("No documents found in collection '%s'.", collection_name)
         return
 
     # Ensure the root 'exports' directory exists
@@ -113,33 +544,124 @@ def export_collection_to_json_file(collection_name):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    output_path = os.path.join(output_dir, f"{collection_name.replace(' ', '_')}.json")
+    output_path = os.path.join(output_dir, export_filename(collection_name, fmt, compress))
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(documents, f, indent=2, ensure_ascii=False)
-        print(f"✅ Successfully exported {len(documents)} documents to '{output_path}'.")
+        with open(output_path, 'wb') as f:
+            for chunk in stream:
+                f.write(chunk)
+        logger.info("✅ Successfully exported %s documents to '%s'.", document_count, output_path)
     except IOError as e:
-        print(f"❌ Failed to write to file: {e}")
+        logger.error("❌ Failed to write to file: %s", e)
 
 
 def export_collection_to_json(collection_name):
     """Fetches all documents from a collection and returns them as a list."""
-    db = get_db()
-    if db is None:
-        print("💔 Cannot export, no database connection.")
+    cursor = _export_cursor(collection_name)
+    if cursor is None:
         return None
 
-    if collection_name not in list_collections():
-        print(f"❌ Collection '{collection_name}' not found.")
-        return None
+    documents = list(cursor)
 
-    collection = db[collection_name]
-    documents = list(collection.find({}))
-    
     # Convert ObjectId to string for JSON serialization
     for doc in documents:
         if '_id' in doc:
             doc['_id'] = str(doc['_id'])
-            
+
     return documents
 
+
+# Browse indexes: each filter is an equality match followed by the _id keyset order.
+BROWSE_INDEXES = {
+    "journals": [[("sinta", ASCENDING), ("_id", ASCENDING)]],
+    "articles": [[("query", ASCENDING), ("_id", ASCENDING)], [("sinta_level", ASCENDING), ("_id", ASCENDING)]],
+}
+
+
+def is_article_collection(collection_name):
+    """Garuda search results live in articles_* collections; everything else holds Sinta journals."""
+    return collection_name.lower().startswith("articles_")
+
+
+def _browse_collection(collection_name):
+    """Returns (collection, kind, view): `view` is True for an article store view."""
+    db = get_db()
+    if db is None or collection_name not in list_collections():
+        return None, None, False
+    kind = "articles" if is_article_collection(collection_name) else "journals"
+    collection = db[collection_name]
+    view = kind == "articles" and config.ARTICLE_STORAGE == "normalized" and \
+        collection_name not in db.list_collection_names(filter={"type": "collection"})
+    # Article store views cannot be indexed; their hits collection is.
+    if not view:
+        for keys in BROWSE_INDEXES[kind]:
+            ensure_indexes(collection, keys, unique=False)
+    return collection, kind, view
+
+
+def _serialize(doc):
+    doc["_id"] = str(doc["_id"])
+    return doc
+
+
+def browse_collection(collection_name, after=None, limit=config.BROWSE_PAGE_SIZE, sinta=None, name=None, query=None):
+    """
+    Returns one page of summary rows, ordered by _id, without the nested `results` arrays:
+    {"documents": [...], "next_cursor": _id to pass as `after` for the next page or None,
+    "total": document count of the unfiltered collection or None}.
+    Filters: `sinta` level, `name` (case-insensitive substring of the journal name) and,
+    for article collections, the search `query`. Returns None if the collection does not exist.
+    Raises ValueError for a malformed `after` cursor.
+    """
+    collection, kind, view = _browse_collection(collection_name)
+    if collection is None:
+        return None
+
+    filters = {}
+    if sinta is not None:
+        filters["sinta_level" if kind == "articles" else "sinta"] = sinta
+    if name:
+        filters["journal_name" if kind == "articles" else "name"] = {"$regex": re.escape(name), "$options": "i"}
+    if query and kind == "articles":
+        filters["query"] = query
+    if after:
+        try:
+            cursor_filter = {"_id": {"$gt": ObjectId(after)}}
+        except InvalidId:
+            raise ValueError(f"Invalid cursor '{after}'.")
+    else:
+        cursor_filter = {}
+
+    limit = max(1, min(limit, config.BROWSE_MAX_PAGE_SIZE))
+    # One extra row tells whether another page follows.
+    if view:
+        # Paged on the hits, so the view's article $lookup never runs for a summary page.
+        from . import article_store
+        total = None if filters else article_store.count_documents(collection_name)
+        rows = article_store.summaries(collection_name, {**filters, **cursor_filter}, limit + 1)
+    else:
+        # Only the filtered set needs counting; the unfiltered size comes from collection metadata.
+        total = None if filters else collection.estimated_document_count()
+        rows = collection.find({**filters, **cursor_filter}, {"results": 0}).sort("_id", ASCENDING).limit(limit + 1)
+    documents = [_serialize(doc) for doc in rows]
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = documents[-1]["_id"]
+    return {"documents": documents, "next_cursor": next_cursor, "total": total}
+
+
+def get_collection_document(collection_name, document_id):
+    """Returns one full document, including its `results`, or None if it does not exist."""
+    collection, _, view = _browse_collection(collection_name)
+    if collection is None:
+        return None
+    try:
+        document_id = ObjectId(document_id)
+    except InvalidId:
+        return None
+    if view:
+        from . import article_store
+        doc = article_store.find_document(collection_name, document_id)
+    else:
+        doc = collection.find_one({"_id": document_id})
+    return _serialize(doc) if doc is not None else None
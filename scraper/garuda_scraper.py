@@ -1,129 +1,642 @@
 # garuda_scraper.py
+import asyncio
+import contextlib
+import functools
+import logging
+import queue
 import requests
-import time
-from bs4 import BeautifulSoup
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
 from urllib.parse import quote
 
+from . import article_store
 from . import config
 from . import database
+from . import http_cache
+from . import http_client
+from . import metrics
+from . import parsers
+from . import progress
+from . import search_index
+from .checkpoints import Checkpointer
+from .concurrency import HostLimiter, ThreadHostLimiter, run_worker_pool
 
-session = requests.Session()
-session.headers.update(config.SINTA_HEADERS) # Reuse Sinta headers for consistency
+logger = logging.getLogger(__name__)
 
-def search_garuda_for_query(query, source_collection, delay=1):
+session = http_client.create_session(config.SINTA_HEADERS) # Reuse Sinta headers for consistency
+
+SEARCH_MODES = ("serial", "concurrent", "pipeline")
+
+
+def results_collection_name(query, source_collection):
+    """Builds the name of the collection that holds the results of `query` over `source_collection`."""
+    # Format: articles_[source]_[query]
+    # MongoDB collection names have a 120 character limit
+    query_slug = query.lower().replace(' ', '_').replace('/', '_')[:30]  # Limit query slug to 30 chars
+    source_slug = source_collection[:40]  # Limit source collection to 40 chars
+    name = f"articles_{source_slug}_{query_slug}"
+
+    # Ensure total length doesn't exceed 120 characters
+    return name[:120]
+
+
+def parse_articles(html):
+    """Extracts the article title and download link of every article on a Garuda search page."""
+    return parsers.parse_garuda_articles(html)
+
+
+class JournalSearch:
     """
-    Iterates over Garuda links from a specified database collection and searches for a given query.
+    Pagination state of one query inside one journal.
+    Every search engine drives the same object: ask for `next_url()`, fetch it,
+    and hand the response to `consume()` (or to `parse()`, then `accept()`, when
+    parsing runs elsewhere) until `done` is set.
+    With a `checkpoint`, progress is recorded after every page.
+    With `known` (the keys of the articles already stored for this journal and query) the
+    search is incremental: only unknown articles are kept, and paging stops at the first
+    page that holds nothing new, since Garuda lists the most recent articles first.
+    With `revalidate`, pages are requested past the response cache's TTL, so a re-crawl
+    sees articles published since the cached copy.
     """
-    try:
-        journals = database.get_sinta_journals_for_garuda_search(source_collection)
-        if not journals:
-            print(f"❌ No journals with Garuda links found in the collection '{source_collection}'. Run the Sinta scraper first.")
+
+    def __init__(self, journal, query, checkpoint=None, known=None, revalidate=False):
+        self.journal = journal
+        self.query = query
+        self.garuda_link = journal.get("garuda_link")
+        self.name = journal.get("name", "Unknown")
+        self.checkpoint = checkpoint
+        self.known = known
+        self.headers = http_cache.REVALIDATE if revalidate else None
+        self.writer = None
+        self.saved = 0
+        self.page = 1
+        self.articles = []
+        self.done = False
+        self.failed = False
+
+    def resume_from(self, state):
+        """Continues from a saved checkpoint instead of page 1."""
+        self.page = state["next_page"]
+        # A crash between writing new articles and marking the journal done would
+        # otherwise append them twice.
+        self.articles = [a for a in state["results"] if not self._is_known(a)]
+
+    def _is_known(self, article):
+        return self.known is not None and database.article_key(article) in self.known
+
+    def next_url(self):
+        if self.page > 1:
+            return f"{self.garuda_link}?page={self.page}&q={quote(self.query)}"
+        return f"{self.garuda_link}?q={quote(self.query)}"
+
+    def consume(self, resp):
+        """Parses a fetched page. Returns True if the next page should be fetched."""
+        return self.accept(self.parse(resp))
+
+    def parse(self, resp):
+        """Extracts the articles of a fetched page, or returns None if the request failed. Changes no state."""
+        if resp.status_code != 200:
+            logger.warning("   ⚠️  Failed (%s) for %s", resp.status_code, self.name)
+            progress.error(f"HTTP {resp.status_code} for {self.name}")
+            return None
+        return parse_articles(resp.text)
+
+    def accept(self, page_articles):
+        """
+        Records the parsed articles of the current page (None for a failed request).
+        Returns True if the next page should be fetched.
+        """
+        if page_articles is None:
+            self.done = True
+            self.failed = True
+            return False
+
+        metrics.pages.inc(source="garuda")
+        progress.add(pages=1)
+        if not page_articles:
+            logger.debug("   🚫 No more articles found in %s, moving to next journal.", self.name)
+            self.done = True
+            return False
+
+        if self.known is not None:
+            page_articles = [a for a in page_articles if not self._is_known(a)]
+            if not page_articles:
+                logger.debug("   ⏹️  No new articles on page %s of %s, moving to next journal.", self.page, self.name)
+                self.done = True
+                return False
+
+        self.articles.extend(page_articles)
+        metrics.articles.inc(len(page_articles))
+        progress.add(articles=len(page_articles))
+        logger.debug("   ✅ Found %d %sarticles on page %s of %s.", len(page_articles), "new " if self.known is not None else "", self.page, self.name)
+        self.page += 1
+        if self.checkpoint is not None:
+            self.checkpoint.page_done(self, page_articles)
+        return True
+
+    def fail(self, error):
+        logger.error("   ❌ Error for %s: %s", self.garuda_link, error)
+        progress.error(f"{self.name}: {error}")
+        self.done = True
+        self.failed = True
+
+    def result_entry(self):
+        """The document stored for this (journal, query) pair, or None when nothing was found."""
+        if not self.articles:
+            return None
+        return {
+            "journal_name": self.journal["name"],
+            "sinta_level": self.journal.get("sinta"),
+            "garuda_link": self.garuda_link,
+            "query": self.query,
+            "results_count": len(self.articles),
+            "results": self.articles,
+        }
+
+    def write(self, writer):
+        """
+        Queues the results on a bulk writer. A full search replaces the stored document;
+        an incremental one puts the new articles in front of the stored ones, keeping
+        Garuda's most-recent-first order.
+        """
+        entry = self.result_entry()
+        if isinstance(writer, article_store.ArticleStoreWriter):
+            writer.save_results(entry, replace=self.known is None)
+            return
+        if self.known is None:
+            writer.add(entry)
             return
+        writer.add_update(
+            {"garuda_link": self.garuda_link, "query": self.query},
+            {
+                "$set": {"journal_name": entry["journal_name"], "sinta_level": entry["sinta_level"]},
+                "$push": {"results": {"$each": self.articles, "$position": 0}},
+                "$inc": {"results_count": len(self.articles)},
+            },
+        )
 
-        # Create a descriptive name for the results collection
-        # Format: articles_[source]_[query]
-        # MongoDB collection names have a 120 character limit
-        query_slug = query.lower().replace(' ', '_').replace('/', '_')[:30]  # Limit query slug to 30 chars
-        source_slug = source_collection[:40]  # Limit source collection to 40 chars
-        results_collection_name = f"articles_{source_slug}_{query_slug}"
-        
-        # Ensure total length doesn't exceed 120 characters
-        if len(results_collection_name) > 120:
-            results_collection_name = results_collection_name[:120]
-        
-        print(f"\n🔍 Found {len(journals)} journals in '{source_collection}' to search.")
-        print(f"📁 Results will be saved to collection: '{results_collection_name}'")
-        print(f"🔎 Starting search for query: '{query}'\n")
-        
-        total_journals_with_results = 0
-        total_articles_saved = 0
-
-        for i, j in enumerate(journals, 1):
-            try:
-                garuda_link = j.get("garuda_link")
-                # This check is technically redundant given the DB query, but good for safety
-                if not garuda_link or "garuda.kemdikbud.go.id" not in garuda_link:
-                    continue
-
-                page = 1
-                total_articles = []
-                
-                print(f"[{i}/{len(journals)}] 🔗 Searching in journal: {j.get('name', 'Unknown')}")
-
-                while True:
-                    search_url = (
-                        f"{garuda_link}?page={page}&q={quote(query)}"
-                        if page > 1
-                        else f"{garuda_link}?q={quote(query)}"
-                    )
-                    print(f"   🌐 Page {page}: {search_url}")
 
-                    try:
-                        resp = session.get(search_url, timeout=15)
-                        if resp.status_code != 200:
-                            print(f"   ⚠️  Failed ({resp.status_code})")
-                            break 
+def _is_searchable(journal):
+    garuda_link = journal.get("garuda_link")
+    # This check is technically redundant given the DB query, but good for safety
+    return bool(garuda_link) and config.GARUDA_HOST in garuda_link
 
-                        soup = BeautifulSoup(resp.text, "html.parser")
-                        articles = soup.select("div.article-item")
 
-                        if not articles:
-                            print("   🚫 No more articles found, moving to next journal.")
-                            break
+def _save_search(search):
+    """Queues the results of a finished search on its writer and records how many articles it saved."""
+    progress.add(done=1)
+    entry = search.result_entry()
+    if entry is None:
+        if search.checkpoint is not None:
+            search.checkpoint.journal_finished(search, persisted=True)
+        logger.info("   ⚠️ No articles found for '%s' in %s.", search.query, search.name)
+        return
+    try:
+        # Registered first: adding may trigger the flush that marks it done.
+        if search.checkpoint is not None:
+            search.checkpoint.journal_finished(search)
+        search.write(search.writer)
+        search.saved = entry["results_count"]
+        logger.info("📦 Total found in %s: %d articles", search.name, entry["results_count"])
+    except Exception as save_error:
+        logger.error("   ❌ Failed to save articles: %s", save_error)
 
-                        page_articles = []
-                        for art in articles:
-                            title_tag = art.select_one(".title-article xmp")
-                            title = title_tag.get_text(strip=True) if title_tag else "No Title"
 
-                            download_tag = art.select_one(
-                                "a.title-citation[href*='article/download']"
-                            )
-                            download_link = download_tag["href"] if download_tag else None
+def _search_serial(searches):
+    """Searches journals one after another. Pacing and retries are left to the HTTP client."""
+    for i, search in enumerate(searches, 1):
+        try:
+            logger.info("[%d/%d] 🔗 Searching '%s' in journal: %s", i, len(searches), search.query, search.name)
+            while not search.done:
+                search_url = search.next_url()
+                logger.debug("   🌐 Page %s: %s", search.page, search_url)
+                try:
+                    resp = session.get(search_url, headers=search.headers, timeout=config.HTTP_TIMEOUT)
+                except requests.RequestException as e:
+                    search.fail(e)
+                    break
+                search.consume(resp)
+            _save_search(search)
+        except Exception as journal_error:
+            search.failed = True
+            logger.error("   ❌ Error processing journal %s: %s", search.name, journal_error)
+            progress.error(f"{search.name}: {journal_error}")
 
-                            page_articles.append(
-                                {"title": title, "download_link": download_link}
-                            )
-                        
-                        total_articles.extend(page_articles)
-                        print(f"   ✅ Found {len(page_articles)} articles on this page.")
-                        page += 1
-                        time.sleep(delay)
 
-                    except requests.RequestException as e:
-                        print(f"   ❌ Error for {garuda_link}: {e}")
-                        break 
-                
-                if total_articles:
-                    result_entry = {
-                        "journal_name": j["name"],
-                        "sinta_level": j.get("sinta"),
-                        "garuda_link": garuda_link,
-                        "query": query,
-                        "results_count": len(total_articles),
-                        "results": total_articles,
-                    }
+async def _search_concurrent(searches, max_workers, per_host):
+    """
+    Searches many journals at once. Each worker walks the pages of one journal at a
+    time; every request goes through a HostLimiter so the global cap and the per-host
+    cap hold across all workers, and the HTTP client paces each host.
+    """
+    loop = asyncio.get_running_loop()
+    limiter = HostLimiter(max_workers, per_host)
+    started = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        async def run_search(search):
+            nonlocal started
+            started += 1
+            logger.info("[%d/%d] 🔗 Searching '%s' in journal: %s", started, len(searches), search.query, search.name)
+            try:
+                while not search.done:
+                    search_url = search.next_url()
                     try:
-                        if database.save_garuda_articles(result_entry, results_collection_name):
-                            total_journals_with_results += 1
-                            total_articles_saved += len(total_articles)
-                            print(f"   💾 Saved {len(total_articles)} articles to database")
-                        print(f"📦 Total found in {j['name']}: {len(total_articles)} articles\n")
-                    except Exception as save_error:
-                        print(f"   ❌ Failed to save articles: {save_error}\n")
-                else:
-                    print(f"   ⚠️ No articles found for '{query}' in {j['name']}.\n")
-                    
+                        async with limiter.slot(search_url):
+                            resp = await loop.run_in_executor(
+                                executor, functools.partial(session.get, search_url, headers=search.headers, timeout=config.HTTP_TIMEOUT)
+                            )
+                    except requests.RequestException as e:
+                        search.fail(e)
+                        break
+                    await loop.run_in_executor(executor, search.consume, resp)
+                await loop.run_in_executor(executor, _save_search, search)
             except Exception as journal_error:
-                print(f"   ❌ Error processing journal {j.get('name', 'Unknown')}: {journal_error}\n")
+                search.failed = True
+                logger.error("   ❌ Error processing journal %s: %s", search.name, journal_error)
+                progress.error(f"{search.name}: {journal_error}")
+
+        await run_worker_pool(searches, run_search, max_workers)
+
+
+_DONE = object()  # tells a pipeline stage to exit
+
+
+def _put(q, item, stop):
+    """Puts on a bounded queue, giving up if the pipeline is being torn down."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.2)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _put_now(q, item):
+    # At teardown the stages exit on `stop`; this only wakes the ones waiting on an empty queue.
+    try:
+        q.put_nowait(item)
+    except queue.Full:
+        pass
+
+
+def _search_pipeline(searches, fetch_workers, parse_workers, per_host, queue_size):
+    """
+    Searches journals as a three-stage pipeline linked by bounded queues:
+    `fetch_workers` threads download pages (at most `per_host` at once per host),
+    `parse_workers` threads extract articles, and the calling thread persists them
+    (search state, checkpoints, bulk writer). A full queue blocks the stage feeding it,
+    so memory stays flat however fast the network is.
+    Yields (search, new_articles) for every page as it is persisted.
+    """
+    todo = queue.Queue()  # searches whose next page can be fetched; never more than len(searches)
+    fetched = queue.Queue(maxsize=queue_size)
+    parsed = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    limiter = ThreadHostLimiter(per_host)
+
+    def fetch_stage():
+        while True:
+            search = todo.get()
+            if search is _DONE:
+                return
+            url = search.next_url()
+            try:
+                with limiter.slot(url):
+                    result = session.get(url, headers=search.headers, timeout=config.HTTP_TIMEOUT)
+            except requests.RequestException as e:
+                result = e
+            if not _put(fetched, (search, result), stop):
+                return
+
+    def parse_stage():
+        while True:
+            item = fetched.get()
+            if item is _DONE:
+                return
+            search, result = item
+            if not isinstance(result, Exception):
+                try:
+                    result = search.parse(result)
+                except Exception as e:
+                    result = e
+            if not _put(parsed, (search, result), stop):
+                return
+
+    fetch_threads = [threading.Thread(target=fetch_stage, daemon=True) for _ in range(max(1, fetch_workers))]
+    parse_threads = [threading.Thread(target=parse_stage, daemon=True) for _ in range(max(1, parse_workers))]
+    for thread in fetch_threads + parse_threads:
+        thread.start()
+
+    active = len(searches)
+    for i, search in enumerate(searches, 1):
+        logger.debug("[%d/%d] 🔗 Queued '%s' in journal: %s", i, len(searches), search.query, search.name)
+        todo.put(search)
+
+    try:
+        while active:
+            search, result = parsed.get()
+            if isinstance(result, Exception):
+                search.fail(result)
+            else:
+                before = len(search.articles)
+                try:
+                    more = search.accept(result)
+                except Exception as e:
+                    search.fail(e)
+                else:
+                    new_articles = search.articles[before:]
+                    if new_articles:
+                        yield search, new_articles
+                    if more:
+                        todo.put(search)
+                        continue
+            _save_search(search)
+            active -= 1
+    finally:
+        stop.set()
+        for _ in fetch_threads:
+            todo.put(_DONE)
+        for _ in parse_threads:
+            _put_now(fetched, _DONE)
+
+
+class QueryRun:
+    """
+    Everything one query needs within a (possibly batched) search: its results collection,
+    checkpoints, bulk writer and the JournalSearch of every journal still to search.
+    """
+
+    def __init__(self, query, source_collection, journals, resume=True, incremental=False, fresh_links=frozenset()):
+        self.query = query
+        # Create a descriptive name for the results collection
+        self.collection_name = results_collection_name(query, source_collection)
+        self.checkpointer = Checkpointer(source_collection, query)
+        if resume:
+            saved_state = self.checkpointer.load()
+        else:
+            self.checkpointer.clear()
+            saved_state = {}
+        known = database.get_known_articles(self.collection_name, query) if incremental else {}
+
+        self.searches = []
+        self.skipped = 0
+        self.fresh = 0
+        for j in journals:
+            if not _is_searchable(j):
                 continue
+            if j["garuda_link"] in fresh_links:
+                self.fresh += 1
+                continue
+            state = saved_state.get(j["garuda_link"])
+            if state and state.get("done"):
+                self.skipped += 1
+                continue
+            search = JournalSearch(j, query, checkpoint=self.checkpointer, known=known.get(j["garuda_link"]), revalidate=incremental)
+            if state:
+                search.resume_from(state)
+            self.searches.append(search)
+        self.resumed = sum(1 for search in self.searches if search.page > 1)
+        self.writer = None
+
+    def open_writer(self):
+        """Opens the writer of the results collection and hands it to every search."""
+        if config.ARTICLE_STORAGE == "normalized":
+            self.writer = article_store.writer(self.collection_name, on_flush=self.checkpointer.on_flush)
+        else:
+            self.writer = database.bulk_writer(
+                self.collection_name, database.GARUDA_ARTICLE_KEYS, on_flush=self.checkpointer.on_flush
+            )
+        for search in self.searches:
+            search.writer = self.writer
+        return self.writer
+
+    @property
+    def journals_with_results(self):
+        return sum(1 for search in self.searches if search.saved)
+
+    @property
+    def articles_saved(self):
+        return sum(search.saved for search in self.searches)
+
+    @property
+    def failed(self):
+        return sum(1 for search in self.searches if search.failed)
+
+    @property
+    def written_links(self):
+        """Garuda links of the journals whose results this run wrote."""
+        return [search.garuda_link for search in self.searches if search.saved]
+
+    def finish(self):
+        """
+        Records which journals were crawled, indexes the results of the journals it wrote
+        for local search, and drops the checkpoints of a run in which every journal succeeded.
+        """
+        search_index.mark_crawled(self.query, [s.garuda_link for s in self.searches if s.done and not s.failed])
+        if self.articles_saved:
+            search_index.index_collection(self.collection_name, self.written_links)
+        if not self.failed:
+            self.checkpointer.clear()
+
+
+def _prepare_runs(queries, source_collection, resume, incremental, stale_after=None, garuda_links=None):
+    """
+    Loads the journals once and builds a QueryRun per query. Returns (runs, searches) or None.
+    With `stale_after` (seconds), journals crawled more recently than that are left out.
+    With `garuda_links`, only those journals are searched (one shard of a distributed search).
+    """
+    queries = list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+    if not queries:
+        logger.error("❌ No queries to search for.")
+        return None
+
+    journals = database.get_sinta_journals_for_garuda_search(source_collection, garuda_links)
+    if not journals:
+        logger.error("❌ No journals with Garuda links found in the collection '%s'. Run the Sinta scraper first.", source_collection)
+        return None
+
+    links = [j["garuda_link"] for j in journals if _is_searchable(j)]
+    runs = []
+    for query in queries:
+        fresh = set()
+        if stale_after is not None:
+            fresh = search_index.fresh_links(query, links, stale_after)
+            logger.info("🕒 %s journals were searched for '%s' in the last %gh and are answered from stored data.", len(fresh), query, stale_after / 3600)
+        runs.append(QueryRun(query, source_collection, journals, resume, incremental, fresh))
+    # Journal-major order: the queries of one journal are next to each other.
+    searches = [search for group in zip_longest(*(run.searches for run in runs)) for search in group if search]
+    if garuda_links is None:  # a shard's total is part of its distributed search
+        progress.begin(len(searches), "journals")
+
+    logger.info("🔍 Found %s journals in '%s' to search.", len(journals), source_collection)
+    for run in runs:
+        if run.skipped or run.resumed:
+            logger.info("⏯️  Resuming '%s': %s journals already done, %s continue from their last page.", run.query, run.skipped, run.resumed)
+        logger.info("📁 Results for '%s' will be saved to collection: '%s'", run.query, run.collection_name)
+    return runs, searches
+
 
-        print(f"\n✨ Search complete!")
-        print(f"📊 {total_journals_with_results} journals had results for the query '{query}'")
-        print(f"📝 Total articles saved: {total_articles_saved}")
-        print(f"📁 Data saved to collection: '{results_collection_name}'")
-        
-    except Exception as e:
-        print(f"\n❌ Fatal error in search_garuda_for_query: {e}")
-        import traceback
-        traceback.print_exc()
+def searchable_links(source_collection):
+    """The Garuda links of the journals of a source collection that can be searched, sorted."""
+    journals = database.get_sinta_journals_for_garuda_search(source_collection)
+    return sorted({j["garuda_link"] for j in journals if _is_searchable(j)})
+
+
+def _open_writers(stack, runs):
+    for run in runs:
+        writer = run.open_writer()
+        if writer is None:
+            return False
+        # Registered first, so it runs after the writer's last flush has marked journals done.
+        stack.callback(run.checkpointer.flush)
+        stack.enter_context(writer)
+    return True
+
+
+def _report(runs):
+    logger.info("✨ Search complete!")
+    for run in runs:
+        logger.info("📊 %s journals had results for the query '%s'", run.journals_with_results, run.query)
+        logger.info("📝 Total articles saved: %s", run.articles_saved)
+        label = "Article hits" if isinstance(run.writer, article_store.ArticleStoreWriter) else "Result documents"
+        logger.info("💾 %s: %s inserted, %s modified, %s unchanged", label, run.writer.inserted, run.writer.modified, run.writer.unchanged)
+        if run.failed:
+            logger.warning("⚠️ %s journals failed; their progress is kept, run the search again to retry them.", run.failed)
+        run.finish()
+        logger.info("📁 Data saved to collection: '%s'", run.collection_name)
+    if len(runs) > 1:
+        logger.info("📦 Batch total: %s articles saved for %s queries.", sum(run.articles_saved for run in runs), len(runs))
+
+
+def iter_garuda_articles(queries, source_collection, resume=True, incremental=False, stale_after=None,
+                         fetch_workers=config.GARUDA_MAX_CONCURRENCY,
+                         parse_workers=config.GARUDA_PIPELINE_PARSE_WORKERS,
+                         per_host=config.GARUDA_PER_HOST_CONCURRENCY,
+                         queue_size=config.GARUDA_PIPELINE_QUEUE_SIZE):
+    """
+    Runs a pipelined search (see _search_pipeline) and yields every new article as soon as
+    its page is persisted, as a dict with its title and download_link plus the query,
+    journal_name, garuda_link and sinta_level it was found with. Results are saved and
+    checkpointed exactly as by search_garuda_for_queries; stopping the iteration early
+    flushes what was found so far and keeps the checkpoints for a later resume.
+    The generator returns the number of articles saved, or None if nothing could be searched.
+    """
+    prepared = _prepare_runs(queries, source_collection, resume, incremental, stale_after)
+    if prepared is None:
+        return None
+    runs, searches = prepared
+    logger.info("🔎 Starting pipeline%s search for %s %s (%s journal searches)", " incremental" if incremental else "", len(runs), "query" if len(runs) == 1 else "queries", len(searches))
+
+    with contextlib.ExitStack() as stack:
+        if not _open_writers(stack, runs):
+            return None
+        for search, new_articles in _search_pipeline(searches, fetch_workers, parse_workers, per_host, queue_size):
+            for article in new_articles:
+                yield {
+                    **article,
+                    "query": search.query,
+                    "journal_name": search.name,
+                    "garuda_link": search.garuda_link,
+                    "sinta_level": search.journal.get("sinta"),
+                }
+    _report(runs)
+    return sum(run.articles_saved for run in runs)
+
+
+def search_garuda_for_queries(queries, source_collection, mode="serial", resume=True, incremental=False, stale_after=None,
+                              max_workers=config.GARUDA_MAX_CONCURRENCY,
+                              per_host=config.GARUDA_PER_HOST_CONCURRENCY):
+    """
+    Searches every Garuda journal of a source collection for each of `queries` in one pass.
+    The journal list is loaded once and all (journal, query) work items share one worker pool
+    and one HTTP session; each query's results still go to its own collection.
+    With mode="concurrent", up to `max_workers` work items run at once, with at most
+    `per_host` requests in flight to one host. mode="pipeline" fetches with `max_workers`
+    threads, parses and persists in separate stages (see iter_garuda_articles).
+    Progress is checkpointed per journal and page. With resume=True an interrupted run of the
+    same (query, source_collection) skips finished journals and continues unfinished ones where
+    they stopped; resume=False discards saved progress and starts over.
+    With incremental=True, journals that already have stored results for a query are only
+    paged until a page holds no new article, and just the new articles are added.
+    With `stale_after` (seconds), only journals not crawled within that time are searched;
+    search_index.search() answers from what is stored for the others.
+    Returns the number of articles saved, or None if nothing could be searched.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}'. Expected one of {SEARCH_MODES}.")
+
+    if mode == "pipeline":
+        articles = iter_garuda_articles(queries, source_collection, resume, incremental, stale_after,
+                                        fetch_workers=max_workers, per_host=per_host)
+        while True:
+            try:
+                next(articles)
+            except StopIteration as done:
+                return done.value
+
+    prepared = _prepare_runs(queries, source_collection, resume, incremental, stale_after)
+    if prepared is None:
+        return None
+    runs, searches = prepared
+    kind = f"{mode}{' incremental' if incremental else ''}"
+    if len(runs) == 1:
+        logger.info("🔎 Starting %s search for query: '%s'", kind, runs[0].query)
+    else:
+        logger.info("🔎 Starting %s batch search for %s queries (%s journal searches)", kind, len(runs), len(searches))
+
+    with contextlib.ExitStack() as stack:
+        if not _open_writers(stack, runs):
+            return None
+        if mode == "concurrent":
+            asyncio.run(_search_concurrent(searches, max_workers, per_host))
+        else:
+            _search_serial(searches)
+
+    _report(runs)
+    return sum(run.articles_saved for run in runs)
+
+
+def search_garuda_journals(query, source_collection, garuda_links, mode="serial", incremental=False,
+                           max_workers=config.GARUDA_MAX_CONCURRENCY,
+                           per_host=config.GARUDA_PER_HOST_CONCURRENCY):
+    """
+    Searches only the journals of `source_collection` whose Garuda link is in `garuda_links`:
+    one shard of a distributed search (see garuda_shards). Results and checkpoints go where
+    search_garuda_for_query puts them, and finished journals are skipped, but the run is not
+    finalized: the results are not indexed and the checkpoints are kept for the other shards.
+    Returns the QueryRun, or None if nothing could be searched.
+    """
+    prepared = _prepare_runs([query], source_collection, True, incremental, garuda_links=garuda_links)
+    if prepared is None:
+        return None
+    runs, searches = prepared
+    with contextlib.ExitStack() as stack:
+        if not _open_writers(stack, runs):
+            return None
+        if mode == "pipeline":
+            for _ in _search_pipeline(searches, max_workers, config.GARUDA_PIPELINE_PARSE_WORKERS, per_host,
+                                      config.GARUDA_PIPELINE_QUEUE_SIZE):
+                pass
+        elif mode == "concurrent":
+            asyncio.run(_search_concurrent(searches, max_workers, per_host))
+        else:
+            _search_serial(searches)
+    run = runs[0]
+    search_index.mark_crawled(run.query, [s.garuda_link for s in run.searches if s.done and not s.failed])
+    return run
+
+
+def search_garuda_for_query(query, source_collection, mode="serial", resume=True, incremental=False, stale_after=None,
+                            max_workers=config.GARUDA_MAX_CONCURRENCY,
+                            per_host=config.GARUDA_PER_HOST_CONCURRENCY):
+    """
+    Iterates over Garuda links from a specified database collection and searches for a given query.
+    See search_garuda_for_queries for the options and the return value.
+    """
+    return search_garuda_for_queries(
+        [query], source_collection, mode=mode, resume=resume, incremental=incremental, stale_after=stale_after,
+        max_workers=max_workers, per_host=per_host,
+    )
@@ -0,0 +1,265 @@
+# garuda_shards.py
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, ReturnDocument
+
+from . import config
+from . import database
+from . import garuda_scraper
+from . import jobs
+from . import search_index
+from .checkpoints import Checkpointer
+
+logger = logging.getLogger(__name__)
+
+# Distributed Garuda search: one (source collection, query) search split over many workers.
+# The coordinator (a `garuda_distributed` job) splits the journal list into shards stored in
+# GARUDA_SHARDS_COLLECTION and queues `garuda_shard` helper jobs. Every worker on the search,
+# the coordinator included, leases one shard at a time, renews the lease while searching it,
+# and marks it done. A shard whose lease expires (its worker died) is leased again by
+# another worker, which resumes from the shared per-journal checkpoints. All shards write to
+# the same results collection with the usual upserts, so the results merge by themselves.
+SHARD_STATUSES = ("pending", "leased", "done", "failed")
+
+# Same form as the worker ids of worker.py; a worker process runs one job at a time.
+_worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def run_id(query, source_collection):
+    """One distributed search per (source collection, query), like the checkpoints."""
+    return f"{source_collection}:{query}"
+
+
+def _shards():
+    db = database.get_db()
+    if db is None:
+        return None
+    shards = db[config.GARUDA_SHARDS_COLLECTION]
+    database.ensure_indexes(shards, [("run_id", ASCENDING), ("status", ASCENDING), ("index", ASCENDING)], unique=False)
+    return shards
+
+
+def plan_shards(links, count):
+    """Splits sorted links into at most `count` contiguous shards whose sizes differ by at most one."""
+    count = max(1, min(count, len(links)))
+    size, extra = divmod(len(links), count)
+    shards, start = [], 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(links[start:end])
+        start = end
+    return [shard for shard in shards if shard]
+
+
+def _lease(shards, rid):
+    """Atomically leases the next pending shard of a run, or one whose lease expired. Returns it or None."""
+    now = _now()
+    return shards.find_one_and_update(
+        {
+            "run_id": rid,
+            "attempts": {"$lt": config.JOB_MAX_ATTEMPTS},
+            "$or": [{"status": "pending"}, {"status": "leased", "lease_expires": {"$lt": now}}],
+        },
+        {
+            "$set": {"status": "leased", "owner": _worker_id,
+                     "lease_expires": now + timedelta(seconds=config.GARUDA_SHARD_LEASE), "updated_at": now},
+            "$inc": {"attempts": 1},
+        },
+        sort=[("index", ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+class _LeaseKeeper(threading.Thread):
+    """Renews the lease of the shard being searched until stopped."""
+
+    def __init__(self, shards, shard):
+        super().__init__(daemon=True)
+        self.shards = shards
+        self.shard = shard
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(config.GARUDA_SHARD_LEASE / 3):
+            try:
+                result = self.shards.update_one(
+                    {"_id": self.shard["_id"], "status": "leased", "owner": _worker_id},
+                    {"$set": {"lease_expires": _now() + timedelta(seconds=config.GARUDA_SHARD_LEASE)}},
+                )
+                if not result.matched_count:
+                    # Another worker took it over after a missed renewal; both finishing is harmless.
+                    logger.warning("⚠️ Lost the lease of shard %s.", self.shard["_id"])
+                    return
+            except Exception as e:
+                logger.warning("⚠️ Could not renew the lease of shard %s: %s", self.shard["_id"], e)
+
+
+def _attempt_failed(shards, shard, error):
+    """Puts a shard back in the pool for another lease, or fails it after its last allowed attempt."""
+    status = "failed" if shard["attempts"] >= config.JOB_MAX_ATTEMPTS else "pending"
+    shards.update_one({"_id": shard["_id"]}, {"$set": {
+        "status": status, "error": error, "updated_at": _now(),
+    }})
+    logger.error("❌ Shard %s failed (attempt %s): %s", shard["_id"], shard["attempts"], error)
+
+
+def _search_shard(shards, shard):
+    keeper = _LeaseKeeper(shards, shard)
+    keeper.start()
+    try:
+        run = garuda_scraper.search_garuda_journals(
+            shard["query"], shard["source_collection"], shard["links"], mode=shard["mode"],
+            incremental=shard["incremental"], max_workers=shard["max_workers"], per_host=shard["per_host"],
+        )
+    except Exception as e:
+        _attempt_failed(shards, shard, f"{type(e).__name__}: {e}")
+        return
+    finally:
+        keeper.stopped.set()
+    if run is None:
+        # No database connection or no journals: its journals were not searched.
+        _attempt_failed(shards, shard, "the shard's journals could not be searched")
+        return
+    # Indexed per shard, so the whole results collection is never reindexed. All of its
+    # journals: those finished by an earlier, interrupted lease are not in this run.
+    search_index.index_collection(run.collection_name, shard["links"])
+    shards.update_one({"_id": shard["_id"]}, {"$set": {
+        "status": "done",
+        "articles": run.articles_saved,
+        "failed_journals": run.failed,
+        "finished_at": _now(),
+        "updated_at": _now(),
+    }})
+
+
+def work(run_id):
+    """
+    Leases and searches the shards of a distributed search until none is left to lease.
+    The handler of `garuda_shard` jobs. Returns how many shards this worker searched,
+    or None without a database connection.
+    """
+    shards = _shards()
+    if shards is None:
+        logger.warning("💔 Cannot work on shards, no database connection.")
+        return None
+    searched = 0
+    while True:
+        shard = _lease(shards, run_id)
+        if shard is None:
+            break
+        logger.info("🧩 Shard %s of '%s': %s journals (attempt %s).", shard["index"] + 1, run_id, len(shard["links"]), shard["attempts"])
+        _search_shard(shards, shard)
+        searched += 1
+    logger.info("🧩 No shards of '%s' left to lease; this worker searched %s.", run_id, searched)
+    return searched
+
+
+def _give_up_expired(shards, rid):
+    """Fails shards that are out of attempts: pending ones, and leased ones whose lease expired."""
+    shards.update_many(
+        {
+            "run_id": rid,
+            "attempts": {"$gte": config.JOB_MAX_ATTEMPTS},
+            "$or": [{"status": "pending"}, {"status": "leased", "lease_expires": {"$lt": _now()}}],
+        },
+        {"$set": {"status": "failed", "updated_at": _now()}},
+    )
+
+
+def search_garuda_distributed(query, source_collection, shards=config.GARUDA_SHARD_COUNT, mode="concurrent",
+                              resume=True, incremental=False,
+                              max_workers=config.GARUDA_MAX_CONCURRENCY,
+                              per_host=config.GARUDA_PER_HOST_CONCURRENCY):
+    """
+    Searches every Garuda journal of a source collection for `query`, split into `shards`
+    shards worked on by as many workers as are free (see the module comment). Each shard is
+    searched with `mode`, `max_workers` and `per_host` as in search_garuda_for_query. The
+    calling worker searches shards too, then waits until the others are done and clears the
+    checkpoints if no journal failed. Each shard indexes its own journals' results.
+    With resume=True an interrupted distributed search carries on with its unfinished shards.
+    """
+    if mode not in garuda_scraper.SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}'. Expected one of {garuda_scraper.SEARCH_MODES}.")
+    coll = _shards()
+    if coll is None:
+        logger.warning("💔 Cannot start a distributed search, no database connection.")
+        return None
+
+    rid = run_id(query, source_collection)
+    unfinished = coll.count_documents({"run_id": rid, "status": {"$in": ["pending", "leased"]}})
+    if not resume:
+        coll.delete_many({"run_id": rid})
+        Checkpointer(source_collection, query).clear()
+    elif not unfinished:
+        coll.delete_many({"run_id": rid})  # the last distributed search of this query finished
+
+    if unfinished and resume:
+        logger.info("⏯️  Resuming distributed search '%s': %s shards unfinished.", rid, unfinished)
+    else:
+        links = garuda_scraper.searchable_links(source_collection)
+        if not links:
+            logger.error("❌ No journals with Garuda links found in the collection '%s'. Run the Sinta scraper first.", source_collection)
+            return None
+        planned = plan_shards(links, shards)
+        now = _now()
+        coll.insert_many([{
+            "_id": f"{rid}:{index}",
+            "run_id": rid,
+            "index": index,
+            "query": query,
+            "source_collection": source_collection,
+            "links": shard_links,
+            "mode": mode,
+            "incremental": incremental,
+            "max_workers": max_workers,
+            "per_host": per_host,
+            "status": "pending",
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        } for index, shard_links in enumerate(planned)])
+        unfinished = len(planned)
+        logger.info("🧩 Split %s journals of '%s' into %s shards for '%s'.", len(links), source_collection, len(planned), query)
+
+    # One helper per other shard; helpers that find nothing left to lease finish at once.
+    for _ in range(unfinished - 1):
+        jobs.enqueue("garuda_shard", {"run_id": rid})
+
+    started = time.monotonic()
+    while True:
+        work(rid)
+        _give_up_expired(coll, rid)
+        if not coll.count_documents({"run_id": rid, "status": {"$in": ["pending", "leased"]}}):
+            break
+        time.sleep(config.GARUDA_SHARD_POLL_INTERVAL)
+
+    summary = list(coll.aggregate([
+        {"$match": {"run_id": rid}},
+        {"$group": {
+            "_id": None,
+            "shards": {"$sum": 1},
+            "failed_shards": {"$sum": {"$cond": [{"$eq": ["$status", "failed"]}, 1, 0]}},
+            "articles": {"$sum": {"$ifNull": ["$articles", 0]}},
+            "failed_journals": {"$sum": {"$ifNull": ["$failed_journals", 0]}},
+            "workers": {"$addToSet": "$owner"},
+        }},
+    ]))[0]
+    summary.pop("_id")
+    summary["workers"] = len(summary["workers"])
+
+    collection_name = garuda_scraper.results_collection_name(query, source_collection)
+    if not summary["failed_shards"] and not summary["failed_journals"]:
+        Checkpointer(source_collection, query).clear()
+
+    logger.info("✨ Distributed search complete in %.1fs: %s shards on %s workers, %s articles saved to '%s'.", time.monotonic() - started, summary["shards"], summary["workers"], summary["articles"], collection_name)
+    if summary["failed_shards"] or summary["failed_journals"]:
+        logger.warning("⚠️ %s shards and %s journals failed; their progress is kept, run the search again to retry them.", summary["failed_shards"], summary["failed_journals"])
+    return summary
@@ -0,0 +1,241 @@
+# http_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from . import config
+
+CACHE_MODES = ("off", "on", "replay")
+
+# The stored body is already decoded, so these no longer describe it.
+_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+# Request headers of a re-crawl: a stored copy is revalidated instead of served, however fresh.
+REVALIDATE = {"Cache-Control": "no-cache"}
+
+
+class ResponseCache:
+    """
+    Stores HTTP responses in a SQLite file. The total size of stored bodies is kept
+    under `max_bytes` by evicting the least recently used entries.
+    """
+
+    def __init__(self, path, max_bytes):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT,"
+            " body BLOB, size INTEGER, stored_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        """Returns the entry stored under `key` as a dict, or None, and marks it as recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        url, status, headers, body, stored_at = row
+        return {"url": url, "status": status, "headers": json.loads(headers), "body": body, "stored_at": stored_at}
+
+    def put(self, key, url, status, headers, body):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), body, len(body), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key, headers):
+        """Marks an entry as fresh again after the server confirmed it with a 304."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET headers = ?, stored_at = ? WHERE key = ?",
+                (json.dumps(headers), time.time(), key),
+            )
+            self._conn.commit()
+
+    def entries(self, url_contains=""):
+        """Yields (url, status, body) of stored responses, e.g. to re-run parsers offline."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, status, body FROM responses WHERE instr(url, ?) > 0 ORDER BY stored_at", (url_contains,)
+            ).fetchall()
+        yield from rows
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 50"
+            ).fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Transport adapter that answers requests from a ResponseCache.
+    - "on": fresh GET entries (younger than `ttl`) are served without a request; stale ones
+      are revalidated with If-None-Match / If-Modified-Since when the server sent an ETag or
+      Last-Modified. POSTs always go to the network because they change server-side state
+      (the Sinta filters), but their responses are stored for replay.
+    - "replay": only stored responses are served, whatever their age; a miss raises
+      requests.ConnectionError, so no request ever leaves the machine.
+    - "off": every request goes to the network.
+    `scope` is mixed into every key, for responses that depend on state the URL does not show.
+    A GET sent with REVALIDATE headers, or any GET while `revalidate` is set, skips the TTL
+    and is revalidated, so re-crawls see new content.
+    `cache` defaults to the shared cache, which is only opened by the first cached request.
+    """
+
+    def __init__(self, cache=None, mode="on", ttl=3600, **kwargs):
+        super().__init__(**kwargs)
+        self._cache = cache
+        self.mode = mode
+        self.ttl = ttl
+        self.scope = ""
+        self.revalidate = False
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = get_cache()
+        return self._cache
+
+    def send(self, request, stream=False, **kwargs):
+        if self.mode == "off" or stream or request.method not in ("GET", "POST"):
+            return self._send_network(request, stream=stream, **kwargs)
+
+        key = self._key(request)
+        entry = self.cache.get(key)
+
+        if self.mode == "replay":
+            if entry is None:
+                raise requests.ConnectionError(
+                    f"Replay mode: no cached response for {request.method} {request.url}", request=request
+                )
+            return self._build_cached_response(request, entry)
+
+        if request.method == "GET" and entry is not None:
+            fresh = time.time() - entry["stored_at"] < self.ttl
+            if fresh and not self.revalidate and "no-cache" not in request.headers.get("Cache-Control", ""):
+                return self._build_cached_response(request, entry)
+            request = self._add_validators(request, entry)
+
+        resp = self._send_network(request, stream=stream, **kwargs)
+
+        if resp.status_code == 304 and entry is not None:
+            headers = dict(entry["headers"])
+            headers.update(self._storable_headers(resp.headers))
+            self.cache.refresh(key, headers)
+            entry["headers"] = headers
+            return self._build_cached_response(request, entry)
+
+        if resp.status_code == 200:
+            self.cache.put(key, request.url, resp.status_code, self._storable_headers(resp.headers), resp.content)
+        return resp
+
+    def _send_network(self, request, **kwargs):
+        return super().send(request, **kwargs)
+
+    def _key(self, request):
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        digest = hashlib.sha256()
+        for part in (request.method.encode(), request.url.encode(), body, self.scope.encode()):
+            digest.update(part)
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @staticmethod
+    def _add_validators(request, entry):
+        headers = CaseInsensitiveDict(entry["headers"])
+        if "etag" not in headers and "last-modified" not in headers:
+            return request
+        request = request.copy()
+        if "etag" in headers:
+            request.headers["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            request.headers["If-Modified-Since"] = headers["last-modified"]
+        return request
+
+    @staticmethod
+    def _storable_headers(headers):
+        return {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS}
+
+    def _build_cached_response(self, request, entry):
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp._content = entry["body"]
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "OK"
+        resp.connection = self
+        resp.from_cache = True
+        return resp
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the response cache shared by every scraper session in this process."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(os.path.join(config.HTTP_CACHE_DIR, "responses.sqlite3"), config.HTTP_CACHE_MAX_BYTES)
+    return _cache
+
+
+def install(session, mode=config.HTTP_CACHE_MODE, ttl=config.HTTP_CACHE_TTL):
+    """Mounts a CachingAdapter backed by the shared cache on a session."""
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown HTTP cache mode '{mode}'. Expected one of {CACHE_MODES}.")
+    if mode == "off":
+        return session
+    adapter = CachingAdapter(mode=mode, ttl=ttl)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def set_scope(session, scope):
+    """Sets the extra cache-key component of every CachingAdapter mounted on a session."""
+    for adapter in session.adapters.values():
+        if isinstance(adapter, CachingAdapter):
+            adapter.scope = scope
+
+
+def set_revalidate(session, revalidate):
+    """Makes every CachingAdapter mounted on a session revalidate its GETs instead of serving fresh entries."""
+    for adapter in session.adapters.values():
+        if isinstance(adapter, CachingAdapter):
+            adapter.revalidate = revalidate
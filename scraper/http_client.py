@@ -0,0 +1,165 @@
+# http_client.py
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import requests
+
+from . import config
+from . import http_cache
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down" or "try again later".
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class AdaptiveRateLimiter:
+    """
+    Paces requests per host with AIMD: every success raises the host's rate by `increase`
+    requests/second up to `max_rate`; a throttling response, a server error or a timeout
+    multiplies it by `decrease`, down to `min_rate`. Thread-safe.
+    """
+
+    def __init__(self, initial_rate, min_rate, max_rate, increase, decrease):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = {"rate": self.initial_rate, "next_at": 0.0}
+        return self._hosts[host]
+
+    def wait(self, host):
+        """Blocks until the next request to `host` may be sent."""
+        with self._lock:
+            state = self._host(host)
+            now = time.monotonic()
+            slot = max(now, state["next_at"])
+            state["next_at"] = slot + 1 / state["rate"]
+        if slot > now:
+            time.sleep(slot - now)
+
+    def on_success(self, host):
+        with self._lock:
+            state = self._host(host)
+            state["rate"] = min(self.max_rate, state["rate"] + self.increase)
+
+    def on_throttle(self, host, retry_after=None):
+        """Backs off after an error; `retry_after` seconds, if the server sent it, hold every request to the host."""
+        with self._lock:
+            state = self._host(host)
+            state["rate"] = max(self.min_rate, state["rate"] * self.decrease)
+            pause = retry_after if retry_after is not None else 1 / state["rate"]
+            state["next_at"] = max(state["next_at"], time.monotonic() + pause)
+
+    def rates(self):
+        """Current requests/second of every host seen so far."""
+        with self._lock:
+            return {host: state["rate"] for host, state in self._hosts.items()}
+
+
+limiter = AdaptiveRateLimiter(
+    config.HTTP_RATE_INITIAL, config.HTTP_RATE_MIN, config.HTTP_RATE_MAX,
+    config.HTTP_RATE_INCREASE, config.HTTP_RATE_DECREASE,
+)
+
+
+def retry_after(resp):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base=config.HTTP_BACKOFF_BASE, cap=config.HTTP_BACKOFF_MAX):
+    """Exponential backoff with full jitter: a random delay up to base * 2^attempt, capped."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class FetchAdapter(http_cache.CachingAdapter):
+    """
+    CachingAdapter whose network requests are paced by the shared AdaptiveRateLimiter and
+    retried with exponential backoff on RETRY_STATUSES, timeouts and connection errors.
+    Cache hits never touch the network, so they are neither paced nor retried.
+    """
+
+    def __init__(self, cache=None, mode="on", ttl=3600, rate_limiter=limiter, retries=config.HTTP_MAX_RETRIES, **kwargs):
+        super().__init__(cache, mode=mode, ttl=ttl, **kwargs)
+        self.rate_limiter = rate_limiter
+        self.retries = retries
+
+    def _send_network(self, request, **kwargs):
+        host = urlparse(request.url).netloc
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            self.rate_limiter.wait(host)
+            start = time.perf_counter()
+            try:
+                resp = super()._send_network(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.fetch_seconds.observe(time.perf_counter() - start, host=host)
+                metrics.http_requests.inc(host=host, status="error")
+                self.rate_limiter.on_throttle(host)
+                if last_attempt:
+                    raise
+                delay = backoff_delay(attempt)
+                metrics.http_retries.inc(host=host, reason=type(e).__name__)
+                logger.warning("   🔁 %s on %s, retrying in %.1fs (%d/%d)", type(e).__name__, request.url, delay, attempt + 1, self.retries)
+                time.sleep(delay)
+                continue
+            metrics.fetch_seconds.observe(time.perf_counter() - start, host=host)
+            metrics.http_requests.inc(host=host, status=resp.status_code)
+
+            if resp.status_code not in RETRY_STATUSES:
+                self.rate_limiter.on_success(host)
+                return resp
+
+            server_delay = retry_after(resp)
+            self.rate_limiter.on_throttle(host, server_delay)
+            if last_attempt:
+                return resp
+            delay = max(server_delay or 0.0, backoff_delay(attempt))
+            metrics.http_retries.inc(host=host, reason=resp.status_code)
+            logger.warning("   🔁 HTTP %s on %s, retrying in %.1fs (%d/%d)", resp.status_code, request.url, delay, attempt + 1, self.retries)
+            resp.close()
+            time.sleep(delay)
+
+
+def create_session(headers, cache_mode=config.HTTP_CACHE_MODE, cache_ttl=config.HTTP_CACHE_TTL, retries=config.HTTP_MAX_RETRIES):
+    """
+    Returns a requests.Session for a scraper: response cache, retries and adaptive pacing,
+    with a connection pool large enough for the concurrent modes. Sessions are separate so
+    each keeps its own cookies and cache scope; the rate limiter is shared by all of them.
+    `retries=0` leaves retrying to a caller that has its own loop (resumable downloads).
+    """
+    if cache_mode not in http_cache.CACHE_MODES:
+        raise ValueError(f"Unknown HTTP cache mode '{cache_mode}'. Expected one of {http_cache.CACHE_MODES}.")
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = FetchAdapter(
+        mode=cache_mode,
+        ttl=cache_ttl,
+        retries=retries,
+        pool_connections=config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=config.HTTP_POOL_MAXSIZE,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,232 @@
+# jobs.py
+import logging
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from . import config
+from . import database
+from . import progress
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+JOB_TYPES = ("sinta", "garuda", "garuda_batch", "garuda_distributed", "garuda_shard", "reindex", "pdf_harvest", "scheduled_crawl")
+
+
+def _handlers():
+    # Imported lazily: the API only enqueues and never needs the scrapers loaded for this.
+    from . import sinta_scraper
+    from . import garuda_scraper
+    from . import garuda_shards
+    from . import pdf_harvester
+    from . import scheduler
+    from . import search_index
+    return {
+        "sinta": sinta_scraper.scrape_all_sinta_journals,
+        "garuda": garuda_scraper.search_garuda_for_query,
+        "garuda_batch": garuda_scraper.search_garuda_for_queries,
+        "garuda_distributed": garuda_shards.search_garuda_distributed,
+        "garuda_shard": garuda_shards.work,
+        "reindex": search_index.rebuild,
+        "pdf_harvest": pdf_harvester.harvest_pdfs,
+        "scheduled_crawl": scheduler.crawl,
+    }
+
+
+def concurrency_limits():
+    """Parses JOB_CONCURRENCY ("sinta=1,garuda=2") into {job_type: max running jobs}."""
+    limits = {job_type: 1 for job_type in JOB_TYPES}
+    for item in config.JOB_CONCURRENCY.split(','):
+        if '=' in item:
+            job_type, limit = item.split('=', 1)
+            limits[job_type.strip()] = int(limit)
+    return limits
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _jobs():
+    db = database.get_db()
+    if db is None:
+        return None
+    jobs = db[config.JOBS_COLLECTION]
+    database.ensure_indexes(jobs, [("status", ASCENDING), ("type", ASCENDING), ("created_at", ASCENDING)], unique=False)
+    database.ensure_indexes(jobs, [("status", ASCENDING), ("heartbeat_at", ASCENDING)], unique=False)
+    return jobs
+
+
+def _slots():
+    return database.get_db()[config.JOB_SLOTS_COLLECTION]
+
+
+def _public(job):
+    if job is not None:
+        job["_id"] = str(job["_id"])
+    return job
+
+
+def enqueue(job_type, params):
+    """Queues a job and returns its id, or None if there is no database connection."""
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"Unknown job type '{job_type}'. Expected one of {JOB_TYPES}.")
+    jobs = _jobs()
+    if jobs is None:
+        logger.warning("💔 Cannot queue job, no database connection.")
+        return None
+    result = jobs.insert_one({
+        "type": job_type,
+        "params": params,
+        "status": "queued",
+        "attempts": 0,
+        "created_at": _now(),
+    })
+    return str(result.inserted_id)
+
+
+def get_job(job_id):
+    jobs = _jobs()
+    if jobs is None:
+        return None
+    try:
+        return _public(jobs.find_one({"_id": ObjectId(job_id)}))
+    except InvalidId:
+        return None
+
+
+def list_jobs(status=None, limit=50):
+    """Returns the most recent jobs, newest first."""
+    jobs = _jobs()
+    if jobs is None:
+        return []
+    query = {"status": status} if status else {}
+    return [_public(job) for job in jobs.find(query).sort("created_at", -1).limit(limit)]
+
+
+def _acquire_slot(job_type, limit):
+    """Atomically takes one of the `limit` running slots of a job type. Returns False when all are taken."""
+    try:
+        _slots().update_one(
+            {"_id": job_type, "running": {"$lt": limit}},
+            {"$inc": {"running": 1}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # The slot document exists but is full, so the upsert tried to insert a second one.
+        return False
+    return True
+
+
+def _release_slot(job_type):
+    _slots().update_one({"_id": job_type, "running": {"$gt": 0}}, {"$inc": {"running": -1}})
+
+
+def claim(worker_id, job_types=None):
+    """
+    Atomically claims the oldest queued job whose type has a free slot, marks it running
+    for `worker_id` and returns it, or returns None when nothing can run now.
+    """
+    jobs = _jobs()
+    if jobs is None:
+        return None
+    limits = concurrency_limits()
+    allowed = job_types or JOB_TYPES
+
+    # Types with queued work, oldest waiting job first.
+    waiting = jobs.aggregate([
+        {"$match": {"status": "queued", "type": {"$in": list(allowed)}}},
+        {"$group": {"_id": "$type", "oldest": {"$min": "$created_at"}}},
+        {"$sort": {"oldest": 1}},
+    ])
+    for group in waiting:
+        job_type = group["_id"]
+        if not _acquire_slot(job_type, limits.get(job_type, 1)):
+            continue
+        now = _now()
+        job = jobs.find_one_and_update(
+            {"status": "queued", "type": job_type},
+            {"$set": {"status": "running", "worker_id": worker_id, "started_at": now, "heartbeat_at": now},
+             "$inc": {"attempts": 1}},
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if job is not None:
+            return _public(job)
+        # Another worker took the last queued job of this type.
+        _release_slot(job_type)
+    return None
+
+
+def heartbeat(job_id, worker_id):
+    """Tells other workers that this job is still being worked on. Returns False if it was taken away."""
+    result = _jobs().update_one(
+        {"_id": ObjectId(job_id), "status": "running", "worker_id": worker_id},
+        {"$set": {"heartbeat_at": _now()}},
+    )
+    return result.matched_count == 1
+
+
+def finish(job, worker_id, error=None):
+    """Marks a claimed job completed (or failed with `error`) and frees its slot."""
+    result = _jobs().update_one(
+        {"_id": ObjectId(job["_id"]), "status": "running", "worker_id": worker_id},
+        {"$set": {
+            "status": "failed" if error else "completed",
+            "error": error,
+            "finished_at": _now(),
+        }},
+    )
+    if result.matched_count:
+        _release_slot(job["type"])
+        progress.finish(job["_id"], job["type"], "failed" if error else "completed", error)
+
+
+def requeue_stale(stale_after=config.JOB_STALE_AFTER, max_attempts=config.JOB_MAX_ATTEMPTS):
+    """
+    Puts running jobs whose worker stopped sending heartbeats back in the queue (or fails
+    them after `max_attempts`) and frees their slots. Only this running -> queued change
+    frees a lost job's slot, as finish() only frees it while the job is still running, so
+    every slot is freed once and counters of jobs being claimed meanwhile are left alone.
+    Garuda searches checkpoint their progress, so a requeued one resumes where it stopped.
+    """
+    jobs = _jobs()
+    if jobs is None:
+        return 0
+    cutoff = _now() - timedelta(seconds=stale_after)
+    requeued = 0
+    while True:
+        job = jobs.find_one_and_update(
+            {"status": "running", "heartbeat_at": {"$lt": cutoff}},
+            {"$set": {"status": "queued", "worker_id": None}},
+        )
+        if job is None:
+            break
+        _release_slot(job["type"])
+        if job["attempts"] >= max_attempts:
+            jobs.update_one(
+                {"_id": job["_id"], "status": "queued"},
+                {"$set": {"status": "failed", "error": "Worker stopped responding too many times.", "finished_at": _now()}},
+            )
+            logger.error("❌ Job %s (%s) lost its worker %s %s times, giving up.", job["_id"], job["type"], job.get("worker_id"), job["attempts"])
+            progress.finish(job["_id"], job["type"], "failed", "Worker stopped responding too many times.")
+        else:
+            logger.info("♻️ Job %s (%s) lost its worker %s, requeued.", job["_id"], job["type"], job.get("worker_id"))
+            progress.publish(job["_id"], {"type": job["type"], "status": "queued"})
+        requeued += 1
+    return requeued
+
+
+def run(job):
+    """
+    Runs a claimed job's handler with its stored parameters. Handlers return None when they
+    could do nothing (no database connection, no journals, filters not applied); that is
+    raised as an error, so the job is recorded as failed.
+    """
+    result = _handlers()[job["type"]](**job["params"])
+    if result is None:
+        raise RuntimeError(f"The {job['type']} job could not run; see the worker's log for the reason.")
+    return result
@@ -0,0 +1,60 @@
+# log.py
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+from . import config
+
+# Leveled logging for the scrapers. The hot loops log per page at DEBUG and per journal at
+# INFO with %-style arguments, so a disabled level costs one integer comparison.
+# LOG_FORMAT=text prints bare messages, like the CLI always did; LOG_FORMAT=json prints one
+# JSON object per line with the id of the job being run, for log collectors.
+
+# A worker process runs one job at a time, and the job's own threads (concurrent and
+# pipeline searches) must log its id too, so this is process-wide rather than a ContextVar.
+_job_id = None
+
+
+def set_job_id(job_id):
+    """Tags every following log record of this process with `job_id` (None to clear)."""
+    global _job_id
+    _job_id = job_id
+
+
+class _JobFilter(logging.Filter):
+    def filter(self, record):
+        record.job_id = _job_id
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "job_id", None):
+            entry["job_id"] = record.job_id
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure(level=None, fmt=None):
+    """Sets up the root logger for an entry point (CLI, API, worker). Safe to call more than once."""
+    level = (level or config.LOG_LEVEL).upper()
+    fmt = fmt or config.LOG_FORMAT
+    handler = logging.StreamHandler(sys.stdout)
+    handler.addFilter(_JobFilter())
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(message)s"))
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
@@ -0,0 +1,201 @@
+# metrics.py
+import bisect
+import contextlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from . import config
+
+# In-process counters and histograms for the scraping hot paths, rendered in the Prometheus
+# text format. Worker processes push snapshots to METRICS_COLLECTION (see push()); the API's
+# /metrics endpoint renders its own metrics plus every live worker's, each with an `instance` label.
+
+# Seconds; covers a fast parse (1 ms) up to a slow, retried fetch.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def snapshot(self):
+        with self._lock:
+            samples = [[list(key), self._copy(value)] for key, value in self._values.items()]
+        return {"type": self.kind, "help": self.help, "labels": list(self.labels), "samples": samples}
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, seconds, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            value = self._values.get(key)
+            if value is None:
+                value = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            if index < len(self.buckets):
+                value["buckets"][index] += 1
+            value["sum"] += seconds
+            value["count"] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        snapshot = super().snapshot()
+        snapshot["buckets"] = list(self.buckets)
+        return snapshot
+
+    @staticmethod
+    def _copy(value):
+        return {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+
+
+_registry = {}
+
+
+def _register(metric):
+    _registry[metric.name] = metric
+    return metric
+
+
+# --- Hot path metrics ---
+
+http_requests = _register(Counter(
+    "scraper_http_requests_total", "HTTP responses by host and status code ('error' for timeouts and connection errors).",
+    ("host", "status")))
+http_retries = _register(Counter(
+    "scraper_http_retries_total", "HTTP requests retried, by host and reason.", ("host", "reason")))
+fetch_seconds = _register(Histogram(
+    "scraper_fetch_seconds", "Duration of one HTTP request attempt.", ("host",)))
+parse_seconds = _register(Histogram(
+    "scraper_parse_seconds", "Time to parse one page.", ("page",)))
+persist_seconds = _register(Histogram(
+    "scraper_persist_seconds", "Duration of one bulk write flush.", ("writer",)))
+persist_operations = _register(Counter(
+    "scraper_persist_operations_total", "Write operations sent in bulk flushes.", ("writer",)))
+pages = _register(Counter(
+    "scraper_pages_total", "Pages scraped, by source.", ("source",)))
+journals = _register(Counter(
+    "scraper_journals_total", "Journals read from Sinta listing pages."))
+articles = _register(Counter(
+    "scraper_articles_total", "Articles found on Garuda search pages (new ones only in incremental searches)."))
+jobs = _register(Counter(
+    "scraper_jobs_total", "Jobs run by workers, by type and outcome.", ("type", "status")))
+
+
+def snapshot():
+    """Plain-data copy of every metric of this process."""
+    return {name: metric.snapshot() for name, metric in _registry.items()}
+
+
+# --- Prometheus text format ---
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra):
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshots):
+    """
+    Renders [(snapshot, extra_labels)] in the Prometheus text exposition format; the
+    samples of all snapshots are listed under one HELP/TYPE header per metric.
+    """
+    lines = []
+    names = sorted({name for snap, _ in snapshots for name in snap})
+    for name in names:
+        header = False
+        for snap, extra in snapshots:
+            metric = snap.get(name)
+            if metric is None:
+                continue
+            if not header:
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                header = True
+            for values, value in metric["samples"]:
+                if metric["type"] == "counter":
+                    lines.append(f"{name}{_labels(metric['labels'], values, extra)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric["buckets"], value["buckets"]):
+                    cumulative += count
+                    labels = _labels(metric["labels"] + ["le"], values + [_number(bound)], extra)
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                labels = _labels(metric["labels"] + ["le"], values + ["+Inf"], extra)
+                lines.append(f"{name}_bucket{labels} {value['count']}")
+                lines.append(f"{name}_sum{_labels(metric['labels'], values, extra)} {_number(value['sum'])}")
+                lines.append(f"{name}_count{_labels(metric['labels'], values, extra)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Sharing between processes ---
+
+def push(instance):
+    """Stores this process's metrics under `instance` (a worker id) for the API to expose."""
+    from . import database
+    db = database.get_db()
+    if db is None:
+        return
+    db[config.METRICS_COLLECTION].replace_one(
+        {"_id": instance},
+        {"metrics": snapshot(), "updated_at": datetime.now(timezone.utc)},
+        upsert=True,
+    )
+
+
+def render_all(instance="api"):
+    """This process's metrics plus those pushed by workers seen in the last METRICS_RETENTION seconds."""
+    from . import database
+    snapshots = [(snapshot(), {"instance": instance})]
+    db = database.get_db()
+    if db is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=config.METRICS_RETENTION)
+        pushed = db[config.METRICS_COLLECTION]
+        pushed.delete_many({"updated_at": {"$lt": cutoff}})
+        for doc in pushed.find({}).sort("_id", 1):
+            snapshots.append((doc["metrics"], {"instance": doc["_id"]}))
+    return render(snapshots)
@@ -0,0 +1,214 @@
+# parsers.py
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+import lxml.html
+from lxml import etree
+
+from . import config
+from . import metrics
+
+# Backends, all producing the same output:
+# - "bs4": full BeautifulSoup tree with html.parser (the original extraction).
+# - "strainer": html.parser, but only the item containers are built into a tree.
+# - "lxml": libxml2 parse with precompiled XPath, no BeautifulSoup at all.
+PARSER_BACKENDS = ("bs4", "strainer", "lxml")
+
+GARUDA_LINK_RE = re.compile(re.escape(config.GARUDA_HOST))
+ACCREDITATION_RE = re.compile(r"S(\d+)")
+TOTAL_PAGES_RE = re.compile(r"Page\s+\d+\s+of\s+([\d.,]+)")
+PAGE_LINK_RE = re.compile(r"[?&]page=(\d+)")
+
+
+def _backend(backend):
+    backend = backend or config.PARSER_BACKEND
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}'. Expected one of {PARSER_BACKENDS}.")
+    return backend
+
+
+def _class_strainer(name):
+    # While parsing, a strainer sees the raw class attribute ("list-item row"),
+    # not the split list a finished tree matches against.
+    return SoupStrainer("div", class_=lambda value: bool(value) and name in value.split())
+
+
+def _accreditation(text):
+    match = ACCREDITATION_RE.search(text)
+    return int(match.group(1)) if match else None
+
+
+def _page_count(text, hrefs):
+    match = TOTAL_PAGES_RE.search(text)
+    if match:
+        return int(re.sub(r"[.,]", "", match.group(1)))
+    pages = [int(m.group(1)) for href in hrefs for m in [PAGE_LINK_RE.search(href)] if m]
+    return max(pages) if pages else None
+
+
+# --- BeautifulSoup backends ---
+
+def _soup_sinta_journals(soup):
+    results = []
+    for j in soup.find_all("div", class_="list-item"):
+        name_tag = j.select_one(".affil-name a")
+        name = name_tag.get_text(strip=True) if name_tag else "Unknown"
+
+        accred_tag = j.select_one(".num-stat.accredited a")
+        accred_text = accred_tag.get_text(strip=True) if accred_tag else "Unknown"
+
+        sinta_link_tag = j.select_one("div.affil-name.mb-3 a")
+        sinta_link = sinta_link_tag["href"] if sinta_link_tag else "no sinta link"
+
+        garuda_tag = j.find("a", href=GARUDA_LINK_RE)
+        garuda_link = garuda_tag["href"] if garuda_tag else "no garuda link"
+
+        results.append({
+            "name": name,
+            "sinta": _accreditation(accred_text),
+            "sinta_link": sinta_link,
+            "garuda_link": garuda_link,
+        })
+    return results
+
+
+def _soup_garuda_articles(soup):
+    page_articles = []
+    for art in soup.select("div.article-item"):
+        title_tag = art.select_one(".title-article xmp")
+        title = title_tag.get_text(strip=True) if title_tag else "No Title"
+
+        download_tag = art.select_one("a.title-citation[href*='article/download']")
+        download_link = download_tag["href"] if download_tag else None
+
+        page_articles.append({"title": title, "download_link": download_link})
+    return page_articles
+
+
+# --- lxml backend ---
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_X_SINTA_ITEMS = etree.XPath(f"//div[{_has_class('list-item')}]")
+_X_SINTA_NAME = etree.XPath(f".//*[{_has_class('affil-name')}]//a")
+_X_SINTA_ACCREDITATION = etree.XPath(f".//*[{_has_class('num-stat')} and {_has_class('accredited')}]//a")
+_X_SINTA_LINK = etree.XPath(f".//div[{_has_class('affil-name')} and {_has_class('mb-3')}]//a")
+_X_LINKS = etree.XPath(".//a[@href]")
+_X_GARUDA_ITEMS = etree.XPath(f"//div[{_has_class('article-item')}]")
+_X_GARUDA_TITLE = etree.XPath(f".//*[{_has_class('title-article')}]//xmp")
+_X_GARUDA_DOWNLOAD = etree.XPath(
+    f".//a[{_has_class('title-citation')} and contains(@href, 'article/download')]"
+)
+_X_VISIBLE_TEXT = etree.XPath("//text()[not(parent::script) and not(parent::style)]")
+
+
+def _text(element):
+    """Same result as BeautifulSoup's get_text(strip=True): stripped text nodes, comments excluded."""
+    return "".join(part.strip() for part in element.itertext() if part.strip())
+
+
+def _xmp_text(element):
+    # libxml2 keeps <xmp> content as raw text while html.parser parses the tags and
+    # entities inside it, so markup-looking content is parsed again to match.
+    raw = element.text or ""
+    if "<" not in raw and "&" not in raw:
+        return raw.strip()
+    return _text(lxml.html.fragment_fromstring(raw, create_parent="div"))
+
+
+def _first(xpath, element):
+    found = xpath(element)
+    return found[0] if found else None
+
+
+def _lxml_document(html):
+    return lxml.html.document_fromstring(html) if html.strip() else None
+
+
+def _lxml_sinta_journals(html):
+    doc = _lxml_document(html)
+    if doc is None:
+        return []
+    results = []
+    for j in _X_SINTA_ITEMS(doc):
+        name_tag = _first(_X_SINTA_NAME, j)
+        name = _text(name_tag) if name_tag is not None else "Unknown"
+
+        accred_tag = _first(_X_SINTA_ACCREDITATION, j)
+        accred_text = _text(accred_tag) if accred_tag is not None else "Unknown"
+
+        sinta_link_tag = _first(_X_SINTA_LINK, j)
+        sinta_link = sinta_link_tag.attrib["href"] if sinta_link_tag is not None else "no sinta link"
+
+        garuda_tag = next((a for a in _X_LINKS(j) if GARUDA_LINK_RE.search(a.attrib["href"])), None)
+        garuda_link = garuda_tag.attrib["href"] if garuda_tag is not None else "no garuda link"
+
+        results.append({
+            "name": name,
+            "sinta": _accreditation(accred_text),
+            "sinta_link": sinta_link,
+            "garuda_link": garuda_link,
+        })
+    return results
+
+
+def _lxml_garuda_articles(html):
+    doc = _lxml_document(html)
+    if doc is None:
+        return []
+    page_articles = []
+    for art in _X_GARUDA_ITEMS(doc):
+        title_tag = _first(_X_GARUDA_TITLE, art)
+        title = _xmp_text(title_tag) if title_tag is not None else "No Title"
+
+        download_tag = _first(_X_GARUDA_DOWNLOAD, art)
+        download_link = download_tag.attrib["href"] if download_tag is not None else None
+
+        page_articles.append({"title": title, "download_link": download_link})
+    return page_articles
+
+
+# --- Public entry points ---
+
+def parse_sinta_journals(html, backend=None):
+    """Extracts name, accreditation, Sinta link and Garuda link of every journal on a Sinta listing page."""
+    backend = _backend(backend)
+    with metrics.parse_seconds.time(page="sinta"):
+        if backend == "lxml":
+            return _lxml_sinta_journals(html)
+        if backend == "strainer":
+            return _soup_sinta_journals(
+                BeautifulSoup(html, "html.parser", parse_only=_class_strainer("list-item"))
+            )
+        return _soup_sinta_journals(BeautifulSoup(html, "html.parser"))
+
+
+def parse_garuda_articles(html, backend=None):
+    """Extracts the title and download link of every article on a Garuda search page."""
+    backend = _backend(backend)
+    with metrics.parse_seconds.time(page="garuda"):
+        if backend == "lxml":
+            return _lxml_garuda_articles(html)
+        if backend == "strainer":
+            return _soup_garuda_articles(
+                BeautifulSoup(html, "html.parser", parse_only=_class_strainer("article-item"))
+            )
+        return _soup_garuda_articles(BeautifulSoup(html, "html.parser"))
+
+
+def parse_sinta_total_pages(html, backend=None):
+    """
+    Reads the number of result pages from a Sinta listing page, either from the
+    "Page 1 of N" pagination text or from the highest ?page= link. Returns None if unknown.
+    """
+    if _backend(backend) == "lxml":
+        doc = _lxml_document(html)
+        if doc is None:
+            return None
+        text = " ".join(part.strip() for part in _X_VISIBLE_TEXT(doc) if part.strip())
+        return _page_count(text, [a.attrib["href"] for a in _X_LINKS(doc)])
+
+    # Read once per scrape, so the full tree is fine for both BeautifulSoup backends.
+    soup = BeautifulSoup(html, "html.parser")
+    return _page_count(soup.get_text(" ", strip=True), [a["href"] for a in soup.find_all("a", href=True)])
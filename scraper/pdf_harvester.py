@@ -0,0 +1,435 @@
+# pdf_harvester.py
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+import requests
+from pymongo import ASCENDING, UpdateMany
+
+from . import article_store
+from . import config
+from . import database
+from . import http_client
+from . import progress
+from .concurrency import ThreadHostLimiter
+
+logger = logging.getLogger(__name__)
+
+# Downloads the PDFs behind the stored articles' download links and extracts their text:
+# - PDFS_COLLECTION holds one document per download link: status, attempts, content hash, pages;
+# - PDF_TEXTS_COLLECTION holds the extracted text once per content hash, so a file served
+#   under several links is stored and extracted once;
+# - every article with the link gets pdf: {"pages", "sha256"}, the sha256 referencing its text.
+# Files are streamed to PDF_DIR/partial/ and moved to PDF_DIR/<sha256[:2]>/<sha256>.pdf once
+# complete, so no file is ever held in memory and an interrupted download resumes with a Range request.
+PDF_KEYS = [("download_link", ASCENDING)]
+TEXT_KEYS = [("sha256", ASCENDING)]
+
+# Streamed bodies are never cached. Pacing comes from the shared client, retries from _stream_to.
+session = http_client.create_session(config.SINTA_HEADERS, cache_mode="off", retries=0)
+session.headers.pop("Content-Type", None)
+session.headers["Accept"] = "application/pdf,*/*;q=0.8"
+
+
+class PdfError(Exception):
+    """A link that cannot give a usable PDF (HTTP error, not a PDF, too large)."""
+
+
+def _partial_path(url):
+    return os.path.join(config.PDF_DIR, "partial", hashlib.sha1(url.encode("utf-8")).hexdigest() + ".part")
+
+
+def _final_path(sha256):
+    return os.path.join(config.PDF_DIR, sha256[:2], sha256 + ".pdf")
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(config.PDF_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stream_to(url, part, limiter):
+    """
+    Downloads `url` into `part`, continuing an earlier partial download when the server allows it.
+    This loop is the only retry layer: the session does not retry, so each attempt resumes
+    from what is already on disk.
+    """
+    for attempt in range(config.HTTP_MAX_RETRIES + 1):
+        last_attempt = attempt == config.HTTP_MAX_RETRIES
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with limiter.slot(url), session.get(url, headers=headers, stream=True, timeout=config.HTTP_TIMEOUT) as resp:
+                if resp.status_code == 416 and offset:
+                    return  # the partial file already holds everything
+                if resp.status_code in http_client.RETRY_STATUSES and not last_attempt:
+                    reason = f"HTTP {resp.status_code}"
+                    delay = max(http_client.retry_after(resp) or 0.0, http_client.backoff_delay(attempt))
+                else:
+                    if resp.status_code not in (200, 206):
+                        raise PdfError(f"HTTP {resp.status_code}")
+                    if resp.status_code == 200:
+                        offset = 0  # no Range support: start over
+                    length = int(resp.headers.get("Content-Length") or 0)
+                    if offset + length > config.PDF_MAX_BYTES:
+                        raise PdfError(f"larger than PDF_MAX_BYTES ({offset + length} bytes)")
+                    written = offset
+                    with open(part, "ab" if offset else "wb") as f:
+                        for chunk in resp.iter_content(config.PDF_CHUNK_SIZE):
+                            written += len(chunk)
+                            if written > config.PDF_MAX_BYTES:
+                                raise PdfError("larger than PDF_MAX_BYTES")
+                            f.write(chunk)
+                    return
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            if last_attempt:
+                raise
+            reason = type(e).__name__
+            delay = http_client.backoff_delay(attempt)
+        logger.warning("   🔁 %s while downloading %s, resuming in %.1fs (%d/%d)", reason, url, delay, attempt + 1, config.HTTP_MAX_RETRIES)
+        time.sleep(delay)
+
+
+def download(url, limiter):
+    """
+    Downloads one PDF to disk. Returns (sha256, path, size); a file whose content is
+    already stored is not kept twice. Raises PdfError or a requests exception on failure.
+    """
+    part = _partial_path(url)
+    os.makedirs(os.path.dirname(part), exist_ok=True)
+    try:
+        _stream_to(url, part, limiter)
+        with open(part, "rb") as f:
+            if f.read(5) != b"%PDF-":
+                raise PdfError("not a PDF")
+    except PdfError:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+
+    size = os.path.getsize(part)
+    sha256 = _file_sha256(part)
+    path = _final_path(sha256)
+    if os.path.exists(path):
+        os.remove(part)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(part, path)
+    return sha256, path, size
+
+
+def extract_text(path, max_chars=config.PDF_MAX_TEXT_CHARS):
+    """
+    Extracts the text of a PDF page by page. Runs in the extraction processes, so it only
+    returns plain data: {"pages", "text", "truncated"} or {"error"}.
+    """
+    from pypdf import PdfReader
+    try:
+        reader = PdfReader(path)
+        pages = len(reader.pages)
+        parts, length, truncated = [], 0, False
+        for page in reader.pages:
+            text = page.extract_text() or ""
+            if length + len(text) > max_chars:
+                parts.append(text[: max_chars - length])
+                truncated = True
+                break
+            parts.append(text)
+            length += len(text) + 1
+        return {"pages": pages, "text": "\n".join(parts), "truncated": truncated}
+    except Exception as e:  # malformed PDFs raise all sorts of errors
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def _collections():
+    db = database.get_db()
+    pdfs = db[config.PDFS_COLLECTION]
+    texts = db[config.PDF_TEXTS_COLLECTION]
+    database.ensure_indexes(pdfs, PDF_KEYS)
+    database.ensure_indexes(texts, TEXT_KEYS)
+    return pdfs, texts
+
+
+def _article_links(collection_name=None):
+    """Yields the distinct download links of one results collection, or of all of them, whose articles have no pdf yet."""
+    db = database.get_db()
+    if collection_name is None and config.ARTICLE_STORAGE == "normalized":
+        for doc in db[config.ARTICLES_STORE_COLLECTION].find({"download_link": {"$ne": None}, "pdf": {"$exists": False}}, {"download_link": 1}):
+            yield doc["download_link"]
+        return
+    names = [collection_name] if collection_name else [n for n in database.list_collections() if database.is_article_collection(n)]
+    seen = set()
+    for name in names:
+        for doc in db[name].aggregate([
+            {"$unwind": "$results"},
+            {"$match": {"results.download_link": {"$ne": None}, "results.pdf": {"$exists": False}}},
+            {"$group": {"_id": "$results.download_link"}},
+        ], allowDiskUse=True):
+            if doc["_id"] not in seen:
+                seen.add(doc["_id"])
+                yield doc["_id"]
+
+
+def pending_links(collection_name=None, retry_failed=False, extracted=None):
+    """
+    Download links not extracted yet, and not given up on (unless `retry_failed`).
+    `extracted`, if given, is called with the harvest record of every link that was already
+    extracted, so articles stored after its harvest still get their pdf fields.
+    """
+    pdfs, _ = _collections()
+    done = {"status": "extracted"} if retry_failed else {
+        "$or": [{"status": "extracted"}, {"attempts": {"$gte": config.PDF_MAX_ATTEMPTS}}]
+    }
+    batch = []
+
+    def unfinished(links):
+        finished = set()
+        for doc in pdfs.find({"download_link": {"$in": links}, **done}, {"download_link": 1, "status": 1, "sha256": 1, "pages": 1}):
+            finished.add(doc["download_link"])
+            if extracted is not None and doc["status"] == "extracted":
+                extracted(doc)
+        return [link for link in links if link not in finished]
+
+    for link in _article_links(collection_name):
+        batch.append(link)
+        if len(batch) >= config.EXPORT_BATCH_SIZE:
+            yield from unfinished(batch)
+            batch = []
+    if batch:
+        yield from unfinished(batch)
+
+
+class _ArticleUpdater:
+    """
+    Buffers the pdf fields of harvested links and writes them onto the articles that carry
+    the links, with unordered bulk writes: into the article store when results are normalized,
+    and into the results array of embedded results collections. Thread-safe; use it as a
+    context manager so the last partial batch is written.
+    """
+
+    def __init__(self, collection_name=None, batch_size=config.BULK_BATCH_SIZE):
+        db = database.get_db()
+        names = [collection_name] if collection_name else [n for n in database.list_collections() if database.is_article_collection(n)]
+        embedded = [name for name in names if not article_store.is_view(name)]
+        self.collections = [db[name] for name in embedded]
+        # Views read their articles from the store.
+        self.store = db[config.ARTICLES_STORE_COLLECTION] if len(embedded) < len(names) else None
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def add(self, download_link, pages, sha256):
+        with self._lock:
+            self._pending.append((download_link, {"pages": pages, "sha256": sha256}))
+            due = len(self._pending) >= self.batch_size
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        if self.store is not None:
+            self.store.bulk_write([UpdateMany({"download_link": link}, {"$set": {"pdf": pdf}}) for link, pdf in pending], ordered=False)
+        for collection in self.collections:
+            collection.bulk_write([
+                UpdateMany(
+                    {"results.download_link": link},
+                    {"$set": {"results.$[article].pdf": pdf}},
+                    array_filters=[{"article.download_link": link}],
+                )
+                for link, pdf in pending
+            ], ordered=False)
+            database.collection_changed(collection.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+
+
+class _Extractor:
+    """
+    Text extraction processes, replaced by a fresh pool every `tasks_per_child` PDFs per
+    process so memory a malformed file leaks is given back (ProcessPoolExecutor only
+    recycles its processes itself from Python 3.11), and after a crashed process broke the
+    pool. A retired pool finishes the extractions already submitted to it. Thread-safe.
+    """
+
+    def __init__(self, processes, tasks_per_child):
+        self.processes = processes
+        self.pool_tasks = processes * tasks_per_child
+        self._pool = None
+        self._submitted = 0
+        self._retired = []
+        self._lock = threading.Lock()
+
+    def _replace_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._retired.append(self._pool)
+        self._pool = ProcessPoolExecutor(max_workers=self.processes)
+        self._submitted = 0
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._pool is None or self._submitted >= self.pool_tasks:
+                self._replace_pool()
+            self._submitted += 1
+            try:
+                return self._pool.submit(fn, *args)
+            except BrokenProcessPool:
+                self._replace_pool()
+                self._submitted += 1
+                return self._pool.submit(fn, *args)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._lock:
+            pools = self._retired + ([self._pool] if self._pool is not None else [])
+            self._pool, self._retired = None, []
+        for pool in pools:
+            pool.shutdown(wait=True)
+        return False
+
+
+class _Harvest:
+    """Shared state of one harvest run: writers, pools and counters."""
+
+    def __init__(self, pdfs_writer, texts_writer, articles, texts, extractor):
+        self.pdfs_writer = pdfs_writer
+        self.texts_writer = texts_writer
+        self.articles = articles
+        self.texts = texts
+        self.extractor = extractor
+        self.limiter = ThreadHostLimiter(config.PDF_PER_HOST_CONCURRENCY)
+        self.counts = {"downloaded": 0, "deduplicated": 0, "extracted": 0, "failed": 0}
+        self._pages = {}  # sha256 -> pages, for duplicates whose text is not flushed yet
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _record(self, url, fields, failed=False):
+        fields["updated_at"] = datetime.now(timezone.utc)
+        update = {"$set": fields}
+        if failed:
+            update["$inc"] = {"attempts": 1}
+        self.pdfs_writer.add_update({"download_link": url}, update)
+        if fields["status"] == "extracted":
+            self.articles.add(url, fields["pages"], fields["sha256"])
+
+    def process(self, url):
+        """Downloads, deduplicates, extracts and records one link. Never raises."""
+        try:
+            sha256, path, size = download(url, self.limiter)
+        except (PdfError, requests.RequestException) as e:
+            self._count("failed")
+            self._record(url, {"status": "failed", "error": str(e)}, failed=True)
+            return
+        self._count("downloaded")
+
+        # Same content under another link: reuse its text instead of extracting again.
+        with self._lock:
+            pages = self._pages.get(sha256)
+        if pages is None:
+            known = self.texts.find_one({"sha256": sha256}, {"pages": 1})
+            pages = known["pages"] if known is not None else None
+        if pages is not None:
+            self._count("deduplicated")
+            self._record(url, {"status": "extracted", "sha256": sha256, "path": path, "bytes": size, "pages": pages, "error": None})
+            return
+
+        try:
+            result = self.extractor.submit(extract_text, path).result()
+        except Exception as e:  # a crashed extraction process breaks the pool; the next submit replaces it
+            result = {"error": f"{type(e).__name__}: {e}"}
+        if "error" in result:
+            self._count("failed")
+            self._record(url, {"status": "failed", "sha256": sha256, "path": path, "bytes": size, "error": result["error"]}, failed=True)
+            return
+        self.texts_writer.add({
+            "sha256": sha256,
+            "pages": result["pages"],
+            "text": result["text"],
+            "truncated": result["truncated"],
+            "extracted_at": datetime.now(timezone.utc),
+        })
+        with self._lock:
+            self._pages[sha256] = result["pages"]
+        self._count("extracted")
+        self._record(url, {"status": "extracted", "sha256": sha256, "path": path, "bytes": size, "pages": result["pages"], "error": None})
+
+
+def harvest_pdfs(collection_name=None, limit=None, retry_failed=False,
+                 workers=config.PDF_DOWNLOAD_CONCURRENCY, processes=config.PDF_EXTRACT_PROCESSES):
+    """
+    Downloads and extracts the PDFs of the stored articles of one results collection (or of
+    all of them) that are not harvested yet, and writes the page count and text reference
+    onto the articles. `workers` threads stream downloads to disk;
+    `processes` processes extract text, so CPU use stays at that many cores. Links are read
+    and submitted lazily, with at most 2 x `workers` in flight. Returns the counters.
+    """
+    if database.get_db() is None:
+        logger.warning("💔 Cannot harvest PDFs, no database connection.")
+        return None
+    pdfs, texts = _collections()
+    pdfs_writer = database.BulkUpserter(pdfs, PDF_KEYS)
+    texts_writer = database.BulkUpserter(texts, TEXT_KEYS)
+    target = f"'{collection_name}'" if collection_name else "all results collections"
+    logger.info("📄 Harvesting PDFs of %s with %s downloads and %s extraction processes...", target, workers, processes)
+
+    started = time.monotonic()
+    submitted = 0
+    with pdfs_writer, texts_writer, _ArticleUpdater(collection_name) as articles, \
+            _Extractor(processes, config.PDF_EXTRACT_TASKS_PER_CHILD) as extractor, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        harvest = _Harvest(pdfs_writer, texts_writer, articles, texts, extractor)
+        in_flight = set()
+
+        def backfill(record):
+            articles.add(record["download_link"], record["pages"], record["sha256"])
+
+        for url in pending_links(collection_name, retry_failed, extracted=backfill):
+            if limit is not None and submitted >= limit:
+                break
+            progress.check()
+            if len(in_flight) >= 2 * workers:
+                _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            in_flight.add(pool.submit(harvest.process, url))
+            submitted += 1
+            if submitted % 100 == 0:
+                logger.info("   📥 %d links submitted: %s", submitted, harvest.counts)
+        wait(in_flight)
+
+    counts = harvest.counts
+    logger.info("✅ PDF harvest done in %.1fs: %s links, %s extracted, %s duplicates, %s failed.", time.monotonic() - started, submitted, counts["extracted"], counts["deduplicated"], counts["failed"])
+    return counts
+
+
+def get_pdf_text(download_link):
+    """The harvest record of an article's PDF with its extracted text, or None if it has none."""
+    if database.get_db() is None:
+        return None
+    pdfs, texts = _collections()
+    record = pdfs.find_one({"download_link": download_link}, {"_id": 0})
+    if record is None:
+        return None
+    if record.get("sha256"):
+        text = texts.find_one({"sha256": record["sha256"]}, {"_id": 0, "text": 1, "truncated": 1})
+        if text is not None:
+            record.update(text)
+    return record
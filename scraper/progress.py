@@ -0,0 +1,270 @@
+# progress.py
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from pymongo import ASCENDING, CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+from . import config
+from . import database
+
+logger = logging.getLogger(__name__)
+
+# Live progress of jobs, streamed by the API (GET /jobs/{id}/events).
+# The scrapers call add() and error() as they go. Outside a job (CLI) these return at once;
+# inside one they update counters in memory and insert a snapshot into JOB_EVENTS_COLLECTION
+# at most every JOB_PROGRESS_INTERVAL seconds, so a fast scrape costs one small insert a second.
+# The collection is capped: old events fall off by themselves, and the API follows new ones
+# with a single tailable cursor instead of polling.
+# A worker that loses its job's lease cancels it here: the job's next add() or check()
+# raises JobCancelled, so its handler stops before another worker's run overlaps it.
+TERMINAL_STATUSES = ("completed", "failed")
+COUNTERS = ("done", "pages", "journals", "articles", "errors")
+
+# A worker runs one job at a time; the job's own threads report into the same state.
+_state = None
+_lock = threading.Lock()
+_ready = False
+
+
+class JobCancelled(BaseException):
+    """
+    Raised into a job's handler once its worker lost the job. A BaseException, like
+    KeyboardInterrupt, so the handlers' per-journal `except Exception` do not swallow it.
+    """
+
+
+def _events():
+    global _ready
+    db = database.get_db()
+    if db is None:
+        return None
+    events = db[config.JOB_EVENTS_COLLECTION]
+    if not _ready:
+        try:
+            db.create_collection(config.JOB_EVENTS_COLLECTION, capped=True, size=config.JOB_EVENTS_SIZE_MB * 2 ** 20)
+        except CollectionInvalid:
+            pass  # already there
+        database.ensure_indexes(events, [("job_id", ASCENDING), ("_id", ASCENDING)], unique=False)
+        _ready = True
+    return events
+
+
+def publish(job_id, event):
+    """Stores one event of a job. Progress is best effort: failures are logged, never raised."""
+    event = {"job_id": str(job_id), **event, "at": datetime.now(timezone.utc)}
+    try:
+        events = _events()
+        if events is not None:
+            events.insert_one(event)
+    except PyMongoError as e:
+        logger.warning("⚠️ Could not publish progress of job %s: %s", job_id, e)
+
+
+def _snapshot(state):
+    elapsed = time.monotonic() - state["started"]
+    done, total = state["done"], state["total"]
+    eta = None
+    if done and total and total > done:
+        eta = round(elapsed / done * (total - done), 1)
+    return {
+        "type": state["type"],
+        "status": "running",
+        "unit": state["unit"],
+        "total": total,
+        **{name: state[name] for name in COUNTERS},
+        "last_error": state["last_error"],
+        "elapsed": round(elapsed, 1),
+        "eta": eta,
+    }
+
+
+def _publish_locked(force=False):
+    """Publishes the running job's snapshot if forced or due. Called with _lock held."""
+    now = time.monotonic()
+    if not force and now - _state["published"] < config.JOB_PROGRESS_INTERVAL:
+        return
+    _state["published"] = now
+    publish(_state["job_id"], _snapshot(_state))
+
+
+def start(job_id, job_type):
+    """Starts reporting for a job claimed by this process."""
+    global _state
+    with _lock:
+        _state = {
+            "job_id": str(job_id), "type": job_type, "unit": None, "total": None, "last_error": None,
+            "started": time.monotonic(), "published": 0.0, "cancelled": False, **{name: 0 for name in COUNTERS},
+        }
+        _publish_locked(force=True)
+
+
+def begin(total, unit):
+    """Sets how many `unit`s (journals, pages) the running job has to go through, for the ETA."""
+    with _lock:
+        if _state is None:
+            return
+        _state["total"] = total
+        _state["unit"] = unit
+        _publish_locked(force=True)
+
+
+def cancel(job_id):
+    """Makes the running job's handler raise JobCancelled at its next report."""
+    with _lock:
+        if _state is not None and _state["job_id"] == str(job_id):
+            _state["cancelled"] = True
+
+
+def check():
+    """Raises JobCancelled if the running job was cancelled. For loops that report nothing."""
+    if _state is not None and _state["cancelled"]:
+        raise JobCancelled(_state["job_id"])
+
+
+def add(**counts):
+    """Adds to the running job's counters (done, pages, journals, articles)."""
+    if _state is None:
+        return
+    with _lock:
+        if _state is None:
+            return
+        check()
+        for name, amount in counts.items():
+            _state[name] += amount
+        _publish_locked()
+
+
+def error(message):
+    """Records an error of the running job and publishes it right away."""
+    if _state is None:
+        return
+    with _lock:
+        if _state is None:
+            return
+        _state["errors"] += 1
+        _state["last_error"] = str(message)
+        _publish_locked(force=True)
+
+
+def stop(job_id):
+    """Stops reporting for a job this process gave up, without publishing anything."""
+    global _state
+    with _lock:
+        if _state is not None and _state["job_id"] == str(job_id):
+            _state = None
+
+
+def finish(job_id, job_type, status, error_message=None):
+    """Publishes a job's final event, with its counters if it ran in this process."""
+    global _state
+    with _lock:
+        event = {"type": job_type, "status": status}
+        if _state is not None and _state["job_id"] == str(job_id):
+            event = {**_snapshot(_state), "status": status, "eta": None}
+            _state = None
+        if error_message:
+            event["error"] = error_message
+    publish(job_id, event)
+
+
+# --- Reading ---
+
+def latest(job_id):
+    """The most recent event of a job, or None."""
+    events = _events()
+    if events is None:
+        return None
+    return events.find_one({"job_id": str(job_id)}, sort=[("_id", -1)])
+
+
+def position():
+    """The _id of the newest event of any job (None if there is none yet), to tail() from."""
+    events = _events()
+    if events is None:
+        return None
+    last = events.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+    return last["_id"] if last else None
+
+
+def tail(running, after=None):
+    """
+    Yields every event inserted after the one with _id `after` (every stored event if None),
+    while `running()` is true. Waits on a tailable cursor, checking `running()` at least once
+    a second, and reopens it if it dies.
+    """
+    events = _events()
+    if events is None:
+        return
+    last_id = after
+    while running():
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        cursor = events.find(query, cursor_type=CursorType.TAILABLE_AWAIT).max_await_time_ms(1000)
+        try:
+            while cursor.alive and running():
+                for event in cursor:
+                    last_id = event["_id"]
+                    yield event
+                    if not running():
+                        return
+        except PyMongoError as e:
+            logger.warning("⚠️ Job event cursor failed: %s", e)
+        finally:
+            cursor.close()
+        # An empty capped collection gives a dead cursor right away.
+        time.sleep(1)
+
+
+class Feed:
+    """
+    Fans the events of one shared tailing cursor out to subscribers, per job. The
+    cursor runs on a thread of its own while anyone is subscribed.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, job_id, callback, after=None):
+        """
+        Calls `callback(event)` from the feed thread for every event of `job_id` inserted after
+        `after`, a position() the caller took before reading the job's current state, so an
+        event published meanwhile is not missed when this starts the feed thread.
+        """
+        with self._lock:
+            self._subscribers.setdefault(str(job_id), set()).add(callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, args=(after,), daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self, job_id, callback):
+        with self._lock:
+            callbacks = self._subscribers.get(str(job_id))
+            if callbacks is not None:
+                callbacks.discard(callback)
+                if not callbacks:
+                    del self._subscribers[str(job_id)]
+
+    def _running(self):
+        with self._lock:
+            if self._subscribers:
+                return True
+            self._thread = None
+            return False
+
+    def _run(self, after):
+        try:
+            for event in tail(self._running, after):
+                with self._lock:
+                    callbacks = list(self._subscribers.get(event["job_id"], ()))
+                for callback in callbacks:
+                    callback(event)
+        except Exception as e:
+            logger.error("❌ Job event feed stopped: %s", e)
+            with self._lock:
+                self._thread = None
+
+
+feed = Feed()
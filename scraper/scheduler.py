@@ -0,0 +1,328 @@
+# scheduler.py
+import logging
+import math
+import signal
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, UpdateOne
+
+from . import config
+from . import database
+from . import jobs
+from . import log
+from .checkpoints import Checkpointer
+
+logger = logging.getLogger(__name__)
+
+# Recurring crawls without full recrawls. Standing schedules (a Sinta filter set, or a Garuda
+# query over a Sinta collection) live in SCHEDULES_COLLECTION. Each schedule is split into
+# items: the filter set itself, or one item per (journal, query) pair. For every item
+# CRAWL_FRESHNESS_COLLECTION records when it was last crawled, what that cost in requests,
+# and how often a crawl found something new, which gives a change rate per second:
+#     rate = (changes + 1) / (seconds observed + SCHEDULER_PRIOR_CHANGE_INTERVAL)
+# The chance that an item changed since its last crawl is 1 - exp(-rate * age), and items are
+# crawled in order of that chance per request, never-crawled items first. The scheduler wakes
+# every SCHEDULER_TICK seconds and queues `scheduled_crawl` jobs worth at most its share of
+# SCHEDULER_REQUEST_BUDGET requests per hour, so the load is spread over the hour.
+SCHEDULE_KINDS = ("sinta", "garuda")
+
+# The single item of a Sinta schedule; Garuda items are keyed by the journal's Garuda link.
+FILTER_SET_ITEM = "filters"
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _aware(moment):
+    # MongoDB hands datetimes back without a timezone.
+    return moment.replace(tzinfo=timezone.utc) if moment is not None and moment.tzinfo is None else moment
+
+
+def _collections():
+    db = database.get_db()
+    if db is None:
+        return None, None
+    freshness = db[config.CRAWL_FRESHNESS_COLLECTION]
+    database.ensure_indexes(freshness, [("schedule_id", ASCENDING), ("item", ASCENDING)])
+    return db[config.SCHEDULES_COLLECTION], freshness
+
+
+def _object_id(schedule_id):
+    try:
+        return ObjectId(schedule_id)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _public(schedule):
+    schedule["_id"] = str(schedule["_id"])
+    return schedule
+
+
+# --- Schedules ---
+
+def add_schedule(kind, params):
+    """
+    Stores a standing crawl and returns its id, or None if there is no database connection.
+    Sinta params are those of scrape_all_sinta_journals (sinta_ranks, filter_area_codes,
+    max_pages, collection_name); Garuda params are a query and a source_collection.
+    """
+    if kind not in SCHEDULE_KINDS:
+        raise ValueError(f"Unknown schedule kind '{kind}'. Expected one of {SCHEDULE_KINDS}.")
+    schedules, _ = _collections()
+    if schedules is None:
+        logger.warning("💔 Cannot add schedule, no database connection.")
+        return None
+    result = schedules.insert_one({"kind": kind, "params": params, "enabled": True, "created_at": _now()})
+    return str(result.inserted_id)
+
+
+def list_schedules():
+    """Every schedule, with how many of its items were crawled and when the stalest one was."""
+    schedules, freshness = _collections()
+    if schedules is None:
+        return []
+    summaries = {
+        doc["_id"]: doc
+        for doc in freshness.aggregate([
+            {"$match": {"last_crawled": {"$ne": None}}},
+            {"$group": {"_id": "$schedule_id", "items_crawled": {"$sum": 1},
+                        "oldest_crawl": {"$min": "$last_crawled"}, "changes": {"$sum": "$changes"}}},
+        ])
+    }
+    result = []
+    for schedule in schedules.find({}).sort("created_at", ASCENDING):
+        summary = summaries.get(str(schedule["_id"]), {})
+        schedule.update({name: summary.get(name) for name in ("items_crawled", "oldest_crawl", "changes")})
+        result.append(_public(schedule))
+    return result
+
+
+def remove_schedule(schedule_id):
+    """Deletes a schedule and its freshness records. Returns False if there is no such schedule."""
+    schedules, freshness = _collections()
+    oid = _object_id(schedule_id)
+    if schedules is None or oid is None:
+        return False
+    if not schedules.delete_one({"_id": oid}).deleted_count:
+        return False
+    freshness.delete_many({"schedule_id": str(oid)})
+    return True
+
+
+# --- Planning ---
+
+def change_rate(item):
+    """Estimated changes per second of an item (see the module comment)."""
+    return (item.get("changes", 0) + 1) / (item.get("observed_seconds", 0) + config.SCHEDULER_PRIOR_CHANGE_INTERVAL)
+
+
+def priority(item, now):
+    """Chance that an item changed since its last crawl, per request a crawl costs. Never crawled: infinite."""
+    last = _aware(item.get("last_crawled"))
+    if last is None:
+        return math.inf
+    age = max(0.0, (now - last).total_seconds())
+    return (1 - math.exp(-change_rate(item) * age)) / max(item.get("cost", 1), 1)
+
+
+def _items(schedule, freshness):
+    """The freshness records of every item a schedule currently has, with defaults for new items."""
+    from . import garuda_scraper
+    sid = str(schedule["_id"])
+    if schedule["kind"] == "sinta":
+        keys = [FILTER_SET_ITEM]
+        # A filter set is crawled page by page, plus the request that applies the filters.
+        default_cost = schedule["params"].get("max_pages", 10) + 1
+    else:
+        keys = garuda_scraper.searchable_links(schedule["params"]["source_collection"])
+        default_cost = config.SCHEDULER_GARUDA_DEFAULT_COST
+    known = {doc["item"]: doc for doc in freshness.find({"schedule_id": sid})}
+    return [known.get(key) or {"schedule_id": sid, "item": key, "cost": default_cost} for key in keys]
+
+
+def _in_flight(item, now):
+    """Queued by an earlier tick and neither crawled nor given up on since."""
+    scheduled = _aware(item.get("scheduled_at"))
+    if scheduled is None or now - scheduled > timedelta(seconds=config.SCHEDULER_RETRY_AFTER):
+        return False
+    last = _aware(item.get("last_crawled"))
+    return last is None or last < scheduled
+
+
+def plan(now=None):
+    """
+    Picks the items to crawl now: the highest-priority items that fit this tick's share of
+    the hourly request budget and what is left of the budget in the past hour.
+    Returns (picked items, requests spent in the past hour).
+    """
+    now = now or _now()
+    schedules, freshness = _collections()
+    if schedules is None:
+        return [], 0
+    hour_ago = now - timedelta(hours=1)
+    spent = sum(doc.get("scheduled_cost", 0) for doc in freshness.find({"scheduled_at": {"$gte": hour_ago}}, {"scheduled_cost": 1}))
+
+    candidates = []
+    for schedule in schedules.find({"enabled": True}):
+        for item in _items(schedule, freshness):
+            if not _in_flight(item, now):
+                candidates.append((priority(item, now), item))
+    candidates.sort(key=lambda pair: pair[0], reverse=True)
+
+    tick_share = config.SCHEDULER_REQUEST_BUDGET * config.SCHEDULER_TICK / 3600
+    picked, tick_spent = [], 0
+    for score, item in candidates:
+        if score <= 0 or tick_spent >= tick_share:
+            break
+        cost = max(item.get("cost", 1), 1)
+        # An item dearer than a tick's share still goes out, alone, when the hour can pay for it.
+        if spent + tick_spent + cost > config.SCHEDULER_REQUEST_BUDGET and (spent or tick_spent):
+            continue
+        picked.append(item)
+        tick_spent += cost
+    return picked, spent
+
+
+def tick(now=None):
+    """Queues one `scheduled_crawl` job per schedule for the items picked by plan(). Returns the job ids."""
+    now = now or _now()
+    picked, spent = plan(now)
+    if not picked:
+        return []
+    schedules, freshness = _collections()
+    by_schedule = {}
+    for item in picked:
+        by_schedule.setdefault(item["schedule_id"], []).append(item)
+
+    job_ids = []
+    for sid, items in by_schedule.items():
+        params = {"schedule_id": sid}
+        schedule = schedules.find_one({"_id": ObjectId(sid)})
+        if schedule["kind"] == "garuda":
+            params["garuda_links"] = [item["item"] for item in items]
+        job_id = jobs.enqueue("scheduled_crawl", params)
+        if job_id is None:
+            continue
+        freshness.bulk_write([
+            UpdateOne(
+                {"schedule_id": sid, "item": item["item"]},
+                {"$set": {"scheduled_at": now, "scheduled_cost": max(item.get("cost", 1), 1)},
+                 "$setOnInsert": {"cost": item.get("cost", 1)}},
+                upsert=True,
+            )
+            for item in items
+        ], ordered=False)
+        job_ids.append(job_id)
+        logger.info("🗓️ Queued job %s: %s items of %s schedule %s.", job_id, len(items), schedule["kind"], sid)
+    cost = sum(max(item.get("cost", 1), 1) for item in picked)
+    logger.info("💰 %s of %g requests of the hourly budget planned.", spent + cost, config.SCHEDULER_REQUEST_BUDGET)
+    return job_ids
+
+
+# --- Crawling ---
+
+def _record(freshness, sid, outcomes):
+    """
+    Records crawls of a schedule's items, given as (item, changed, requests) tuples: the
+    cost, and whether it changed since the previous crawl, if there was one.
+    """
+    now = _now()
+    previous = {
+        doc["item"]: _aware(doc.get("last_crawled"))
+        for doc in freshness.find({"schedule_id": sid, "item": {"$in": [key for key, _, _ in outcomes]}})
+    }
+    updates = []
+    for key, changed, cost in outcomes:
+        update = {"$set": {"last_crawled": now, "cost": max(cost, 1)}, "$inc": {"crawls": 1}}
+        if previous.get(key) is not None:
+            update["$inc"]["observed_seconds"] = (now - previous[key]).total_seconds()
+            update["$inc"]["changes"] = 1 if changed else 0
+        if changed:
+            update["$set"]["last_changed"] = now
+        updates.append(UpdateOne({"schedule_id": sid, "item": key}, update, upsert=True))
+    freshness.bulk_write(updates, ordered=False)
+
+
+def crawl(schedule_id, garuda_links=None):
+    """
+    Crawls the picked items of a schedule and records their freshness. The handler of
+    `scheduled_crawl` jobs. Garuda items are searched incrementally, so a crawl costs the
+    pages up to the first one without new articles, and "changed" means new articles were
+    found. A Sinta filter set changed if any journal was inserted or updated. Both revalidate
+    cached pages, so a crawl within HTTP_CACHE_TTL still sees new content.
+    Returns the number of items crawled, or None if the crawl could not run.
+    """
+    from . import garuda_scraper
+    from . import search_index
+    from . import sinta_scraper
+    schedules, freshness = _collections()
+    if schedules is None:
+        logger.warning("💔 Cannot run a scheduled crawl, no database connection.")
+        return None
+    schedule = schedules.find_one({"_id": _object_id(schedule_id)})
+    if schedule is None:
+        logger.error("❌ Schedule '%s' no longer exists.", schedule_id)
+        return None
+    params = schedule["params"]
+    sid = str(schedule["_id"])
+
+    if schedule["kind"] == "sinta":
+        changed = sinta_scraper.scrape_all_sinta_journals(
+            max_pages=params.get("max_pages", 10), sinta_ranks=params.get("sinta_ranks", [1, 2, 3]),
+            filter_area_codes=params.get("filter_area_codes", []), collection_name=params["collection_name"],
+            parallel=params.get("parallel", False), revalidate=True,
+        )
+        if changed is None:
+            return None  # nothing scraped; planned again after SCHEDULER_RETRY_AFTER
+        _record(freshness, sid, [(FILTER_SET_ITEM, changed > 0, params.get("max_pages", 10) + 1)])
+        return 1
+
+    # Journals marked done by an earlier search of the query would be skipped.
+    checkpointer = Checkpointer(params["source_collection"], params["query"])
+    checkpointer.forget(garuda_links)
+    run = garuda_scraper.search_garuda_journals(
+        params["query"], params["source_collection"], garuda_links, mode="concurrent", incremental=True,
+    )
+    if run is None:
+        return None
+    crawled = [search for search in run.searches if search.done and not search.failed]
+    if crawled:
+        # An incremental search fetches pages up to the first without new articles.
+        _record(freshness, sid, [(search.garuda_link, search.saved > 0, search.page) for search in crawled])
+        checkpointer.forget([search.garuda_link for search in crawled])
+    if run.articles_saved:
+        search_index.index_collection(run.collection_name, run.written_links)
+    logger.info("🗓️ Scheduled crawl of '%s': %s journals crawled, %s new articles, %s failed.", params["query"], len(crawled), run.articles_saved, run.failed)
+    return len(crawled)
+
+
+# --- Service ---
+
+def run_scheduler():
+    """Queues scheduled crawls every SCHEDULER_TICK seconds until SIGTERM/SIGINT. Workers run them."""
+    log.configure()
+    if database.get_db() is None:
+        logger.error("Please check your MongoDB connection details and ensure the server is running.")
+        return
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        logger.info("🛑 Scheduler stopping...")
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info("🗓️ Scheduler running: %g requests per hour, a tick every %gs.", config.SCHEDULER_REQUEST_BUDGET, config.SCHEDULER_TICK)
+    while not stopping.is_set():
+        started = time.monotonic()
+        try:
+            tick()
+        except Exception as e:
+            logger.error("❌ Scheduler tick failed: %s", e)
+        stopping.wait(max(0.0, config.SCHEDULER_TICK - (time.monotonic() - started)))
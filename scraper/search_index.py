@@ -0,0 +1,209 @@
+# search_index.py
+import logging
+import re
+import time
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne, ASCENDING
+
+from . import article_store
+from . import config
+from . import database
+
+logger = logging.getLogger(__name__)
+
+# Local inverted index over stored Garuda results: one entry per article with the
+# stemmed terms of its title and of its journal's name in multikey-indexed arrays,
+# so keyword searches are answered from MongoDB without crawling Garuda again.
+
+STOPWORDS = frozenset("""
+    ada adalah agar akan antara atas atau bagi bahwa baik bagaimana banyak belum beberapa
+    berbagai dalam dan dapat dari dengan di hal hingga ini itu jika juga kami karena ke
+    kepada ketika lain lebih maka masih melalui menjadi menurut namun oleh pada para
+    saat sampai sebagai secara sedang sehingga seperti serta setelah suatu tanpa telah
+    tentang terhadap tersebut tidak untuk yaitu yang
+    a an and are as at by for from in into is of on or the to using via with
+""".split())
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+_PARTICLES = ("lah", "kah", "tah", "pun")
+_POSSESSIVES = ("nya", "ku", "mu")
+_SUFFIXES = ("kan", "an", "i")
+# Longest first, so "meng" wins over "me".
+_PREFIXES = ("meng", "meny", "peng", "peny", "mem", "men", "pem", "pen", "per", "ber", "ter", "me", "pe", "be", "di", "ke", "se")
+_MIN_STEM = 4
+
+
+def _strip_suffix(word, suffixes):
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM:
+            return word[: -len(suffix)]
+    return word
+
+
+def stem(word):
+    """
+    Light Indonesian stemmer: removes one particle, one possessive, one derivational suffix
+    and up to two stacked prefixes, never leaving fewer than 4 letters. Crude, but titles and
+    queries go through the same function, so "pembelajaran" and "belajar" meet at "lajar".
+    """
+    word = _strip_suffix(word, _PARTICLES)
+    word = _strip_suffix(word, _POSSESSIVES)
+    word = _strip_suffix(word, _SUFFIXES)
+    for _ in range(2):
+        prefix = next((p for p in _PREFIXES if word.startswith(p) and len(word) - len(p) >= _MIN_STEM), None)
+        if prefix is None:
+            break
+        word = word[len(prefix):]
+    return word
+
+
+def tokenize(text):
+    """Lowercased, accent-free, stopword-free, stemmed terms of `text`, without duplicates."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii").lower()
+    terms = (stem(token) for token in _TOKEN_RE.findall(text) if token not in STOPWORDS and len(token) > 1)
+    return list(dict.fromkeys(terms))
+
+
+def _seen_field(collection_name):
+    # Collection names may contain dots, which would nest the field.
+    return "seen." + collection_name.replace(".", "_")
+
+
+def _index():
+    db = database.get_db()
+    if db is None:
+        return None
+    index = db[config.SEARCH_INDEX_COLLECTION]
+    database.ensure_indexes(index, [("terms", ASCENDING)], unique=False)
+    database.ensure_indexes(index, [("journal_terms", ASCENDING)], unique=False)
+    database.ensure_indexes(index, [("sources", ASCENDING)], unique=False)
+    return index
+
+
+def _crawls():
+    crawls = database.get_db()[config.JOURNAL_CRAWLS_COLLECTION]
+    database.ensure_indexes(crawls, [("garuda_link", ASCENDING), ("query", ASCENDING)])
+    return crawls
+
+
+def index_collection(collection_name, garuda_links=None):
+    """
+    (Re)indexes the articles of one results collection, or only those of the journals in
+    `garuda_links` (the ones a search just wrote). Returns the number of entries written.
+    """
+    index = _index()
+    if index is None:
+        return 0
+    journals = {} if garuda_links is None else {"garuda_link": {"$in": list(garuda_links)}}
+    if garuda_links is not None and not journals["garuda_link"]["$in"]:
+        return 0
+    started = datetime.now(timezone.utc)
+    ops = []
+    written = 0
+    for doc in database.get_db()[collection_name].find(journals, batch_size=config.EXPORT_BATCH_SIZE):
+        journal_terms = tokenize(doc.get("journal_name"))
+        for article in doc.get("results", []):
+            ops.append(UpdateOne(
+                {"_id": article_store.article_id(article, doc["garuda_link"])},
+                {
+                    "$set": {
+                        "title": article.get("title"),
+                        "download_link": article.get("download_link"),
+                        "garuda_link": doc["garuda_link"],
+                        "journal_name": doc.get("journal_name"),
+                        "sinta_level": doc.get("sinta_level"),
+                        "terms": tokenize(article.get("title")),
+                        "journal_terms": journal_terms,
+                        _seen_field(collection_name): started,
+                    },
+                    "$addToSet": {"sources": collection_name},
+                },
+                upsert=True,
+            ))
+            if len(ops) >= config.BULK_BATCH_SIZE:
+                written += len(ops)
+                index.bulk_write(ops, ordered=False)
+                ops = []
+    if ops:
+        written += len(ops)
+        index.bulk_write(ops, ordered=False)
+
+    # Articles this collection no longer holds (a full search replaced them) lose it as a source.
+    _drop_source(index, collection_name, {_seen_field(collection_name): {"$lt": started}, **journals})
+    logger.info("🔤 Indexed %s articles of '%s'.", written, collection_name)
+    return written
+
+
+def _drop_source(index, collection_name, extra=None):
+    query = {"sources": collection_name, **(extra or {})}
+    index.update_many(query, {"$pull": {"sources": collection_name}, "$unset": {_seen_field(collection_name): ""}})
+    index.delete_many({"sources": {"$size": 0}})
+
+
+def forget(collection_name):
+    """Removes a dropped results collection from the index."""
+    index = _index()
+    if index is not None:
+        _drop_source(index, collection_name)
+
+
+def rebuild():
+    """Indexes every stored results collection."""
+    names = [name for name in database.list_collections() if database.is_article_collection(name)]
+    return sum(index_collection(name) for name in names)
+
+
+def search(query, limit=config.SEARCH_RESULTS_LIMIT, sinta=None):
+    """
+    Answers a keyword query from the index: articles whose title or journal name shares a
+    term with it, best first (title matches count double). Returns None without a database.
+    """
+    index = _index()
+    if index is None:
+        return None
+    started = time.perf_counter()
+    terms = tokenize(query)
+    results = []
+    if terms:
+        match = {"$or": [{"terms": {"$in": terms}}, {"journal_terms": {"$in": terms}}]}
+        if sinta is not None:
+            match["sinta_level"] = sinta
+        results = list(index.aggregate([
+            {"$match": match},
+            {"$addFields": {"score": {"$add": [
+                {"$multiply": [2, {"$size": {"$setIntersection": ["$terms", terms]}}]},
+                {"$size": {"$setIntersection": ["$journal_terms", terms]}},
+            ]}}},
+            {"$sort": {"score": -1, "_id": 1}},
+            {"$limit": limit},
+            {"$project": {"_id": 0, "title": 1, "download_link": 1, "journal_name": 1, "garuda_link": 1, "sinta_level": 1, "score": 1}},
+        ]))
+    return {
+        "query": query,
+        "terms": terms,
+        "results": results,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def mark_crawled(query, garuda_links):
+    """Records that these journals were just searched on Garuda for `query`."""
+    if not garuda_links:
+        return
+    now = datetime.now(timezone.utc)
+    _crawls().bulk_write([
+        UpdateOne({"garuda_link": link, "query": query}, {"$set": {"crawled_at": now}}, upsert=True)
+        for link in garuda_links
+    ], ordered=False)
+
+
+def fresh_links(query, garuda_links, stale_after):
+    """The subset of `garuda_links` searched on Garuda for `query` less than `stale_after` seconds ago."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+    return {
+        doc["garuda_link"]
+        for doc in _crawls().find(
+            {"garuda_link": {"$in": list(garuda_links)}, "query": query, "crawled_at": {"$gte": cutoff}}, {"garuda_link": 1}
+        )
+    }
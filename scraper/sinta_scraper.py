@@ -1,14 +1,24 @@
 # sinta_scraper.py
+import asyncio
+import logging
 import requests
-import time
-import re
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 
 from . import config
 from . import database
+from . import http_cache
+from . import http_client
+from . import metrics
+from . import progress
+from . import parsers
+from .concurrency import HostLimiter, run_worker_pool
 
-session = requests.Session()
-session.headers.update(config.SINTA_HEADERS)
+# Pages that still fail after the HTTP client's retries are skipped; this many in a row ends the scrape.
+MAX_CONSECUTIVE_FAILURES = 3
+
+logger = logging.getLogger(__name__)
+
+session = http_client.create_session(config.SINTA_HEADERS)
 
 def initialize_sinta_filters(sinta_ranks, filter_area_codes):
     """Send initial POST request to apply Sinta filters based on user input."""
@@ -18,88 +28,187 @@ def initialize_sinta_filters(sinta_ranks, filter_area_codes):
     }
     for rank in sinta_ranks:
         payload[f"filter_accreditation[{rank}]"] = str(rank)
-    
+
     for area_code in filter_area_codes:
         payload[f"filter_area[{area_code}]"] = str(area_code)
 
-    print("🎯 Initializing Sinta filters (POST)...")
+    # Listing pages depend on the filters stored in the server-side session,
+    # so cached pages are keyed by the filter set as well as by URL.
+    http_cache.set_scope(session, "&".join(f"{k}={v}" for k, v in sorted(payload.items())))
+
+    logger.info("🎯 Initializing Sinta filters (POST)...")
     try:
-        resp = session.post(config.SINTA_BASE_URL, data=payload, timeout=15)
+        resp = session.post(config.SINTA_BASE_URL, data=payload, timeout=config.HTTP_TIMEOUT)
         resp.raise_for_status()
-        print("✅ Filters initialized successfully.")
+        logger.info("✅ Filters initialized successfully.")
     except requests.RequestException as e:
-        print(f"⚠️ Failed to initialize filters: {e}")
+        logger.warning("⚠️ Failed to initialize filters: %s", e)
         return False
     return True
 
 
-def scrape_page(page):
-    """Scrape a single page using GET, after session initialized"""
+def fetch_page_html(page):
+    """Fetch the HTML of a single listing page using GET, after session initialized. Returns None on failure."""
     url = f"{config.SINTA_BASE_URL}?page={page}"
-    print(f"\n🌐 Fetching page {page}: {url}")
+    logger.info("🌐 Fetching page %s: %s", page, url)
 
     try:
-        resp = session.get(url, timeout=15)
+        resp = session.get(url, timeout=config.HTTP_TIMEOUT)
         resp.raise_for_status()
     except requests.RequestException as e:
-        print(f"⚠️ Failed to fetch page {page}: {e}")
-        return []
+        logger.warning("⚠️ Failed to fetch page %s: %s", page, e)
+        progress.error(f"Page {page}: {e}")
+        progress.add(done=1)
+        return None
+    return resp.text
+
+
+def parse_journals(html):
+    """Extracts the journals listed on a Sinta listing page."""
+    results = parsers.parse_sinta_journals(html)
+    metrics.pages.inc(source="sinta")
+    metrics.journals.inc(len(results))
+    progress.add(done=1, pages=1, journals=len(results))
+    if logger.isEnabledFor(logging.DEBUG):
+        for journal in results:
+            logger.debug("✅ %s | Sinta %s | %s | %s", journal["name"], journal["sinta"], journal["sinta_link"], journal["garuda_link"])
+    return results
+
+
+def parse_total_pages(html):
+    """Reads the number of result pages from a listing page. Returns None if unknown."""
+    return parsers.parse_sinta_total_pages(html)
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    journals = soup.find_all("div", class_="list-item")
 
-    results = []
-    for j in journals:
-        name_tag = j.select_one(".affil-name a")
-        name = name_tag.get_text(strip=True) if name_tag else "Unknown"
+def scrape_page(page):
+    """
+    Scrape a single page using GET, after session initialized.
+    Returns None if the page could not be fetched, so callers can tell a failure from an empty page.
+    """
+    html = fetch_page_html(page)
+    if html is None:
+        return None
+    return parse_journals(html)
 
-        accred_tag = j.select_one(".num-stat.accredited a")
-        accred_text = accred_tag.get_text(strip=True) if accred_tag else "Unknown"
-        accred_match = re.search(r"S(\d+)", accred_text)
-        accred_number = int(accred_match.group(1)) if accred_match else None
 
-        sinta_link_tag = j.select_one("div.affil-name.mb-3 a")
-        sinta_link = sinta_link_tag["href"] if sinta_link_tag else "no sinta link"
+def _scrape_serial(max_pages, failed_pages):
+    """
+    Yields the journals of each page in turn, appending the pages that could not be fetched
+    to `failed_pages`. Pacing and retries are left to the HTTP client.
+    """
+    failures = 0
+    for page in range(1, max_pages + 1):
+        data = scrape_page(page)
+        if data is None:
+            failed_pages.append(page)
+            failures += 1
+            if failures >= MAX_CONSECUTIVE_FAILURES:
+                logger.warning("🚫 %d pages in a row failed, stopping.", failures)
+                break
+            logger.info("⏭️ Skipping page %s.", page)
+            continue
+        failures = 0
+        if not data:
+            logger.info("🚫 No data found on page %s, stopping early.", page)
+            break
 
-        garuda_tag = j.find("a", href=re.compile(r"garuda\.kemdikbud\.go\.id"))
-        garuda_link = garuda_tag["href"] if garuda_tag else "no garuda link"
+        yield data
 
-        print(f"✅ {name} | Sinta {accred_number} | {sinta_link} | {garuda_link}")
 
-        results.append(
-            {
-                "name": name,
-                "sinta": accred_number,
-                "sinta_link": sinta_link,
-                "garuda_link": garuda_link,
-            }
-        )
+async def _scrape_pages_concurrent(pages, max_workers):
+    """Fetches and parses `pages` over the shared filtered session. Returns {page: journals, or None if it failed}."""
+    loop = asyncio.get_running_loop()
+    limiter = HostLimiter(max_workers, max_workers)
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        async def fetch(page):
+            async with limiter.slot(config.SINTA_BASE_URL):
+                html = await loop.run_in_executor(executor, fetch_page_html, page)
+            results[page] = None if html is None else await loop.run_in_executor(executor, parse_journals, html)
+
+        await run_worker_pool(pages, fetch, max_workers)
 
     return results
 
 
-def scrape_all_sinta_journals(max_pages=10, delay=2, sinta_ranks=[1, 2, 3], filter_area_codes=[], collection_name=config.SINTA_JOURNALS_COLLECTION, overwrite=False):
+def _scrape_parallel(max_pages, max_workers, failed_pages):
+    """
+    Fetches page 1 to learn how many pages the filtered listing has, then fetches
+    the rest of the range concurrently. Returns the pages' journals in page order,
+    cut at the first empty page like the serial loop. Pages that failed are skipped
+    and appended to `failed_pages`.
+    """
+    html = fetch_page_html(1)
+    if html is None:
+        failed_pages.append(1)
+        return []
+
+    total_pages = parse_total_pages(html)
+    last_page = min(max_pages, total_pages) if total_pages else max_pages
+    logger.info("📚 Listing has %s pages, fetching %s.", total_pages if total_pages else "an unknown number of", last_page)
+    progress.begin(last_page, "pages")
+
+    results = {1: parse_journals(html)}
+    results.update(asyncio.run(
+        _scrape_pages_concurrent(range(2, last_page + 1), max_workers)
+    ))
+
+    ordered = []
+    for page in range(1, last_page + 1):
+        if results.get(page) is None:
+            logger.info("⏭️ Skipping page %s, it could not be fetched.", page)
+            failed_pages.append(page)
+            continue
+        if not results[page]:
+            logger.info("🚫 No data found on page %s, stopping early.", page)
+            break
+        ordered.append(results[page])
+    return ordered
+
+
+def scrape_all_sinta_journals(max_pages=10, sinta_ranks=[1, 2, 3], filter_area_codes=[], collection_name=config.SINTA_JOURNALS_COLLECTION, overwrite=False,
+                              parallel=False, max_workers=config.SINTA_MAX_CONCURRENCY, revalidate=False):
     """
     Scrapes Sinta journals with the given filters and saves them to the specified database collection.
+    With parallel=True the page range is fetched concurrently (at most `max_workers` requests in
+    flight) and saved in page order once fetched.
+    With overwrite=True the collection is only replaced if every page was fetched.
+    With revalidate=True (re-crawls) cached listing pages are revalidated, however fresh.
+    Returns the number of journals inserted or updated, or None if nothing could be scraped
+    or an overwrite was abandoned.
     """
+    http_cache.set_revalidate(session, revalidate)
     if not initialize_sinta_filters(sinta_ranks, filter_area_codes):
         return
 
-    total_saved = 0
-    for page in range(1, max_pages + 1):
-        data = scrape_page(page)
-        if not data:
-            print(f"🚫 No data found on page {page}, stopping early.")
-            break
-        
-        # The first time through, respect the overwrite flag.
-        # Subsequent pages should always append, not overwrite.
-        saved_count = database.save_sinta_journals(data, collection_name, overwrite)
-        if overwrite:
-            overwrite = False
-            
-        total_saved += saved_count
-        
-        time.sleep(delay)  # Be nice to the server
-
-    print(f"\n✨ Scraping complete. A total of {total_saved} journals were saved/updated in the '{collection_name}' collection.")
+    failed_pages = []
+    if parallel:
+        # Sets the progress total itself, once page 1 tells how many pages there are.
+        pages = _scrape_parallel(max_pages, max_workers, failed_pages)
+    else:
+        progress.begin(max_pages, "pages")
+        pages = _scrape_serial(max_pages, failed_pages)
+
+    # An overwrite fills a staging collection that replaces the old one only once the scrape
+    # succeeds without a failed page; until then searches and readers keep seeing the
+    # previous journals.
+    if overwrite:
+        writer = database.staging_writer(collection_name, database.SINTA_JOURNAL_KEYS)
+    else:
+        writer = database.bulk_writer(collection_name, database.SINTA_JOURNAL_KEYS)
+    if writer is None:
+        return
+
+    with writer:
+        for data in pages:
+            for journal in data:
+                writer.add(journal)
+        if overwrite and failed_pages:
+            writer.discard()
+            logger.error("❌ Pages %s could not be fetched; '%s' keeps its previous journals.", failed_pages, collection_name)
+            return None
+
+    logger.info("✨ Scraping complete. A total of %s journals were saved/updated in the '%s' collection (%s unchanged).", writer.changed, collection_name, writer.unchanged)
+    return writer.changed
+
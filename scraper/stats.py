@@ -0,0 +1,131 @@
+# stats.py
+from datetime import datetime, timezone
+from pymongo.errors import DuplicateKeyError
+
+from . import config
+from . import database
+
+
+def _stats():
+    db = database.get_db()
+    return None if db is None else db[config.STATS_COLLECTION]
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def invalidate(collection_name):
+    """Marks a collection's cached stats as stale after a write. Called by the database writers."""
+    stats = _stats()
+    if stats is None:
+        return
+    stats.update_one(
+        {"_id": collection_name},
+        {"$set": {"stale": True, "last_write_at": _now()}},
+        upsert=True,
+    )
+
+
+def forget(collection_name):
+    """Drops the cached stats of a deleted collection."""
+    stats = _stats()
+    if stats is not None:
+        stats.delete_one({"_id": collection_name})
+
+
+def _pipeline(kind):
+    sinta_field = "$sinta_level" if kind == "articles" else "$sinta"
+    facets = {
+        "count": [{"$count": "n"}],
+        "by_sinta": [{"$group": {"_id": sinta_field, "n": {"$sum": 1}}}],
+        # The newest _id dates the last insert, for collections written before stats existed.
+        "newest": [{"$group": {"_id": None, "id": {"$max": "$_id"}}}],
+    }
+    if kind == "articles":
+        facets["by_query"] = [{"$group": {
+            "_id": "$query",
+            "journals": {"$sum": 1},
+            "articles": {"$sum": {"$ifNull": ["$results_count", 0]}},
+        }}]
+    return [{"$facet": facets}]
+
+
+def compute(collection_name):
+    """Aggregates one collection: document count, breakdown by Sinta rank and, for article collections, totals per query."""
+    kind = "articles" if database.is_article_collection(collection_name) else "journals"
+    result = next(database.get_db()[collection_name].aggregate(_pipeline(kind)))
+
+    newest = result["newest"][0]["id"] if result["newest"] else None
+    summary = {
+        "kind": kind,
+        "documents": result["count"][0]["n"] if result["count"] else 0,
+        "by_sinta": {str(group["_id"]): group["n"] for group in result["by_sinta"] if group["_id"] is not None},
+        "last_insert_at": newest.generation_time if hasattr(newest, "generation_time") else None,
+    }
+    if kind == "articles":
+        # A list, not a dict keyed by query: queries may contain characters field names cannot.
+        summary["queries"] = sorted(
+            ({"query": group["_id"], "journals": group["journals"], "articles": group["articles"]}
+             for group in result["by_query"]),
+            key=lambda q: -q["articles"],
+        )
+        summary["articles"] = sum(q["articles"] for q in summary["queries"])
+    return summary
+
+
+def _aware(moment):
+    # Datetimes read back from MongoDB are naive UTC.
+    return moment if moment is None or moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _public(name, cached):
+    stats = dict(cached["stats"])
+    last_insert_at = stats.pop("last_insert_at", None)
+    stats["name"] = name
+    stats["last_updated"] = _aware(cached.get("last_write_at") or last_insert_at)
+    stats["computed_at"] = _aware(cached["computed_at"])
+    return stats
+
+
+def get_collection_stats(collection_name, max_age=config.STATS_REFRESH_INTERVAL):
+    """
+    Returns the stats of one collection from the cache, recomputing them when a write made
+    them stale. While a scrape keeps writing, they are recomputed at most every `max_age` seconds.
+    """
+    stats = _stats()
+    cached = stats.find_one({"_id": collection_name}) or {"_id": collection_name}
+    if "stats" in cached:
+        age = (_now() - _aware(cached["computed_at"])).total_seconds()
+        if not cached.get("stale") or age < max_age:
+            return _public(collection_name, cached)
+
+    cached["stats"] = compute(collection_name)
+    cached["computed_at"] = _now()
+    # Matching on the last write seen keeps the entry stale if a write arrived while aggregating.
+    try:
+        stats.update_one(
+            {"_id": collection_name, "last_write_at": cached.get("last_write_at")},
+            {"$set": {"stats": cached["stats"], "computed_at": cached["computed_at"], "stale": False}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        pass  # the racing write's entry already exists and stays stale
+    return _public(collection_name, cached)
+
+
+def get_all_stats():
+    """Stats of every user collection plus overall totals, or None if there is no database connection."""
+    if _stats() is None:
+        return None
+    collections = [get_collection_stats(name) for name in database.list_collections()]
+    updated = [c["last_updated"] for c in collections if c["last_updated"] is not None]
+    return {
+        "collections": collections,
+        "totals": {
+            "collections": len(collections),
+            "journals": sum(c["documents"] for c in collections if c["kind"] == "journals"),
+            "articles": sum(c.get("articles", 0) for c in collections),
+            "last_updated": max(updated) if updated else None,
+        },
+    }
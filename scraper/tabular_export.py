@@ -0,0 +1,160 @@
+# tabular_export.py
+import csv
+import io
+
+from . import config
+from . import database
+
+# Flat, columnar exports for analysis (pandas, DuckDB, spreadsheets): one row per article for
+# results collections, with the journal and query it was found with, and one row per journal
+# for Sinta collections. Rows come straight from a MongoDB cursor (results are unwound on the
+# server) and are written in batches, so memory stays bounded by EXPORT_ROW_GROUP_SIZE rows.
+TABULAR_FORMATS = ("csv", "parquet")
+
+# (column, type) of each kind of collection; int64 columns hold None for missing values.
+ARTICLE_COLUMNS = [
+    ("journal_name", "string"),
+    ("sinta_level", "int64"),
+    ("query", "string"),
+    ("garuda_link", "string"),
+    ("title", "string"),
+    ("download_link", "string"),
+]
+JOURNAL_COLUMNS = [
+    ("name", "string"),
+    ("sinta", "int64"),
+    ("sinta_link", "string"),
+    ("garuda_link", "string"),
+]
+
+
+def columns(collection_name):
+    return ARTICLE_COLUMNS if database.is_article_collection(collection_name) else JOURNAL_COLUMNS
+
+
+def _rows_cursor(collection_name):
+    """A cursor of flat rows of a collection, or None if it cannot be exported."""
+    collection = database.exportable_collection(collection_name)
+    if collection is None:
+        return None
+
+    projection = {name: 1 for name, _ in columns(collection_name)}
+    projection["_id"] = 0
+    if not database.is_article_collection(collection_name):
+        return collection.find({}, projection, batch_size=config.EXPORT_BATCH_SIZE)
+    projection.update({"title": "$results.title", "download_link": "$results.download_link"})
+    return collection.aggregate([
+        {"$unwind": "$results"},
+        {"$project": projection},
+    ], allowDiskUse=True, batchSize=config.EXPORT_BATCH_SIZE)
+
+
+def _batches(cursor, cols, size):
+    """Groups rows into lists of at most `size`, with every column present and typed."""
+    batch = []
+    for doc in cursor:
+        row = {}
+        for name, kind in cols:
+            value = doc.get(name)
+            if kind == "int64":
+                value = value if isinstance(value, int) and not isinstance(value, bool) else None
+            elif value is not None:
+                value = str(value)
+            row[name] = value
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_csv_chunks(cursor, cols, chunk_size=config.EXPORT_BATCH_SIZE):
+    """Serializes rows as CSV with a header line, yielding one string per `chunk_size` rows."""
+    names = [name for name, _ in cols]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=names, lineterminator="\n")
+    writer.writeheader()
+    for batch in _batches(cursor, cols, chunk_size):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Parquet export needs pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+
+class _ChunkSink:
+    """Write-only file object that keeps what the Parquet writer wrote until it is taken."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_parquet_chunks(cursor, cols, row_group_size=config.EXPORT_ROW_GROUP_SIZE,
+                        compression=config.EXPORT_PARQUET_COMPRESSION):
+    """
+    Writes rows as a Parquet file with one row group per `row_group_size` rows, yielding
+    the bytes of every row group as soon as it is written, then the footer.
+    """
+    pa, pq = _pyarrow()
+    schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in cols])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression=compression) as writer:
+        for batch in _batches(cursor, cols, row_group_size):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema), row_group_size=len(batch))
+            yield sink.take()
+    yield sink.take()
+
+
+def stream_tabular_export(collection_name, fmt="csv", compress=False):
+    """
+    Returns a generator of bytes with a collection's rows as CSV (gzip-compressed if
+    `compress`) or Parquet (compressed internally), or None if it cannot be exported.
+    Raises ValueError for an unknown format or when Parquet support is missing.
+    """
+    if fmt not in TABULAR_FORMATS:
+        raise ValueError(f"Unknown tabular format '{fmt}'. Expected one of {TABULAR_FORMATS}.")
+    if fmt == "parquet":
+        _pyarrow()  # fail before anything is sent
+    cursor = _rows_cursor(collection_name)
+    if cursor is None:
+        return None
+
+    cols = columns(collection_name)
+    if fmt == "parquet":
+        return iter_parquet_chunks(cursor, cols)
+    chunks = iter_csv_chunks(cursor, cols)
+    if compress:
+        return database.gzip_chunks(chunks)
+    return (chunk.encode("utf-8") for chunk in chunks)
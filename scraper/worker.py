@@ -0,0 +1,116 @@
+# worker.py
+import os
+import signal
+import socket
+import threading
+import logging
+import time
+
+from . import config
+from . import database
+from . import jobs
+from . import log
+from . import metrics
+from . import progress
+
+logger = logging.getLogger(__name__)
+
+
+def _push_metrics(worker_id):
+    try:
+        metrics.push(worker_id)
+    except Exception as e:
+        logger.warning("⚠️ Could not push metrics: %s", e)
+
+
+class _Heartbeat(threading.Thread):
+    """
+    Sends heartbeats (and the worker's metrics) for a running job until stopped. If the
+    job was requeued meanwhile, it is cancelled so it does not run twice at once.
+    """
+
+    def __init__(self, job, worker_id, interval):
+        super().__init__(daemon=True)
+        self.job = job
+        self.worker_id = worker_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                if not jobs.heartbeat(self.job["_id"], self.worker_id):
+                    logger.warning("⚠️ Job %s is no longer assigned to this worker, stopping it.", self.job["_id"])
+                    progress.cancel(self.job["_id"])
+                    return
+            except Exception as e:
+                logger.warning("⚠️ Heartbeat for job %s failed: %s", self.job["_id"], e)
+            _push_metrics(self.worker_id)
+
+
+def run_worker(job_types=None, poll_interval=config.JOB_POLL_INTERVAL):
+    """
+    Claims and runs queued jobs one at a time until SIGTERM/SIGINT. Start several worker
+    processes to run several jobs at once; JOB_CONCURRENCY caps each job type across all of them.
+    """
+    log.configure()
+    if database.get_db() is None:
+        logger.error("Please check your MongoDB connection details and ensure the server is running.")
+        return
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        logger.info("🛑 Worker %s stopping after the current job...", worker_id)
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info("👷 Worker %s waiting for %s jobs.", worker_id, ", ".join(job_types or jobs.JOB_TYPES))
+    last_reap = 0.0
+    last_push = 0.0
+    while not stopping.is_set():
+        if time.monotonic() - last_reap >= config.JOB_STALE_AFTER / 3:
+            jobs.requeue_stale()
+            last_reap = time.monotonic()
+        if time.monotonic() - last_push >= config.METRICS_PUSH_INTERVAL:
+            _push_metrics(worker_id)
+            last_push = time.monotonic()
+
+        job = jobs.claim(worker_id, job_types)
+        if job is None:
+            stopping.wait(poll_interval)
+            continue
+
+        # Everything logged until the job is finished carries its id, lifecycle lines included.
+        log.set_job_id(job["_id"])
+        logger.info("▶️ Job %s (%s) started: %s", job["_id"], job["type"], job["params"])
+        heartbeat = _Heartbeat(job, worker_id, config.JOB_HEARTBEAT_INTERVAL)
+        heartbeat.start()
+        progress.start(job["_id"], job["type"])
+        error = None
+        try:
+            jobs.run(job)
+        except progress.JobCancelled:
+            # Requeued after missed heartbeats: the job is another worker's now, so it is
+            # neither finished nor reported from here.
+            heartbeat.stopped.set()
+            progress.stop(job["_id"])
+            logger.warning("⚠️ Job %s (%s) stopped, it lost its lease.", job["_id"], job["type"])
+            log.set_job_id(None)
+            continue
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception("❌ Job %s (%s) raised an exception.", job["_id"], job["type"])
+        finally:
+            heartbeat.stopped.set()
+        jobs.finish(job, worker_id, error)
+        metrics.jobs.inc(type=job["type"], status="failed" if error else "completed")
+        _push_metrics(worker_id)
+        if error:
+            logger.error("❌ Job %s (%s) failed: %s.", job["_id"], job["type"], error)
+        else:
+            logger.info("✅ Job %s (%s) completed.", job["_id"], job["type"])
+        log.set_job_id(None)